@@ -6,10 +6,25 @@ Replaces old ChromaDB-based flow with unified Supabase + OpenRAG architecture.
 
 Features:
 - Zero data drift - metadata and embeddings in same transaction
-- Automatic embedding generation via OpenRAG
+- One idempotent upsert per song (keyed by content hash); the two-phase
+  insert + complete path is kept for long-running jobs
+- Automatic embedding generation via OpenRAG; with lyrics chunking, long
+  songs are embedded as overlapping chunks under a mean parent vector
 - Status tracking through processing stages
+- Duplicate files (same normalized Khmer text) skipped within a run
+- Parse, embed and write stages pipelined through bounded queues, with
+  micro-batched embeddings and multi-row upserts; per-stage metrics
+- One warm OpenRAGService per worker, shared by all tasks of a run
+- Incremental: a local manifest skips unchanged files, updates changed
+  ones in place and resumes files interrupted after their insert
+- CSV/TSV/JSONL catalogs streamed row by row into bulk inserts
+- Failed files and rows kept in a local dead-letter store and retried
+  with exponential backoff by ``retry_failed_ingestion``
 - Error handling with retries
 
+For continuous ingestion of a drop folder, see scripts/ingest_watch.py
+(backend/src/services/ingest_daemon.py), which shares the manifest.
+
 Author: KLM v2.3
 Version: 2.3.0
 """
@@ -17,7 +32,9 @@ Version: 2.3.0
 from prefect import flow, task, get_run_logger
 from prefect.tasks import task_input_hash
 from datetime import datetime
-from typing import Dict, Any, Optional
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Set, Tuple
+from dataclasses import dataclass
 import asyncio
 import logging
 
@@ -25,12 +42,16 @@ logger = logging.getLogger(__name__)
 
 
 @task(cache_key_fn=task_input_hash, retries=3, retry_delay_seconds=5)
-async def parse_lyrics_file(file_path: str) -> Dict[str, Any]:
+async def parse_lyrics_file(
+    file_path: str, file_hash: Optional[str] = None
+) -> Dict[str, Any]:
     """
     Parse lyrics file and extract metadata/content.
 
     Args:
         file_path: Path to lyrics file
+        file_hash: Digest of the file's bytes; part of the task cache key,
+            so an edited file is parsed again
 
     Returns:
         Parsed lyrics data with metadata
@@ -39,23 +60,10 @@ async def parse_lyrics_file(file_path: str) -> Dict[str, Any]:
     prefect_logger.info(f"Parsing lyrics file: {file_path}")
 
     try:
-        import os
-
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-
-        filename = os.path.basename(file_path)
-        filename_parts = filename.replace(".txt", "").replace(".csv", "").split("_")
-
-        lyrics_data = {
-            "title": filename_parts[0] if filename_parts else "Unknown",
-            "artist": filename_parts[1] if len(filename_parts) > 1 else "Unknown",
-            "lyrics_khmer": content,
-            "metadata": {
-                "source_file": file_path,
-                "processed_at": datetime.now().isoformat(),
-            },
-        }
+        from backend.src.services.catalog_reader import read_lyrics_file
+
+        # Off the event loop, so parsing overlaps embedding/Supabase waits
+        lyrics_data = await asyncio.to_thread(read_lyrics_file, file_path)
 
         prefect_logger.info(
             f"Parsed lyrics: {lyrics_data['title']} by {lyrics_data['artist']}"
@@ -82,11 +90,9 @@ async def generate_embedding(text: str) -> list:
     prefect_logger.info("Generating embedding via OpenRAG")
 
     try:
-        from backend.src.services.openrag_service import OpenRAGService
+        from backend.src.services.resources import worker_resources
 
-        openrag = OpenRAGService()
-        if not await openrag.connect():
-            raise RuntimeError("Failed to connect to OpenRAG")
+        openrag = worker_resources.openrag()
 
         embedding = await openrag.generate_embedding(text)
         prefect_logger.info(f"Generated embedding: {len(embedding)} dimensions")
@@ -97,33 +103,97 @@ async def generate_embedding(text: str) -> list:
         raise
 
 
+@task(retries=3, retry_delay_seconds=10)
+async def embed_lyrics_batch(lyrics: List[Dict[str, Any]]) -> List[Any]:
+    """
+    Embed a micro-batch of songs in as few provider requests as possible.
+
+    Args:
+        lyrics: Parsed lyrics data, in order
+
+    Returns:
+        One ``LyricsEmbedding`` per song (song vector plus its chunks when
+        lyrics chunking split it)
+    """
+    from backend.src.services.resources import worker_resources
+
+    try:
+        return await worker_resources.openrag().embed_lyrics(lyrics)
+    except Exception as e:
+        logger.error(f"Batch embedding failed ({len(lyrics)} songs): {e}")
+        raise
+
+
+@task(retries=2, retry_delay_seconds=30)
+async def upsert_batch(
+    lyrics: List[Dict[str, Any]], embeddings: List[Any]
+) -> List[Dict[str, Any]]:
+    """
+    Write a batch of songs in their final state with one multi-row upsert.
+
+    Upserts are keyed by content hash, so a retried batch rewrites the
+    same rows instead of duplicating them.
+
+    Returns:
+        ``{"id", "status", "error"}`` per song, in order
+    """
+    from backend.src.services.resources import worker_resources
+
+    results = await worker_resources.openrag().ingest_lyrics_many(
+        lyrics, embeddings, batch_size=len(lyrics)
+    )
+    return [
+        {"id": result.id, "status": result.status, "error": result.error}
+        for result in results
+    ]
+
+
 @task(retries=3, retry_delay_seconds=30)
 async def ingest_to_supabase(
-    lyrics_data: Dict[str, Any], embedding: list
+    lyrics_data: Dict[str, Any],
+    embedding: Any,
+    record_id: Optional[str] = None,
+    status: str = "complete",
 ) -> Dict[str, Any]:
     """
     Ingest lyrics with embedding to Supabase.
 
-    Zero data drift - single transaction for metadata + embedding.
+    Zero data drift - single statement for metadata + embedding + status.
+    Idempotent (upsert keyed by content hash), so retries are safe.
 
     Args:
         lyrics_data: Parsed lyrics data
-        embedding: Generated vector embedding
+        embedding: Generated vector embedding or ``LyricsEmbedding``
+        record_id: Existing record to overwrite (the file changed)
+        status: Row status; "processing" for the two-phase path
 
     Returns:
-        Supabase record ID and status
+        Supabase record ID and status; status "duplicate" (with the other
+        record's ID) when a changed file now matches another stored song
     """
     prefect_logger = get_run_logger()
     prefect_logger.info(f"Ingesting to Supabase: {lyrics_data.get('title')}")
 
     try:
-        from backend.src.services.openrag_service import OpenRAGService
+        from backend.src.services.resources import worker_resources
 
-        openrag = OpenRAGService()
-        if not await openrag.connect():
-            raise RuntimeError("Failed to connect to Supabase")
+        openrag = worker_resources.openrag()
 
-        result = await openrag.ingest_lyrics(lyrics_data, embedding)
+        if record_id:
+            result = await openrag.replace_lyrics(
+                record_id, lyrics_data, embedding, status
+            )
+        else:
+            result = await openrag.upsert_lyrics(lyrics_data, embedding, status)
+        if result.status == "duplicate":
+            prefect_logger.info(f"Content already stored as {result.id}")
+            return {
+                "status": "duplicate",
+                "id": result.id,
+                "embedding_generated": result.embedding_generated,
+            }
+        if result.status != "success":
+            raise RuntimeError(f"Supabase write failed: {result.error}")
 
         prefect_logger.info(f"Successfully ingested: {result.id}")
         return {
@@ -155,11 +225,9 @@ async def complete_processing(
     prefect_logger.info(f"Completing processing for: {record_id}")
 
     try:
-        from backend.src.services.openrag_service import OpenRAGService
+        from backend.src.services.resources import worker_resources
 
-        openrag = OpenRAGService()
-        if not await openrag.connect():
-            raise RuntimeError("Failed to connect to Supabase")
+        openrag = worker_resources.openrag()
 
         success = await openrag.complete_lyrics(
             lyrics_id=record_id, vocabulary=vocabulary
@@ -176,6 +244,54 @@ async def complete_processing(
         raise
 
 
+@task
+async def ingest_catalog_file(
+    file_path: str,
+    batch_size: int = 200,
+    column_map: Optional[Dict[str, str]] = None,
+    dead_letters: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """
+    Stream a CSV/TSV/JSONL catalog (one lyric per row) into Supabase.
+
+    Rows are read lazily and sent to bulk ingestion ``batch_size`` at a
+    time, so memory stays flat however large the file is. Writes are
+    upserts keyed by content hash, so re-running a catalog never
+    duplicates rows, but the task is not retried as a whole (that would
+    embed every row again): rows whose write failed go to
+    ``dead_letters`` and are retried on their own.
+
+    Args:
+        file_path: Catalog file
+        batch_size: Rows per embedding/insert batch
+        column_map: Lyrics field -> source column overrides
+        dead_letters: DeadLetterStore for rows whose write failed
+
+    Returns:
+        Row counts and the first failed rows with their errors
+    """
+    prefect_logger = get_run_logger()
+    prefect_logger.info(f"Streaming catalog: {file_path}")
+
+    from backend.src.services.catalog_reader import ColumnMapping, ingest_catalog
+    from backend.src.services.resources import worker_resources
+
+    def dead_letter_row(row, error: str) -> None:
+        dead_letters.add(f"{row.source}#{row.row}", error, row.data, kind="row")
+
+    summary = await ingest_catalog(
+        worker_resources.openrag(),
+        Path(file_path),
+        batch_size,
+        ColumnMapping(column_map or {}),
+        on_failed=dead_letter_row if dead_letters is not None else None,
+    )
+    prefect_logger.info(
+        f"Catalog {file_path}: {summary['successful']}/{summary['rows']} rows ingested"
+    )
+    return summary
+
+
 @task(retries=1)
 async def handle_error(error: Exception, file_path: str) -> Dict[str, Any]:
     """
@@ -193,9 +309,522 @@ async def handle_error(error: Exception, file_path: str) -> Dict[str, Any]:
     return {"status": "failed", "file": file_path, "error": str(error)}
 
 
+class StageLimits:
+    """Per-stage concurrency limits shared by every file of a run."""
+
+    def __init__(self, parse: int, embed: int, ingest: int, in_flight: int):
+        self.parse = asyncio.Semaphore(max(1, parse))
+        self.embed = asyncio.Semaphore(max(1, embed))
+        self.ingest = asyncio.Semaphore(max(1, ingest))
+        self.in_flight = asyncio.Semaphore(max(1, in_flight))
+
+
+async def process_file(
+    file_path: str,
+    limits: StageLimits,
+    seen_hashes: Dict[str, str],
+    manifest: Optional[Any] = None,
+    catalog_batch_size: int = 200,
+    column_map: Optional[Dict[str, str]] = None,
+    two_phase: bool = False,
+    dead_letters: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """
+    Run one file through parse -> embed -> upsert (one write in its final
+    state), or parse -> embed -> ingest -> complete with ``two_phase``.
+
+    Catalog files (CSV/TSV/JSONL) are instead streamed row by row into
+    bulk ingestion; per-file dedup does not apply to their rows.
+
+    Each stage waits for a slot of its own limit, so slow stages
+    (embedding, Supabase) never hold up parsing of other files.
+
+    With an IngestManifest, unchanged files are skipped, changed ones
+    overwrite their record, files interrupted after the insert only run
+    the completion step, and every stage reached is recorded.
+
+    With a DeadLetterStore, a failed file (or catalog row) is stored with
+    its error class and scheduled for retry.
+
+    Returns:
+        ``{"kind": "processed" | "catalog" | "unchanged" | "duplicate" |
+        "failed", ...}``
+    """
+    from backend.src.services.catalog_reader import catalog_format
+    from backend.src.services.ingest_manifest import FileAction, Stage
+
+    state = None
+    reached = Stage.PENDING
+    async with limits.in_flight:
+        try:
+            if manifest is not None:
+                state = await asyncio.to_thread(manifest.classify, file_path)
+                if state.action is FileAction.SKIP:
+                    return {"kind": "unchanged", "file": file_path}
+            action = state.action if state else FileAction.INGEST
+
+            if catalog_format(Path(file_path)):
+                async with limits.ingest:
+                    catalog = await ingest_catalog_file(
+                        file_path, catalog_batch_size, column_map, dead_letters
+                    )
+                if manifest is not None:
+                    # Complete even with failed rows: they are retried from
+                    # the dead-letter store, not by re-reading the catalog
+                    manifest.record(
+                        state,
+                        Stage.COMPLETE,
+                        error=(
+                            f"{catalog['failed']} rows failed"
+                            if catalog["failed"]
+                            else None
+                        ),
+                    )
+                return {"kind": "catalog", "file": file_path, **catalog}
+
+            if action is FileAction.RESUME:
+                reached = Stage.INGESTED
+                async with limits.ingest:
+                    await complete_processing(
+                        record_id=state.record_id, vocabulary=None
+                    )
+                manifest.record(state, Stage.COMPLETE)
+                return {
+                    "kind": "processed",
+                    "file": file_path,
+                    "id": state.record_id,
+                    "action": action.value,
+                }
+
+            async with limits.parse:
+                parse_result = await parse_lyrics_file(
+                    file_path, state.file_hash if state else None
+                )
+            lyrics_data = parse_result["data"]
+
+            # Same normalized title/artist/lyrics already ingested this run.
+            # Check-and-set has no await in between, so it is race free.
+            # Recorded in the manifest by record_duplicates, once the file
+            # it duplicates has been written.
+            digest = lyrics_data["metadata"]["content_hash"]
+            if digest in seen_hashes:
+                return {
+                    "kind": "duplicate",
+                    "file": file_path,
+                    "duplicate_of": seen_hashes[digest],
+                    "content_hash": digest,
+                }
+            seen_hashes[digest] = file_path
+
+            async with limits.embed:
+                embedding = (await embed_lyrics_batch([lyrics_data]))[0]
+
+            async with limits.ingest:
+                ingest_result = await ingest_to_supabase(
+                    lyrics_data,
+                    embedding,
+                    state.record_id if action is FileAction.UPDATE else None,
+                    "processing" if two_phase else "complete",
+                )
+                if ingest_result["status"] == "duplicate":
+                    return stored_duplicate(
+                        manifest, state, file_path, digest, ingest_result["id"]
+                    )
+                if two_phase:
+                    reached = Stage.INGESTED
+                    if manifest is not None:
+                        manifest.record(
+                            state,
+                            Stage.INGESTED,
+                            record_id=ingest_result["id"],
+                            content_hash=digest,
+                        )
+                    await complete_processing(
+                        record_id=ingest_result["id"], vocabulary=None
+                    )
+            if manifest is not None:
+                manifest.record(
+                    state,
+                    Stage.COMPLETE,
+                    record_id=ingest_result["id"],
+                    content_hash=digest,
+                )
+
+            return {
+                "kind": "processed",
+                "file": file_path,
+                "id": ingest_result["id"],
+                "action": action.value,
+            }
+
+        except Exception as e:
+            if state is not None:
+                manifest.record(state, reached, error=str(e))
+            retry_info = {}
+            if dead_letters is not None:
+                letter = dead_letters.add(file_path, e)
+                retry_info = {
+                    "attempts": letter.attempts,
+                    "error_class": letter.error_class,
+                    "retry_scheduled": letter.next_attempt_at is not None,
+                }
+            return {"kind": "failed", **await handle_error(e, file_path), **retry_info}
+
+
+@dataclass
+class _PipelineItem:
+    """A lyrics file on its way through the pipelined stages."""
+
+    index: int
+    path: str
+    state: Optional[Any] = None
+    action: Any = None
+    lyrics_data: Optional[Dict[str, Any]] = None
+    embedding: Any = None  # LyricsEmbedding
+
+
+async def run_pipelined(
+    files: List[str],
+    seen_hashes: Dict[str, str],
+    manifest: Optional[Any] = None,
+    dead_letters: Optional[Any] = None,
+    parse_concurrency: int = 8,
+    embed_concurrency: int = 4,
+    ingest_concurrency: int = 4,
+    embed_batch_size: int = 32,
+    write_batch_size: int = 100,
+) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Ingest lyrics files through three connected stages:
+
+    - parse: ``parse_concurrency`` workers classify (manifest) and read
+      files, dropping unchanged files and in-run duplicates
+    - embed: ``embed_concurrency`` workers embed micro-batches of up to
+      ``embed_batch_size`` songs per call
+    - write: ``ingest_concurrency`` workers upsert batches of up to
+      ``write_batch_size`` new songs in one statement; changed files are
+      written over their record, interrupted ones completed
+
+    Stages are joined by bounded queues, so they overlap and a slow stage
+    applies backpressure instead of buffering the corpus. Outcomes match
+    ``process_file``'s.
+
+    Returns:
+        ``(outcomes in file order, per-stage metrics)``
+    """
+    from backend.src.services.ingest_manifest import FileAction, Stage
+    from backend.src.services.stage_pipeline import Pipeline
+    from backend.src.services.stage_pipeline import Stage as PipelineStage
+
+    outcomes: Dict[int, Dict[str, Any]] = {}
+
+    async def fail(item: _PipelineItem, error: Any, reached=Stage.PENDING) -> None:
+        if manifest is not None and item.state is not None:
+            manifest.record(item.state, reached, error=str(error))
+        outcome = {"kind": "failed", **await handle_error(error, item.path)}
+        if dead_letters is not None:
+            letter = dead_letters.add(item.path, error)
+            outcome.update(
+                attempts=letter.attempts,
+                error_class=letter.error_class,
+                retry_scheduled=letter.next_attempt_at is not None,
+            )
+        outcomes[item.index] = outcome
+
+    def done(item: _PipelineItem, record_id: str) -> None:
+        if manifest is not None:
+            manifest.record(
+                item.state,
+                Stage.COMPLETE,
+                record_id=record_id,
+                content_hash=(
+                    item.lyrics_data["metadata"]["content_hash"]
+                    if item.lyrics_data
+                    else None
+                ),
+            )
+        outcomes[item.index] = {
+            "kind": "processed",
+            "file": item.path,
+            "id": record_id,
+            "action": item.action.value,
+        }
+
+    async def parse(batch: List[_PipelineItem]) -> List[_PipelineItem]:
+        forward = []
+        for item in batch:
+            try:
+                item.action = FileAction.INGEST
+                if manifest is not None:
+                    item.state = await asyncio.to_thread(manifest.classify, item.path)
+                    item.action = item.state.action
+                    if item.action is FileAction.SKIP:
+                        outcomes[item.index] = {"kind": "unchanged", "file": item.path}
+                        continue
+                if item.action is FileAction.RESUME:
+                    forward.append(item)
+                    continue
+                parsed = await parse_lyrics_file(
+                    item.path, item.state.file_hash if item.state else None
+                )
+                item.lyrics_data = parsed["data"]
+                digest = item.lyrics_data["metadata"]["content_hash"]
+                if digest in seen_hashes:
+                    outcomes[item.index] = {
+                        "kind": "duplicate",
+                        "file": item.path,
+                        "duplicate_of": seen_hashes[digest],
+                        "content_hash": digest,
+                    }
+                    continue
+                seen_hashes[digest] = item.path
+                forward.append(item)
+            except Exception as e:
+                await fail(item, e)
+        return forward
+
+    async def embed(batch: List[_PipelineItem]) -> List[_PipelineItem]:
+        pending = [item for item in batch if item.lyrics_data is not None]
+        if not pending:
+            return batch
+        try:
+            vectors = await embed_lyrics_batch([item.lyrics_data for item in pending])
+        except Exception as e:
+            for item in pending:
+                await fail(item, e)
+            return [item for item in batch if item.lyrics_data is None]
+        for item, vector in zip(pending, vectors):
+            item.embedding = vector
+        return batch
+
+    async def write_one(item: _PipelineItem) -> None:
+        try:
+            if item.action is FileAction.RESUME:
+                await complete_processing(record_id=item.state.record_id)
+                done(item, item.state.record_id)
+            else:
+                result = await ingest_to_supabase(
+                    item.lyrics_data, item.embedding, item.state.record_id, "complete"
+                )
+                if result["status"] == "duplicate":
+                    outcomes[item.index] = stored_duplicate(
+                        manifest,
+                        item.state,
+                        item.path,
+                        item.lyrics_data["metadata"]["content_hash"],
+                        result["id"],
+                    )
+                else:
+                    done(item, result["id"])
+        except Exception as e:
+            reached = (
+                Stage.INGESTED if item.action is FileAction.RESUME else Stage.PENDING
+            )
+            await fail(item, e, reached)
+
+    async def write(batch: List[_PipelineItem]) -> List[_PipelineItem]:
+        fresh = [item for item in batch if item.action is FileAction.INGEST]
+        await asyncio.gather(
+            *(write_one(item) for item in batch if item.action is not FileAction.INGEST)
+        )
+        if fresh:
+            try:
+                results = await upsert_batch(
+                    [item.lyrics_data for item in fresh],
+                    [item.embedding for item in fresh],
+                )
+            except Exception as e:
+                for item in fresh:
+                    await fail(item, e)
+                return batch
+            for item, result in zip(fresh, results):
+                if result["status"] == "success":
+                    done(item, result["id"])
+                else:
+                    await fail(item, result["error"] or "ingestion failed")
+        return batch
+
+    pipeline = Pipeline(
+        [
+            PipelineStage("parse", parse, concurrency=parse_concurrency),
+            PipelineStage(
+                "embed",
+                embed,
+                concurrency=embed_concurrency,
+                batch_size=embed_batch_size,
+            ),
+            PipelineStage(
+                "write",
+                write,
+                concurrency=ingest_concurrency,
+                batch_size=write_batch_size,
+            ),
+        ]
+    )
+    await pipeline.run(
+        (_PipelineItem(index, path) for index, path in enumerate(files)),
+        report_every=30.0,
+    )
+    dropped = {"kind": "failed", "status": "failed", "error": "dropped by pipeline"}
+    ordered = [
+        outcomes.get(index, {**dropped, "file": path})
+        for index, path in enumerate(files)
+    ]
+    return ordered, pipeline.snapshot()
+
+
+def new_results(pipeline: str) -> Dict[str, Any]:
+    """Empty run report."""
+    return {
+        "pipeline": pipeline,
+        "started_at": datetime.now().isoformat(),
+        "status": "success",
+        "processed": [],
+        "failed": [],
+        "duplicates": [],
+        "catalogs": [],
+        "summary": {
+            "total": 0,
+            "successful": 0,
+            "failed": 0,
+            "duplicates": 0,
+            "unchanged": 0,
+            "catalog_rows": 0,
+            "catalog_rows_failed": 0,
+        },
+    }
+
+
+def stored_duplicate(
+    manifest: Optional[Any],
+    state: Optional[Any],
+    file_path: str,
+    digest: str,
+    record_id: str,
+) -> Dict[str, Any]:
+    """
+    Outcome for a changed file whose content is already stored as another
+    record: the file is complete, as a duplicate of that record.
+    """
+    from backend.src.services.ingest_manifest import Stage
+
+    if manifest is not None:
+        manifest.record(
+            state,
+            Stage.COMPLETE,
+            record_id=record_id,
+            content_hash=digest,
+            duplicate_of=f"lyrics:{record_id}",
+        )
+    return {
+        "kind": "duplicate",
+        "file": file_path,
+        "duplicate_of": f"lyrics:{record_id}",
+        "content_hash": digest,
+    }
+
+
+def record_duplicates(
+    manifest: Optional[Any],
+    outcomes: List[Dict[str, Any]],
+    written: Optional[Set[str]] = None,
+) -> None:
+    """
+    Mark in-run duplicates complete in the manifest once the file they
+    duplicate has been written. A duplicate of a file that failed stays
+    pending, so the next run processes it.
+
+    ``written`` collects written files across calls (retry batches).
+    """
+    if manifest is None:
+        return
+    from backend.src.services.ingest_manifest import Stage
+
+    written = set() if written is None else written
+    written.update(o["file"] for o in outcomes if o["kind"] == "processed")
+    for outcome in outcomes:
+        if outcome["kind"] != "duplicate" or outcome["duplicate_of"] not in written:
+            continue
+        try:
+            manifest.record(
+                manifest.classify(outcome["file"]),
+                Stage.COMPLETE,
+                content_hash=outcome["content_hash"],
+                duplicate_of=outcome["duplicate_of"],
+            )
+        except OSError as e:
+            logger.warning(f"Could not record duplicate {outcome['file']}: {e}")
+
+
+def collect_outcomes(
+    results: Dict[str, Any],
+    outcomes: List[Dict[str, Any]],
+    dead_letters: Optional[Any] = None,
+) -> None:
+    """
+    Add ``process_file`` outcomes to the run report, in order. Files that
+    got through are resolved in the dead-letter store.
+    """
+    prefect_logger = get_run_logger()
+    for outcome in outcomes:
+        kind = outcome.pop("kind")
+        if kind == "processed":
+            results["processed"].append({**outcome, "status": "success"})
+            results["summary"]["successful"] += 1
+        elif kind == "catalog":
+            results["catalogs"].append(outcome)
+            results["summary"]["successful"] += 1
+            results["summary"]["catalog_rows"] += outcome["rows"]
+            results["summary"]["catalog_rows_failed"] += outcome["failed"]
+        elif kind == "unchanged":
+            results["summary"]["unchanged"] += 1
+        elif kind == "duplicate":
+            results["duplicates"].append(outcome)
+            results["summary"]["duplicates"] += 1
+            prefect_logger.info(f"Skipping duplicate: {outcome['file']}")
+        else:
+            results["failed"].append(outcome)
+            results["summary"]["failed"] += 1
+            prefect_logger.warning(f"Failed to process {outcome['file']}")
+        if kind != "failed" and dead_letters is not None:
+            dead_letters.resolve(outcome["file"])
+        results["summary"]["total"] += 1
+
+
+def log_summary(results: Dict[str, Any], title: str) -> None:
+    prefect_logger = get_run_logger()
+    prefect_logger.info("=" * 60)
+    prefect_logger.info(title)
+    prefect_logger.info(f"Total: {results['summary']['total']}")
+    prefect_logger.info(f"Successful: {results['summary']['successful']}")
+    prefect_logger.info(f"Failed: {results['summary']['failed']}")
+    prefect_logger.info(f"Duplicates: {results['summary']['duplicates']}")
+    prefect_logger.info(f"Unchanged: {results['summary']['unchanged']}")
+    prefect_logger.info(
+        f"Catalog rows: {results['summary']['catalog_rows']} "
+        f"({results['summary']['catalog_rows_failed']} failed)"
+    )
+    if "dead_letters" in results:
+        prefect_logger.info(f"Dead letters: {results['dead_letters']}")
+    prefect_logger.info("=" * 60)
+
+
 @flow(name="ingestion-pipeline-v23", log_prints=True)
 async def ingestion_pipeline(
-    file_path: str = "assets/raw_lyrics", process_subdirs: bool = True
+    file_path: str = "assets/raw_lyrics",
+    process_subdirs: bool = True,
+    max_in_flight: int = 16,
+    parse_concurrency: int = 8,
+    embed_concurrency: int = 4,
+    ingest_concurrency: int = 4,
+    manifest_path: Optional[str] = ".cache/ingest_manifest.sqlite",
+    catalog_batch_size: int = 200,
+    column_map: Optional[Dict[str, str]] = None,
+    two_phase: bool = False,
+    dead_letter_path: Optional[str] = ".cache/ingest_dead_letters.sqlite",
+    pipelined: bool = True,
+    embed_batch_size: int = 32,
+    write_batch_size: int = 100,
 ) -> Dict[str, Any]:
     """
     Main ingestion pipeline for KLM v2.3.
@@ -203,9 +832,36 @@ async def ingestion_pipeline(
     Ingest lyrics files into Supabase with OpenRAG embeddings.
     Replaces old ChromaDB-based pipeline.
 
+    Lyrics files go through pipelined stages (see ``run_pipelined``):
+    parse, embed and write run at the same time, joined by bounded
+    queues, with embeddings and writes batched. With ``pipelined=False``
+    (or ``two_phase``) each file instead runs parse -> embed -> write on
+    its own: at most ``max_in_flight`` files at once, each stage with its
+    own limit; ``max_in_flight=1`` is one file at a time. Catalogs are
+    always streamed per file. Within a run the first file *parsed* with
+    a given content hash is ingested; later ones are its duplicates.
+
+    Runs are incremental through the manifest at ``manifest_path``:
+    re-running over an unchanged corpus only stats the files. Pass
+    ``manifest_path=None`` to process every file regardless.
+
     Args:
         file_path: Path to directory or file to ingest
         process_subdirs: Whether to process subdirectories
+        max_in_flight: Files processed concurrently
+        parse_concurrency: Concurrent file reads/parses
+        embed_concurrency: Concurrent embedding requests
+        ingest_concurrency: Concurrent Supabase writes (ingest + complete)
+        manifest_path: SQLite manifest of files already ingested
+        catalog_batch_size: Rows per bulk batch for CSV/TSV/JSONL catalogs
+        column_map: Lyrics field -> catalog column, e.g. {"title": "Song"}
+        two_phase: Insert as 'processing' then complete (two writes), for
+            jobs that do long-running work between the two
+        dead_letter_path: SQLite store of failed files/rows, retried by
+            ``retry_failed_ingestion``; None to only report failures
+        pipelined: Run lyrics files through the batched stage pipeline
+        embed_batch_size: Songs per embedding call (pipelined)
+        write_batch_size: Songs per upsert statement (pipelined)
 
     Returns:
         Pipeline execution result with all processed records
@@ -215,79 +871,216 @@ async def ingestion_pipeline(
     prefect_logger.info("KLM v2.3 Ingestion Pipeline Starting")
     prefect_logger.info("=" * 60)
 
-    results = {
-        "pipeline": "ingestion-pipeline-v23",
-        "started_at": datetime.now().isoformat(),
-        "status": "success",
-        "processed": [],
-        "failed": [],
-        "summary": {"total": 0, "successful": 0, "failed": 0},
-    }
+    results = new_results("ingestion-pipeline-v23")
+    seen_hashes: Dict[str, str] = {}
+    manifest = None
+    dead_letters = None
 
     try:
-        import os
-        from pathlib import Path
+        from backend.src.services.catalog_reader import catalog_format, is_source_file
+        from backend.src.services.dead_letter import DeadLetterStore
+        from backend.src.services.ingest_manifest import IngestManifest
+        from backend.src.services.resources import flow_resources
 
         target_path = Path(file_path)
         files_to_process = []
 
         if target_path.is_file():
-            if target_path.suffix in [".txt", ".csv"]:
+            if is_source_file(target_path):
                 files_to_process.append(str(target_path))
         elif target_path.is_dir():
             pattern = "**/*" if process_subdirs else "*"
             for f in target_path.glob(pattern):
-                if f.is_file() and f.suffix in [".txt", ".csv"]:
+                if f.is_file() and is_source_file(f):
                     files_to_process.append(str(f))
 
         prefect_logger.info(f"Found {len(files_to_process)} files to process")
 
-        for idx, file_path in enumerate(files_to_process, 1):
+        limits = StageLimits(
+            parse=parse_concurrency,
+            embed=embed_concurrency,
+            ingest=ingest_concurrency,
+            in_flight=max_in_flight,
+        )
+        if manifest_path:
+            manifest = IngestManifest(Path(manifest_path))
+        if dead_letter_path:
+            dead_letters = DeadLetterStore(Path(dead_letter_path))
+
+        pipelined = pipelined and not two_phase
+        staged = [
+            path
+            for path in files_to_process
+            if pipelined and not catalog_format(Path(path))
+        ]
+        staged_set = set(staged)
+        per_file = [path for path in files_to_process if path not in staged_set]
+
+        async def run_staged() -> List[Dict[str, Any]]:
+            if not staged:
+                return []
+            staged_outcomes, results["stages"] = await run_pipelined(
+                staged,
+                seen_hashes,
+                manifest,
+                dead_letters,
+                parse_concurrency,
+                embed_concurrency,
+                ingest_concurrency,
+                embed_batch_size,
+                write_batch_size,
+            )
+            return staged_outcomes
+
+        # Tasks share one warm service per worker, closed when the run ends
+        async with flow_resources():
+            staged_outcomes, per_file_outcomes = await asyncio.gather(
+                run_staged(),
+                asyncio.gather(
+                    *(
+                        process_file(
+                            path,
+                            limits,
+                            seen_hashes,
+                            manifest,
+                            catalog_batch_size,
+                            column_map,
+                            two_phase,
+                            dead_letters,
+                        )
+                        for path in per_file
+                    )
+                ),
+            )
+        by_path = dict(zip(staged, staged_outcomes))
+        by_path.update(zip(per_file, per_file_outcomes))
+        outcomes = [by_path[path] for path in files_to_process]
+
+        # gather keeps file order, so the report reads like a sequential run
+        record_duplicates(manifest, outcomes)
+        collect_outcomes(results, outcomes, dead_letters)
+        if dead_letters is not None:
+            results["dead_letters"] = dead_letters.stats()
+        for stage, metrics in results.get("stages", {}).items():
             prefect_logger.info(
-                f"Processing {idx}/{len(files_to_process)}: {file_path}"
+                f"Stage {stage}: {metrics['throughput']} items/s, "
+                f"{metrics['batches']} batches (mean {metrics['mean_batch']}), "
+                f"queue depth max {metrics['queue_depth_max']} / "
+                f"mean {metrics['queue_depth_mean']}"
             )
 
-            try:
-                parse_result = await parse_lyrics_file(file_path)
-                lyrics_data = parse_result["data"]
+    except Exception as e:
+        logger.error(f"Pipeline error: {e}")
+        results["status"] = "failed"
+        results["error"] = str(e)
+    finally:
+        if manifest is not None:
+            manifest.close()
+        if dead_letters is not None:
+            dead_letters.close()
 
-                embedding = await generate_embedding(
-                    f"{lyrics_data['title']} {lyrics_data.get('lyrics_khmer', '')}"
-                )
+    results["completed_at"] = datetime.now().isoformat()
+    log_summary(results, "Ingestion Pipeline Complete")
+    return results
 
-                ingest_result = await ingest_to_supabase(lyrics_data, embedding)
 
-                complete_result = await complete_processing(
-                    record_id=ingest_result["id"], vocabulary=None
-                )
+@flow(name="ingestion-retry-v23", log_prints=True)
+async def retry_failed_ingestion(
+    dead_letter_path: str = ".cache/ingest_dead_letters.sqlite",
+    manifest_path: Optional[str] = ".cache/ingest_manifest.sqlite",
+    batch_size: int = 50,
+    max_batches: int = 20,
+    include_parked: bool = False,
+    embed_concurrency: int = 4,
+    ingest_concurrency: int = 4,
+    two_phase: bool = False,
+) -> Dict[str, Any]:
+    """
+    Retry dead-lettered files and catalog rows whose backoff has elapsed.
 
-                results["processed"].append(
-                    {"file": file_path, "id": ingest_result["id"], "status": "success"}
-                )
-                results["summary"]["successful"] += 1
+    Due items are claimed ``batch_size`` at a time: files run through
+    ``process_file`` again (the manifest knows whether they only need an
+    update or the completion step), catalog rows are re-ingested from
+    their stored data in one bulk call. Each failure pushes the item's
+    next attempt further out; permanent errors and items out of attempts
+    are parked. Deploy this flow on an interval schedule (e.g. every 5
+    minutes) to retry continuously; runs with nothing due are cheap.
 
-            except Exception as e:
-                error_result = await handle_error(e, file_path)
-                results["failed"].append(error_result)
-                results["summary"]["failed"] += 1
-                prefect_logger.warning(f"Failed to process {file_path}")
+    Args:
+        dead_letter_path: Dead-letter store written by the ingestion flow
+        manifest_path: Ingest manifest shared with the ingestion flow
+        batch_size: Items claimed per batch
+        max_batches: Batches per run
+        include_parked: Make parked items due again first (after fixing
+            their cause)
+        embed_concurrency: Concurrent embedding requests
+        ingest_concurrency: Concurrent Supabase writes
+        two_phase: As for ``ingestion_pipeline``
 
-            results["summary"]["total"] += 1
+    Returns:
+        Run report like ``ingestion_pipeline``'s, plus retried row counts
+    """
+    from backend.src.services.dead_letter import (
+        DeadLetterStore,
+        RetryScheduler,
+        retry_rows,
+    )
+    from backend.src.services.ingest_manifest import IngestManifest
+    from backend.src.services.resources import flow_resources, worker_resources
+
+    results = new_results("ingestion-retry-v23")
+    results["summary"].update({"rows_retried": 0, "rows_recovered": 0})
+    dead_letters = DeadLetterStore(Path(dead_letter_path))
+    manifest = IngestManifest(Path(manifest_path)) if manifest_path else None
+    limits = StageLimits(
+        parse=batch_size,
+        embed=embed_concurrency,
+        ingest=ingest_concurrency,
+        in_flight=batch_size,
+    )
+    seen_hashes: Dict[str, str] = {}
+    written: Set[str] = set()
+
+    async def feed(letters) -> None:
+        files = [letter.key for letter in letters if letter.kind == "file"]
+        rows = [letter for letter in letters if letter.kind == "row"]
+        outcomes = await asyncio.gather(
+            *(
+                process_file(
+                    path,
+                    limits,
+                    seen_hashes,
+                    manifest,
+                    two_phase=two_phase,
+                    dead_letters=dead_letters,
+                )
+                for path in files
+            )
+        )
+        record_duplicates(manifest, list(outcomes), written)
+        collect_outcomes(results, list(outcomes), dead_letters)
+        if rows:
+            recovered = await retry_rows(dead_letters, worker_resources.openrag(), rows)
+            results["summary"]["rows_retried"] += len(rows)
+            results["summary"]["rows_recovered"] += recovered
 
+    try:
+        if include_parked:
+            get_run_logger().info(f"Unparked {dead_letters.reset()} dead letters")
+        async with flow_resources():
+            await RetryScheduler(dead_letters, feed, batch_size).drain(max_batches)
+        results["dead_letters"] = dead_letters.stats()
     except Exception as e:
-        logger.error(f"Pipeline error: {e}")
+        logger.error(f"Retry run error: {e}")
         results["status"] = "failed"
         results["error"] = str(e)
+    finally:
+        if manifest is not None:
+            manifest.close()
+        dead_letters.close()
 
     results["completed_at"] = datetime.now().isoformat()
-
-    prefect_logger.info("=" * 60)
-    prefect_logger.info("Ingestion Pipeline Complete")
-    prefect_logger.info(f"Total: {results['summary']['total']}")
-    prefect_logger.info(f"Successful: {results['summary']['successful']}")
-    prefect_logger.info(f"Failed: {results['summary']['failed']}")
-    prefect_logger.info("=" * 60)
-
+    log_summary(results, "Ingestion Retry Complete")
     return results
 
 
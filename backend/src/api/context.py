@@ -6,27 +6,67 @@ Agents call this to get "perfect context" for any task.
 
 Features:
 - Combines OpenRAG (documents/knowledge) + LCI (code)
-- Hybrid search with SQL filters + semantic search
+- Native in-process code index when LCI is unavailable or failing
+- Hybrid search with SQL filters + semantic search, fused with full-text/trigram
+  matches; "quoted" or lexical-mode queries skip embedding entirely
 - Automatic query expansion and reranking
+- Progressive retrieval: expansions only run while quality is below the bar
 - Context quality scoring
+- Token-budget packing with MMR diversity over item embeddings
+- Per-dependency circuit breakers; a failing source is skipped, not waited on
 
 Author: KLM v2.3
 Version: 2.3.0
 """
 
+import asyncio
 import logging
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, field
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional, Any, Set, Tuple
+from dataclasses import asdict, dataclass, field, replace
 from datetime import datetime
 from enum import Enum
+from pathlib import Path
 
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from backend.src.services.openrag_service import OpenRAGService, OpenRAGConfig
+from backend.src.services.code_index import CodeIndex, CodeMatch
+from backend.src.services.circuit_breaker import CircuitOpenError, circuit_breakers
+from backend.src.services.lci_client import (
+    LCIClient,
+    LCIClientConfig,
+    LCIStatusProbe,
+    lci_status_probe,
+)
+from backend.src.services.context_packer import pack_context
+from backend.src.services.openrag_service import (
+    OpenRAGService,
+    OpenRAGConfig,
+    SearchMode,
+    SearchProjection,
+    SearchTuning,
+    data_version,
+)
+from backend.src.services.pagination import (
+    MAX_PAGE_SIZE,
+    CandidateCache,
+    candidate_bytes,
+    Cursor,
+    CursorError,
+    fingerprint,
+    paginate,
+)
+from backend.src.utils.khmer import estimate_tokens, safe_truncate
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_ITEM_CHARS = 500
+MAX_BATCH_REQUESTS = 32  # Requests per batch/stream call
+BATCH_CONCURRENCY = 8  # Requests of one batch retrieved at a time
+REPO_ROOT = Path(__file__).resolve().parents[3]
+
 
 class ContextSource(str, Enum):
     """Source types for context retrieval."""
@@ -47,7 +87,21 @@ class ContextQuality(str, Enum):
     NONE = "none"  # No relevant context found
 
 
-@dataclass
+_QUALITY_RANK = {
+    ContextQuality.NONE: 0,
+    ContextQuality.POOR: 1,
+    ContextQuality.PARTIAL: 2,
+    ContextQuality.GOOD: 3,
+    ContextQuality.PERFECT: 4,
+}
+
+
+# Fields a ContextRequest may project; id and source are always returned.
+ITEM_FIELDS = ("title", "content", "metadata", "relevance_score", "url")
+PROJECTABLE_FIELDS = frozenset(ITEM_FIELDS + ("expanded_queries",))
+
+
+@dataclass(slots=True)
 class ContextItem:
     """A single piece of retrieved context."""
 
@@ -58,6 +112,12 @@ class ContextItem:
     metadata: Dict[str, Any]
     relevance_score: float
     url: Optional[str] = None
+    embedding: Optional[List[float]] = field(default=None, repr=False)
+    content_length: int = 0  # Full body size, even when content is projected out
+
+    def __post_init__(self) -> None:
+        if not self.content_length:
+            self.content_length = len(self.content)
 
 
 @dataclass
@@ -72,6 +132,8 @@ class RetrievedContext:
     expanded_queries: List[str]
     retrieved_at: datetime
     elapsed_ms: int
+    tokens_used: int = 0
+    next_cursor: Optional[str] = None  # Set when a paged request has more
 
 
 @dataclass
@@ -86,6 +148,43 @@ class ContextRequest:
         default_factory=lambda: [ContextSource.LYRICS, ContextSource.SESSIONS]
     )
     require_quality: ContextQuality = ContextQuality.GOOD
+    progressive: bool = True  # Stop expanding once require_quality is met
+    token_budget: Optional[int] = None  # Pack items into this many tokens
+    diversity: float = 0.3  # MMR redundancy penalty weight when packing
+    fields: Optional[List[str]] = None  # Projection; None returns every field
+    ef_search: Optional[int] = None  # HNSW recall/latency knob for this call
+    ivf_probes: Optional[int] = None  # IVFFlat recall/latency knob for this call
+    search_mode: SearchMode = SearchMode.AUTO  # LEXICAL skips embeddings
+    page_size: Optional[int] = None  # Keyset pagination; None returns one set
+    cursor: Optional[str] = None  # next_cursor of the previous page
+
+    def __post_init__(self) -> None:
+        self.tuning()  # Validates ef_search / ivf_probes
+        if self.page_size is not None and not 1 <= self.page_size <= MAX_PAGE_SIZE:
+            raise ValueError(f"page_size must be between 1 and {MAX_PAGE_SIZE}")
+        if self.cursor is not None and self.page_size is None:
+            raise ValueError("cursor requires page_size")
+        if self.fields is not None:
+            unknown = set(self.fields) - PROJECTABLE_FIELDS
+            if unknown:
+                raise ValueError(
+                    f"Unknown fields {sorted(unknown)}; "
+                    f"choose from {sorted(PROJECTABLE_FIELDS)}"
+                )
+
+    def tuning(self) -> SearchTuning:
+        """Vector index overrides for this request."""
+        return SearchTuning(ef_search=self.ef_search, ivf_probes=self.ivf_probes)
+
+    def wants(self, name: str) -> bool:
+        """True if ``name`` is part of the requested projection."""
+        return self.fields is None or name in self.fields
+
+    def page_fingerprint(self) -> str:
+        """Digest of everything but the page position; cursors are bound to it."""
+        payload = asdict(self)
+        del payload["cursor"], payload["page_size"]
+        return fingerprint(payload)
 
 
 @dataclass
@@ -97,6 +196,20 @@ class ContextResponse:
     message: str
 
 
+@dataclass
+class BatchContextRequest:
+    """Several context requests answered in one round trip."""
+
+    requests: List[ContextRequest]
+
+    def __post_init__(self) -> None:
+        if len(self.requests) > MAX_BATCH_REQUESTS:
+            raise ValueError(
+                f"A batch holds at most {MAX_BATCH_REQUESTS} requests, "
+                f"got {len(self.requests)}"
+            )
+
+
 class UnifiedContextAPI:
     """
     Unified Context API for KLM v2.3 agents.
@@ -107,22 +220,48 @@ class UnifiedContextAPI:
     - Agent sessions via OpenRAG
     """
 
-    def __init__(self, openrag_config: Optional[OpenRAGConfig] = None):
+    def __init__(
+        self,
+        openrag_config: Optional[OpenRAGConfig] = None,
+        lci_config: Optional[LCIClientConfig] = None,
+        code_index: Optional[CodeIndex] = None,
+        lci_probe: Optional[LCIStatusProbe] = None,
+    ):
         self.openrag = OpenRAGService(openrag_config)
-        self.lci_available = self._check_lci()
+        self.lci_breaker = circuit_breakers.get(
+            "lci", self.openrag.config.breaker_config()
+        )
+        self.lci = LCIClient(lci_config)
+        # Shared by every instance in the process unless one is passed in;
+        # whoever owns the probe stops it, close() leaves it running
+        self.lci_probe = lci_probe or lci_status_probe
+        self.code_index = code_index or CodeIndex(REPO_ROOT)
+        # Reranked candidates of paged requests, keyed by page_fingerprint()
+        self.page_cache: CandidateCache[Tuple[List[ContextItem], List[str]]] = (
+            CandidateCache(
+                self.openrag.config.page_cache_ttl,
+                max_bytes=self.openrag.config.page_cache_max_bytes,
+                sizeof=lambda value: candidate_bytes(value[0]),
+            )
+        )
 
-    def _check_lci(self) -> bool:
-        """Check if LCI is available for code search."""
-        try:
-            import subprocess
+    @property
+    def lci_available(self) -> bool:
+        """
+        Cached LCI availability; never blocks.
 
-            result = subprocess.run(
-                ["npx", "lci", "status"], capture_output=True, timeout=5
-            )
-            return result.returncode == 0
-        except Exception:
-            logger.warning("LCI not available, code search disabled")
-            return False
+        Probing runs in the background (see LCIStatusProbe), so until the
+        first probe completes code search uses the native code index.
+        """
+        return self.lci_probe.available is True
+
+    async def close(self) -> None:
+        """
+        Release this instance's long-lived resources (LCI bridge processes,
+        pooled provider clients).
+        """
+        await self.lci.close()
+        await self.openrag.aclose()
 
     async def retrieve(self, request: ContextRequest) -> RetrievedContext:
         """
@@ -130,56 +269,240 @@ class UnifiedContextAPI:
 
         This is the main entry point for agents needing context.
 
+        In progressive mode the original query is searched first and each
+        expansion is only issued while the accumulated context is still
+        below ``request.require_quality``.
+
+        With ``request.page_size`` set, one page of the ranked candidates
+        is returned along with ``next_cursor`` for the following page.
+
         Args:
             request: Context retrieval request
 
         Returns:
             RetrievedContext with all relevant items
+
+        Raises:
+            CursorError: ``request.cursor`` is malformed or from another query
         """
         import time
 
         start_time = time.time()
+        self.lci_probe.ensure_running()
 
-        all_items: List[ContextItem] = []
-        expanded_queries = self.openrag.expand_query(request.query)
+        if request.page_size is not None:
+            return await self._retrieve_page(request, start_time)
 
-        for query in expanded_queries:
-            if ContextSource.LYRICS in request.include_sources:
-                lyrics_items = await self._search_lyrics(query, request.filters)
-                all_items.extend(lyrics_items)
-
-            if ContextSource.SESSIONS in request.include_sources:
-                session_items = await self._search_sessions(query, request.agent_id)
-                all_items.extend(session_items)
-
-            if ContextSource.CODE in request.include_sources and self.lci_available:
-                code_items = await self._search_code(query)
-                all_items.extend(code_items)
-
-        unique_items = self._deduplicate(all_items)
+        unique_items, searched_queries, degraded = await self._gather(request)
         reranked_items = self._rerank(request.query, unique_items)
         quality = self._assess_quality(reranked_items, request.require_quality)
+        packed_items, tokens_used = self._pack(reranked_items, request)
 
         elapsed_ms = int((time.time() - start_time) * 1000)
 
         return RetrievedContext(
             query=request.query,
-            items=reranked_items,
-            total_items=len(reranked_items),
+            items=packed_items,
+            total_items=len(packed_items),
             quality=quality,
-            search_performed=request.include_sources,
-            expanded_queries=expanded_queries,
+            search_performed=[
+                s for s in self.searchable_sources(request) if s not in degraded
+            ],
+            expanded_queries=searched_queries,
             retrieved_at=datetime.now(),
             elapsed_ms=elapsed_ms,
+            tokens_used=tokens_used,
+        )
+
+    async def _retrieve_page(
+        self, request: ContextRequest, start_time: float
+    ) -> RetrievedContext:
+        """
+        One keyset page of a request's reranked candidates.
+
+        The candidates (up to ``page_candidates`` per search) are ranked
+        once and cached for ``page_cache_ttl`` seconds; later pages seek
+        past the cursor's (score, id) without searching. After expiry
+        the search is re-run and the seek continues from the same
+        boundary. Degraded results are never cached.
+
+        This pages ContextItems after the context API's own rerank, so it
+        keeps its own cache; OpenRAGService.search_page is the equivalent
+        for SearchResults.
+        """
+        import time
+
+        key = request.page_fingerprint()
+        after = Cursor.decode(request.cursor, key) if request.cursor else None
+
+        degraded: Set[ContextSource] = set()
+        cached = self.page_cache.get(key)
+        if cached is None:
+            items, searched_queries, degraded = await self._gather(
+                request, depth=self.openrag.config.page_candidates
+            )
+            ranked = self._rerank(request.query, items)
+            if not degraded:
+                self.page_cache.put(key, (ranked, searched_queries))
+        else:
+            ranked, searched_queries = cached
+
+        page, next_cursor = paginate(
+            ranked,
+            key=lambda item: (self._rank_score(item), item.id),
+            page_size=request.page_size,
+            after=after,
+            query_fingerprint=key,
+        )
+        # _pack trims content in place; keep the cached candidates intact
+        page = [replace(item) for item in page]
+        quality = self._assess_quality(page, request.require_quality)
+        packed_items, tokens_used = self._pack(page, request)
+
+        return RetrievedContext(
+            query=request.query,
+            items=packed_items,
+            total_items=len(packed_items),
+            quality=quality,
+            search_performed=[
+                s for s in self.searchable_sources(request) if s not in degraded
+            ],
+            expanded_queries=searched_queries,
+            retrieved_at=datetime.now(),
+            elapsed_ms=int((time.time() - start_time) * 1000),
+            tokens_used=tokens_used,
+            next_cursor=next_cursor,
+        )
+
+    def searchable_sources(self, request: ContextRequest) -> List[ContextSource]:
+        """
+        Requested sources this request's search mode can search: lexical
+        search only covers lyrics, so sessions are left out in that mode.
+        """
+        mode = self.openrag.resolve_search_mode(request.query, request.search_mode)
+        return [
+            source
+            for source in request.include_sources
+            if not (mode is SearchMode.LEXICAL and source is ContextSource.SESSIONS)
+        ]
+
+    async def _gather(
+        self, request: ContextRequest, depth: Optional[int] = None
+    ) -> Tuple[List[ContextItem], List[str], Set[ContextSource]]:
+        """
+        Run the (progressive) search rounds for a request.
+
+        ``depth`` raises the number of candidates fetched per search.
+        Returns the unique items in discovery order, the queries searched
+        and the sources skipped because their circuit was open or whose
+        search failed.
+        """
+        unique_items: List[ContextItem] = []
+        seen_ids: Set[str] = set()
+        total_relevance = 0.0
+        has_content = True
+        searched_queries: List[str] = []
+        mode = self.openrag.resolve_search_mode(request.query, request.search_mode)
+        expanded_queries = [request.query]
+        if mode is not SearchMode.LEXICAL:
+            expanded_queries += [
+                q
+                for q in self.openrag.expand_query(request.query)
+                if q != request.query
+            ]
+        degraded: Set[ContextSource] = set()
+
+        projection = SearchProjection(
+            include_content=request.wants("content"),
+            include_embedding=request.wants("content")
+            and request.token_budget is not None,
         )
+        tuning = request.tuning()
+
+        def mode_for(query: str) -> SearchMode:
+            # Expansion terms only help semantic recall; match text lexically once
+            return mode if query == request.query else SearchMode.VECTOR
+
+        searches = {
+            ContextSource.LYRICS: lambda q: self._search_lyrics(
+                q,
+                request.filters,
+                projection,
+                request.wants("metadata"),
+                tuning,
+                mode_for(q),
+                depth,
+            ),
+            ContextSource.SESSIONS: lambda q: self._search_sessions(
+                q,
+                request.agent_id,
+                projection,
+                request.wants("metadata"),
+                tuning,
+                mode_for(q),
+                depth,
+            ),
+            ContextSource.CODE: self._search_code,
+        }
+
+        sources = self.searchable_sources(request)
+        for query in expanded_queries:
+            searched_queries.append(query)
+            for source, search in searches.items():
+                if source not in sources or source in degraded:
+                    continue
+                errors = self.openrag.search_errors
+                try:
+                    found = await search(query)
+                except CircuitOpenError as e:
+                    logger.warning(f"Skipping {source.value} context: {e}")
+                    degraded.add(source)
+                    continue
+                if self.openrag.search_errors != errors:
+                    # Failed and answered with nothing (or a concurrent
+                    # search failed): don't cache or ETag this result
+                    degraded.add(source)
+
+                for item in found:
+                    if item.id in seen_ids:
+                        continue
+                    seen_ids.add(item.id)
+                    unique_items.append(item)
+                    total_relevance += item.relevance_score
+                    has_content = has_content and item.content_length > 50
+
+            if request.progressive and self._meets_quality(
+                self._quality_from_stats(
+                    len(unique_items), total_relevance, has_content
+                ),
+                request.require_quality,
+            ):
+                break
+
+        return unique_items, searched_queries, degraded
 
     async def _search_lyrics(
-        self, query: str, filters: Optional[Dict[str, str]]
+        self,
+        query: str,
+        filters: Optional[Dict[str, str]],
+        projection: Optional[SearchProjection] = None,
+        include_metadata: bool = True,
+        tuning: Optional[SearchTuning] = None,
+        mode: SearchMode = SearchMode.AUTO,
+        depth: Optional[int] = None,
     ) -> List[ContextItem]:
         """Search lyrics via OpenRAG."""
         try:
             results = await self.openrag.hybrid_search(
-                query=query, filters=filters, include_sessions=False
+                query=query,
+                filters=filters,
+                include_sessions=False,
+                expand=False,
+                projection=projection,
+                tuning=tuning,
+                mode=mode,
+                top_k=depth,
+                match_count=depth,
             )
 
             return [
@@ -187,102 +510,182 @@ class UnifiedContextAPI:
                     id=r.id,
                     source=ContextSource.LYRICS,
                     title=r.title,
-                    content=r.content[:500],
-                    metadata=r.metadata,
+                    content=r.content,
+                    metadata=r.metadata if include_metadata else {},
                     relevance_score=r.similarity,
+                    embedding=r.embedding,
+                    content_length=r.content_length,
                 )
                 for r in results
             ]
+        except CircuitOpenError:
+            raise
         except Exception as e:
             logger.error(f"Lyrics search failed: {e}")
+            self.openrag.search_errors += 1
             return []
 
     async def _search_sessions(
-        self, query: str, agent_id: Optional[str]
+        self,
+        query: str,
+        agent_id: Optional[str],
+        projection: Optional[SearchProjection] = None,
+        include_metadata: bool = True,
+        tuning: Optional[SearchTuning] = None,
+        mode: SearchMode = SearchMode.AUTO,
+        depth: Optional[int] = None,
     ) -> List[ContextItem]:
         """Search agent sessions via OpenRAG."""
         try:
             filters = {"agent_id": agent_id} if agent_id else None
             results = await self.openrag.hybrid_search(
-                query=query, filters=filters, include_lyrics=False
+                query=query,
+                filters=filters,
+                include_lyrics=False,
+                expand=False,
+                projection=projection,
+                tuning=tuning,
+                mode=mode,
+                top_k=depth,
+                match_count=depth,
             )
 
             return [
                 ContextItem(
                     id=r.id,
                     source=ContextSource.SESSIONS,
-                    title=f"Session: {r.metadata.get('task_description', 'Unknown')}",
-                    content=r.metadata.get("summary", "")[:500],
-                    metadata=r.metadata,
+                    title=f"Session: {r.title}",
+                    content=r.content,
+                    metadata=r.metadata if include_metadata else {},
                     relevance_score=r.similarity,
+                    content_length=r.content_length,
                 )
                 for r in results
             ]
+        except CircuitOpenError:
+            raise
         except Exception as e:
             logger.error(f"Session search failed: {e}")
+            self.openrag.search_errors += 1
             return []
 
     async def _search_code(self, query: str) -> List[ContextItem]:
-        """Search code via LCI."""
-        try:
-            import subprocess
-
-            result = subprocess.run(
-                ["npx", "lci", "search", query],
-                capture_output=True,
-                text=True,
-                timeout=30,
-            )
-
-            if result.returncode != 0:
-                return []
+        """Search code via LCI, falling back to the native code index."""
+        if self.lci_available:
+            try:
+                lines = await self.lci_breaker.call(self.lci.search, query)
+                return [
+                    ContextItem(
+                        id=f"code_{i}",
+                        source=ContextSource.CODE,
+                        title=f"Code match: {line[:50]}" if line else "Code match",
+                        content=line,
+                        metadata={"source": "lci"},
+                        relevance_score=0.7,
+                    )
+                    for i, line in enumerate(lines[:10])
+                    if line
+                ]
+            except Exception as e:
+                logger.warning(f"LCI code search failed, using code index: {e}")
 
-            lines = result.stdout.strip().split("\n")
-            return [
-                ContextItem(
-                    id=f"code_{i}",
-                    source=ContextSource.CODE,
-                    title=f"Code match: {line[:50]}" if line else "Code match",
-                    content=line,
-                    metadata={"source": "lci"},
-                    relevance_score=0.7,
-                )
-                for i, line in enumerate(lines[:10])
-                if line
-            ]
+        try:
+            matches = await asyncio.to_thread(self._search_code_index, query)
         except Exception as e:
             logger.error(f"Code search failed: {e}")
             return []
 
-    def _deduplicate(self, items: List[ContextItem]) -> List[ContextItem]:
-        """Remove duplicate items by ID."""
-        seen = set()
-        unique = []
-        for item in items:
-            if item.id not in seen:
-                seen.add(item.id)
-                unique.append(item)
-        return unique
+        return [
+            ContextItem(
+                id=f"code:{m.symbol.key}",
+                source=ContextSource.CODE,
+                title=f"{m.symbol.kind} {m.symbol.qualname} "
+                f"({m.symbol.path}:{m.symbol.line})",
+                content="\n".join(
+                    part for part in (m.symbol.signature, m.symbol.docstring) if part
+                ),
+                metadata={
+                    "source": "code_index",
+                    "path": m.symbol.path,
+                    "line": m.symbol.line,
+                    "kind": m.symbol.kind,
+                },
+                relevance_score=m.score,
+            )
+            for m in matches
+        ]
+
+    def _search_code_index(self, query: str) -> List[CodeMatch]:
+        """Refresh (at most every refresh_interval) and query the code index."""
+        self.code_index.refresh()
+        return self.code_index.search(query)
 
-    def _rerank(self, query: str, items: List[ContextItem]) -> List[ContextItem]:
-        """Rerank items by true relevance."""
+    def _pack(
+        self, items: List[ContextItem], request: ContextRequest
+    ) -> Tuple[List[ContextItem], int]:
+        """
+        Fit reranked items into the request's token budget.
 
-        def relevance_score(item: ContextItem) -> float:
-            base = item.relevance_score
-            quality_bonus = 0.1 if len(item.content) > 200 else 0.0
-            return base + quality_bonus
+        Without a budget every item is kept and cut to
+        ``DEFAULT_ITEM_CHARS``; with one, items are chosen by MMR so
+        near-duplicates give way to distinct context.
+        """
+        if not request.wants("content"):
+            for item in items:
+                item.content = ""
+                item.embedding = None
+            return items, 0
+
+        if request.token_budget is None:
+            for item in items:
+                item.content = safe_truncate(item.content, DEFAULT_ITEM_CHARS)
+                item.embedding = None
+            return items, sum(estimate_tokens(i.content) for i in items)
+
+        result = pack_context(
+            contents=[i.content for i in items],
+            relevance=[i.relevance_score for i in items],
+            embeddings=[i.embedding for i in items],
+            token_budget=request.token_budget,
+            diversity=request.diversity,
+        )
+        packed = []
+        for index, content in zip(result.order, result.contents):
+            item = items[index]
+            item.content = content
+            item.embedding = None
+            packed.append(item)
+        return packed, result.tokens_used
+
+    @staticmethod
+    def _rank_score(item: ContextItem) -> float:
+        """Relevance plus a bonus for substantial content."""
+        quality_bonus = 0.1 if item.content_length > 200 else 0.0
+        return item.relevance_score + quality_bonus
 
-        return sorted(items, key=relevance_score, reverse=True)
+    def _rerank(self, query: str, items: List[ContextItem]) -> List[ContextItem]:
+        """Rerank items by true relevance; ties break on id (a total order)."""
+        return sorted(items, key=lambda item: (-self._rank_score(item), item.id))
 
     def _assess_quality(
         self, items: List[ContextItem], required: ContextQuality
     ) -> ContextQuality:
         """Assess the quality of retrieved context."""
-        if not items:
+        return self._quality_from_stats(
+            len(items),
+            sum(i.relevance_score for i in items),
+            all(i.content_length > 50 for i in items),
+        )
+
+    @staticmethod
+    def _quality_from_stats(
+        count: int, total_relevance: float, has_content: bool
+    ) -> ContextQuality:
+        """Quality from running totals, so it can be updated per search round."""
+        if not count:
             return ContextQuality.NONE
 
-        avg_relevance = sum(i.relevance_score for i in items) / len(items)
-        has_content = all(len(i.content) > 50 for i in items)
+        avg_relevance = total_relevance / count
 
         if avg_relevance > 0.85 and has_content:
             return ContextQuality.PERFECT
@@ -293,17 +696,42 @@ class UnifiedContextAPI:
         else:
             return ContextQuality.POOR
 
+    @staticmethod
+    def _meets_quality(quality: ContextQuality, required: ContextQuality) -> bool:
+        """True if ``quality`` is at least as good as ``required``."""
+        return _QUALITY_RANK[quality] >= _QUALITY_RANK[required]
+
 
 def create_context_api() -> FastAPI:
     """Create FastAPI app for Unified Context API."""
+    from backend.src.api.serialization import (
+        ContextJSONResponse,
+        body_etag,
+        context_response_to_dict,
+        dumps,
+        etag_matches,
+        negotiated_response,
+        not_modified,
+        projection,
+        request_etag,
+    )
+
+    context_api = UnifiedContextAPI()
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        context_api.lci_probe.ensure_running()
+        yield
+        await context_api.close()
+        await context_api.lci_probe.stop()
+
     app = FastAPI(
         title="KLM v2.3 Unified Context API",
         description="Single endpoint for agent context retrieval",
         version="2.3.0",
+        lifespan=lifespan,
     )
 
-    context_api = UnifiedContextAPI()
-
     @app.get("/health")
     async def health_check():
         """Health check endpoint."""
@@ -312,10 +740,18 @@ def create_context_api() -> FastAPI:
             "status": "healthy",
             "openrag": openrag_health,
             "lci": context_api.lci_available,
+            "lci_status": context_api.lci_probe.status(),
+            "lci_pool": context_api.lci.stats(),
+            "code_index": context_api.code_index.stats(),
+            "circuits": circuit_breakers.snapshot(),
         }
 
-    @app.post("/context/retrieve")
-    async def retrieve_context(request: ContextRequest) -> ContextResponse:
+    @app.post(
+        "/context/retrieve",
+        response_model=ContextResponse,
+        response_class=ContextJSONResponse,
+    )
+    async def retrieve_context(request: ContextRequest, http_request: Request):
         """
         Retrieve context for an agent query.
 
@@ -328,24 +764,94 @@ def create_context_api() -> FastAPI:
             "include_sources": ["lyrics", "sessions"]
         }
         ```
+
+        Responses carry a weak ETag tied to the lyrics/session data version;
+        a repeat request with If-None-Match gets 304 without searching.
+        Requests including the code source are not cached this way.
         """
+        etag = None
+        if ContextSource.CODE not in request.include_sources:
+            etag = request_etag(
+                request, await data_version.token(lambda: context_api.openrag.client)
+            )
+            if etag_matches(http_request, etag):
+                return not_modified(etag)
+
         try:
             context = await context_api.retrieve(request)
-            return ContextResponse(
-                context=context,
-                success=True,
-                message=f"Retrieved {context.total_items} context items",
+            if len(context.search_performed) < len(
+                context_api.searchable_sources(request)
+            ):
+                etag = None  # Degraded result; don't let clients cache it
+            return negotiated_response(
+                ContextResponse(
+                    context=context,
+                    success=True,
+                    message=f"Retrieved {context.total_items} context items",
+                ),
+                http_request,
+                etag,
+                projection(request),
             )
+        except CursorError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
         except Exception as e:
             logger.error(f"Context retrieval failed: {e}")
             raise HTTPException(
                 status_code=500, detail=f"Context retrieval failed: {str(e)}"
             )
 
+    async def retrieve_one(
+        request: ContextRequest, limit: asyncio.Semaphore
+    ) -> Dict[str, Any]:
+        """Encoded response for one request of a batch; errors stay per-item."""
+        try:
+            async with limit:
+                context = await context_api.retrieve(request)
+            response = ContextResponse(
+                context=context,
+                success=True,
+                message=f"Retrieved {context.total_items} context items",
+            )
+            return context_response_to_dict(response, projection(request))
+        except Exception as e:
+            logger.error(f"Context retrieval failed: {e}")
+            return {"context": None, "success": False, "message": str(e)}
+
+    @app.post("/context/retrieve/batch")
+    async def retrieve_context_batch(batch: BatchContextRequest, http_request: Request):
+        """Retrieve context for several requests concurrently, in request order."""
+        limit = asyncio.Semaphore(BATCH_CONCURRENCY)
+        results = await asyncio.gather(
+            *(retrieve_one(r, limit) for r in batch.requests)
+        )
+        return negotiated_response({"responses": results}, http_request)
+
+    @app.post("/context/retrieve/stream")
+    async def retrieve_context_stream(batch: BatchContextRequest):
+        """
+        Stream batch results as NDJSON, one line per request as it finishes.
+
+        Each line is a ContextResponse plus the request's ``index``.
+        """
+
+        async def lines():
+            limit = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+            async def indexed(index: int, request: ContextRequest):
+                return index, await retrieve_one(request, limit)
+
+            tasks = [indexed(i, r) for i, r in enumerate(batch.requests)]
+            for next_done in asyncio.as_completed(tasks):
+                index, result = await next_done
+                yield dumps({"index": index, **result}) + b"\n"
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
     @app.get("/context/sources")
-    async def list_sources() -> Dict[str, Any]:
-        """List available context sources."""
-        return {
+    async def list_sources(http_request: Request):
+        """List available context sources (ETag-cached)."""
+        payload = {
             "sources": [
                 {
                     "name": "lyrics",
@@ -359,11 +865,15 @@ def create_context_api() -> FastAPI:
                 },
                 {
                     "name": "code",
-                    "description": "Codebase semantic search (LCI)",
-                    "enabled": context_api.lci_available,
+                    "description": "Codebase search (LCI, native code index fallback)",
+                    "enabled": True,
                 },
             ]
         }
+        etag = body_etag(dumps(payload))
+        if etag_matches(http_request, etag):
+            return not_modified(etag)
+        return negotiated_response(payload, http_request, etag)
 
     return app
 
@@ -374,14 +884,15 @@ def get_context_for_agent(
     """
     Convenience function for getting agent context.
 
+    Runs on the process-wide ContextClient, so repeated calls share one
+    UnifiedContextAPI and event loop instead of rebuilding them.
+
     Usage:
         context = get_context_for_agent(
             query="How to implement Romanization?",
             agent_id="AGT-002"
         )
     """
-    import asyncio
+    from backend.src.api.context_client import get_context_client
 
-    api = UnifiedContextAPI()
-    request = ContextRequest(query=query, agent_id=agent_id, task_type=task_type)
-    return asyncio.run(api.retrieve(request))
+    return get_context_client().get_context(query, agent_id, task_type)
@@ -0,0 +1,139 @@
+"""
+Context Client - Long-lived synchronous facade over the Unified Context API
+
+Synchronous agent code used to build a fresh UnifiedContextAPI (Supabase
+client, LCI probe) and a fresh event loop via ``asyncio.run`` for every
+lookup. ContextClient keeps one event loop running on a daemon thread and
+one shared UnifiedContextAPI, so a sync call only pays for retrieval.
+
+Usage:
+    client = get_context_client()
+    context = client.retrieve(ContextRequest(query="...", agent_id="AGT-002"))
+    future = client.submit(ContextRequest(query="...", agent_id="AGT-002"))
+
+Author: KLM v2.3
+Version: 2.3.0
+"""
+
+import asyncio
+import atexit
+import logging
+import threading
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Coroutine, List, Optional
+
+from backend.src.api.context import ContextRequest, RetrievedContext, UnifiedContextAPI
+
+logger = logging.getLogger(__name__)
+
+
+class ContextClient:
+    """
+    Thread-safe blocking client backed by a background event loop.
+
+    All async work (Supabase calls, LCI bridge, background probes) runs on
+    the client's own loop thread; callers on any thread get either a
+    blocking result or a ``concurrent.futures.Future``.
+    """
+
+    def __init__(
+        self,
+        api_factory: Callable[[], UnifiedContextAPI] = UnifiedContextAPI,
+    ):
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._run_loop, name="context-client-loop", daemon=True
+        )
+        self._closed = False
+        self._thread.start()
+        self.api: UnifiedContextAPI = self._call(self._create(api_factory))
+
+    def _run_loop(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    @staticmethod
+    async def _create(
+        api_factory: Callable[[], UnifiedContextAPI],
+    ) -> UnifiedContextAPI:
+        # Built on the loop thread so loop-bound state is created there
+        return api_factory()
+
+    def _submit(self, coro: Coroutine[Any, Any, Any]) -> Future:
+        if self._closed:
+            coro.close()
+            raise RuntimeError("ContextClient is closed")
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def _call(
+        self, coro: Coroutine[Any, Any, Any], timeout: Optional[float] = None
+    ) -> Any:
+        future = self._submit(coro)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            future.cancel()  # Stops the coroutine on the loop too
+            raise
+
+    def submit(self, request: ContextRequest) -> "Future[RetrievedContext]":
+        """Start a retrieval and return a concurrent.futures.Future."""
+        return self._submit(self.api.retrieve(request))
+
+    def retrieve(
+        self, request: ContextRequest, timeout: Optional[float] = None
+    ) -> RetrievedContext:
+        """Blocking retrieval."""
+        return self._call(self.api.retrieve(request), timeout)
+
+    def retrieve_many(
+        self, requests: List[ContextRequest], timeout: Optional[float] = None
+    ) -> List[RetrievedContext]:
+        """Run several retrievals concurrently on the loop and wait for all."""
+
+        async def gather() -> List[RetrievedContext]:
+            return list(await asyncio.gather(*(self.api.retrieve(r) for r in requests)))
+
+        return self._call(gather(), timeout)
+
+    def get_context(
+        self, query: str, agent_id: str, task_type: Optional[str] = None
+    ) -> RetrievedContext:
+        """Blocking retrieval from plain arguments."""
+        return self.retrieve(
+            ContextRequest(query=query, agent_id=agent_id, task_type=task_type)
+        )
+
+    async def _shutdown(self) -> None:
+        await self.api.close()
+        # The probe task runs on this client's loop, which is about to
+        # close; the next user of the probe restarts it on its own loop
+        await self.api.lci_probe.stop()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Close the shared API and stop the loop thread."""
+        if self._closed:
+            return
+        try:
+            self._call(self._shutdown(), timeout)
+        except Exception as e:
+            logger.warning(f"Context client shutdown failed: {e}")
+        self._closed = True
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            self._loop.close()
+
+
+_client: Optional[ContextClient] = None
+_client_lock = threading.Lock()
+
+
+def get_context_client() -> ContextClient:
+    """Return the process-wide ContextClient, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None or _client._closed:
+            _client = ContextClient()
+            atexit.register(_client.close)
+        return _client
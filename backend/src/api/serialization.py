@@ -0,0 +1,225 @@
+"""
+Serialization - Fast JSON encoding for Unified Context API responses
+
+FastAPI's default path walks responses through ``jsonable_encoder`` and
+the stdlib encoder. Context responses are the hottest payload we send,
+so they get hand-written encoders for their known shape (no reflection,
+no deep copies, embeddings never emitted) and orjson when it is installed.
+
+Also handles HTTP-level savings for those responses:
+- Content-Encoding negotiation (zstd when ``zstandard`` is installed, gzip)
+- Weak ETags derived from the request and the data version, so repeat
+  polls are answered with 304 before any search runs
+
+Author: KLM v2.3
+Version: 2.3.0
+"""
+
+import gzip
+import hashlib
+import json
+from dataclasses import asdict
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from backend.src.api.context import (
+    ITEM_FIELDS,
+    ContextItem,
+    ContextRequest,
+    ContextResponse,
+    RetrievedContext,
+)
+
+MIN_COMPRESS_BYTES = 1024
+GZIP_LEVEL = 5
+ZSTD_LEVEL = 3
+
+
+@lru_cache(maxsize=64)
+def item_encoder(
+    fields: Optional[FrozenSet[str]] = None,
+) -> Callable[[ContextItem], Dict[str, Any]]:
+    """
+    Build (once per projection) an encoder for ContextItem.
+
+    The embedding is internal and never emitted; id and source always are.
+    """
+    selected = tuple(f for f in ITEM_FIELDS if fields is None or f in fields)
+
+    def encode(item: ContextItem) -> Dict[str, Any]:
+        data = {"id": item.id, "source": item.source.value}
+        for name in selected:
+            data[name] = getattr(item, name)
+        return data
+
+    return encode
+
+
+def context_item_to_dict(
+    item: ContextItem, fields: Optional[FrozenSet[str]] = None
+) -> Dict[str, Any]:
+    """Encode a ContextItem."""
+    return item_encoder(fields)(item)
+
+
+def retrieved_context_to_dict(
+    context: RetrievedContext, fields: Optional[FrozenSet[str]] = None
+) -> Dict[str, Any]:
+    """Encode a RetrievedContext, honouring a field projection."""
+    encode = item_encoder(fields)
+    data = {
+        "query": context.query,
+        "items": [encode(i) for i in context.items],
+        "total_items": context.total_items,
+        "quality": context.quality.value,
+        "search_performed": [s.value for s in context.search_performed],
+        "retrieved_at": context.retrieved_at.isoformat(),
+        "elapsed_ms": context.elapsed_ms,
+        "tokens_used": context.tokens_used,
+        "next_cursor": context.next_cursor,
+    }
+    if fields is None or "expanded_queries" in fields:
+        data["expanded_queries"] = context.expanded_queries
+    return data
+
+
+def context_response_to_dict(
+    response: ContextResponse, fields: Optional[FrozenSet[str]] = None
+) -> Dict[str, Any]:
+    """Encode a ContextResponse."""
+    return {
+        "context": retrieved_context_to_dict(response.context, fields),
+        "success": response.success,
+        "message": response.message,
+    }
+
+
+def projection(request: ContextRequest) -> Optional[FrozenSet[str]]:
+    """Hashable projection key for a request (None means every field)."""
+    return frozenset(request.fields) if request.fields is not None else None
+
+
+def _default(value: Any) -> Any:
+    """Fallback for values inside free-form metadata."""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(payload: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default)
+    return json.dumps(
+        payload, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class ContextJSONResponse(Response):
+    """JSON response that encodes context payloads via the fast path."""
+
+    media_type = "application/json"
+
+    def __init__(
+        self,
+        content: Any,
+        fields: Optional[FrozenSet[str]] = None,
+        **kwargs: Any,
+    ):
+        self.fields = fields
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, ContextResponse):
+            content = context_response_to_dict(content, self.fields)
+        return dumps(content)
+
+
+def request_etag(request: ContextRequest, version: str) -> str:
+    """Weak ETag for a retrieval request at a given data version."""
+    if orjson is not None:
+        canonical = orjson.dumps(asdict(request), option=orjson.OPT_SORT_KEYS)
+    else:
+        canonical = json.dumps(asdict(request), sort_keys=True).encode("utf-8")
+    digest = hashlib.sha1(canonical).hexdigest()[:16]
+    return f'W/"{version}-{digest}"'
+
+
+def body_etag(body: bytes) -> str:
+    """Weak ETag from an encoded response body."""
+    return f'W/"{hashlib.sha1(body).hexdigest()[:16]}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the client's If-None-Match already holds ``etag``."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    candidates = {tag.strip() for tag in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def not_modified(etag: str) -> Response:
+    """Empty 304 response carrying the ETag."""
+    return Response(status_code=304, headers={"ETag": etag, "Vary": "Accept-Encoding"})
+
+
+def _accepted_encodings(request: Request) -> Dict[str, float]:
+    accepted: Dict[str, float] = {}
+    for part in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        quality = 1.0
+        if params.strip().startswith("q="):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.lower()] = quality
+    return accepted
+
+
+def negotiated_response(
+    content: Any,
+    request: Request,
+    etag: Optional[str] = None,
+    fields: Optional[FrozenSet[str]] = None,
+) -> Response:
+    """
+    Encode ``content`` and compress it for the client.
+
+    Picks zstd over gzip when both are acceptable; bodies smaller than
+    MIN_COMPRESS_BYTES are sent as-is.
+    """
+    response = ContextJSONResponse(content, fields)
+    headers = {"Vary": "Accept-Encoding"}
+    if etag is not None:
+        headers["ETag"] = etag
+
+    body = response.body
+    if len(body) >= MIN_COMPRESS_BYTES:
+        accepted = _accepted_encodings(request)
+        if zstandard is not None and accepted.get("zstd", 0) > 0:
+            body = zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(body)
+            headers["Content-Encoding"] = "zstd"
+        elif accepted.get("gzip", 0) > 0:
+            body = gzip.compress(body, compresslevel=GZIP_LEVEL)
+            headers["Content-Encoding"] = "gzip"
+
+    return Response(content=body, media_type=response.media_type, headers=headers)
@@ -0,0 +1,280 @@
+"""
+Catalog Reader - Streaming CSV/TSV/JSONL lyrics catalogs for KLM v2.3
+
+Catalog exports hold one lyric per row. Rows are read one at a time
+(the file is never loaded whole) and mapped onto lyrics table columns,
+so a multi-gigabyte export flows into bulk ingestion in fixed-size
+batches with constant memory.
+
+Columns are matched by a mapping of lyrics field -> source column; by
+default common names are recognised case-insensitively (``song`` ->
+title, ``singer`` -> artist, ``lyrics`` -> lyrics_khmer, ...). Source
+columns that map to no field are kept under ``metadata``.
+
+Single-lyric ``.txt`` files (``Title_Artist.txt``) are read here too, so
+the ingestion flow and the watch-folder daemon parse sources alike.
+
+Author: KLM v2.3
+Version: 2.3.0
+"""
+
+import csv
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+from backend.src.services.dead_letter import IngestInputError
+from backend.src.services.openrag_service import lyrics_content_hash
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+CATALOG_SUFFIXES = {".csv": "csv", ".tsv": "tsv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+LYRICS_FILE_SUFFIXES = {".txt"}
+MAX_REPORTED_ROW_ERRORS = 100
+
+# Lyrics table columns a catalog row may fill, with recognised source names
+FIELD_ALIASES: Dict[str, List[str]] = {
+    "title": ["title", "song", "song_title", "name"],
+    "artist": ["artist", "singer", "performer"],
+    "album": ["album"],
+    "era": ["era", "decade"],
+    "genre": ["genre"],
+    "lyrics_khmer": ["lyrics_khmer", "lyrics", "khmer", "text", "body"],
+    "lyrics_romanized": ["lyrics_romanized", "romanized", "romanization"],
+    "lyrics_english": ["lyrics_english", "english", "translation"],
+}
+REQUIRED_FIELDS = ("title",)
+
+# Lyrics can be long; the csv module's 128 KiB default field limit is not
+MAX_FIELD_BYTES = 16 * 1024 * 1024
+
+
+@dataclass
+class CatalogRow:
+    """One catalog row: mapped lyrics data, or why it could not be mapped."""
+
+    source: str
+    row: int  # 1-based record number (line number for JSONL)
+    data: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class ColumnMapping:
+    """Lyrics field -> source column; unspecified fields use the aliases."""
+
+    columns: Dict[str, str] = field(default_factory=dict)
+
+    def __post_init__(self) -> None:
+        unknown = set(self.columns) - set(FIELD_ALIASES)
+        if unknown:
+            raise ValueError(
+                f"Unknown lyrics fields {sorted(unknown)}; "
+                f"choose from {sorted(FIELD_ALIASES)}"
+            )
+
+    def resolve(self, header: Iterable[str]) -> Dict[str, str]:
+        """Source column for each field present in ``header``."""
+        by_name = {name.strip().lower(): name for name in header}
+        resolved = {}
+        for lyric_field, aliases in FIELD_ALIASES.items():
+            wanted = self.columns.get(lyric_field)
+            candidates = [wanted] if wanted else aliases
+            for candidate in candidates:
+                source = by_name.get(candidate.strip().lower())
+                if source is not None:
+                    resolved[lyric_field] = source
+                    break
+        return resolved
+
+
+def catalog_format(path: Path) -> Optional[str]:
+    """``csv`` / ``tsv`` / ``jsonl`` for catalog files, else None."""
+    return CATALOG_SUFFIXES.get(Path(path).suffix.lower())
+
+
+def is_source_file(path: Path) -> bool:
+    """True for files ingestion reads (lyrics .txt or a catalog)."""
+    suffix = Path(path).suffix.lower()
+    return suffix in LYRICS_FILE_SUFFIXES or suffix in CATALOG_SUFFIXES
+
+
+def read_lyrics_file(file_path: str) -> Dict[str, Any]:
+    """
+    One lyric from a ``Title_Artist.txt`` file (the body is Khmer lyrics).
+
+    Raises:
+        OSError: If the file cannot be read
+        IngestInputError: If the file is not UTF-8 text
+    """
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            content = f.read()
+    except UnicodeDecodeError as e:
+        raise IngestInputError(f"{file_path} is not UTF-8 text: {e}") from e
+
+    filename = os.path.basename(file_path)
+    filename_parts = filename.replace(".txt", "").split("_")
+
+    lyrics_data = {
+        "title": filename_parts[0] if filename_parts else "Unknown",
+        "artist": filename_parts[1] if len(filename_parts) > 1 else "Unknown",
+        "lyrics_khmer": content,
+        "metadata": {
+            "source_file": file_path,
+            "processed_at": datetime.now().isoformat(),
+        },
+    }
+    lyrics_data["metadata"]["content_hash"] = lyrics_content_hash(lyrics_data)
+    return lyrics_data
+
+
+def _map_row(
+    values: Dict[str, Any], resolved: Dict[str, str], source: str, row: int
+) -> CatalogRow:
+    data: Dict[str, Any] = {}
+    for lyric_field, column in resolved.items():
+        value = values.get(column)
+        if isinstance(value, str):
+            value = value.strip()
+        if value not in (None, ""):
+            data[lyric_field] = value
+    missing = [f for f in REQUIRED_FIELDS if f not in data]
+    if missing:
+        return CatalogRow(source, row, error=f"missing {', '.join(missing)}")
+
+    # JSONL rows may carry a metadata object; other unmapped columns join it
+    nested = values.get("metadata")
+    metadata = dict(nested) if isinstance(nested, dict) else {}
+    used = set(resolved.values())
+    for column, value in values.items():
+        if column in used or value in (None, "") or value is nested:
+            continue
+        metadata[column] = value
+    metadata.update({"source_file": source, "source_row": row})
+    data["metadata"] = metadata
+    return CatalogRow(source, row, data=data)
+
+
+def iter_catalog(
+    path: Path,
+    mapping: Optional[ColumnMapping] = None,
+    fmt: Optional[str] = None,
+    encoding: str = "utf-8-sig",
+) -> Iterator[CatalogRow]:
+    """
+    Stream a catalog file row by row.
+
+    Malformed rows are yielded with ``error`` set instead of stopping the
+    stream, so callers can report them per row.
+
+    Raises:
+        IngestInputError: If the format is unknown
+        OSError: If the file cannot be opened
+    """
+    path = Path(path)
+    fmt = fmt or catalog_format(path)
+    mapping = mapping or ColumnMapping()
+    source = str(path)
+    if fmt not in ("csv", "tsv", "jsonl"):
+        raise IngestInputError(f"Not a catalog file: {path}")
+
+    with open(path, "r", encoding=encoding, newline="") as f:
+        if fmt == "jsonl":
+            for row, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    values = json.loads(line)
+                    if not isinstance(values, dict):
+                        raise ValueError("row is not an object")
+                except ValueError as e:
+                    yield CatalogRow(source, row, error=f"invalid JSON: {e}")
+                    continue
+                yield _map_row(values, mapping.resolve(values), source, row)
+            return
+
+        csv.field_size_limit(max(csv.field_size_limit(), MAX_FIELD_BYTES))
+        reader = csv.DictReader(f, delimiter="\t" if fmt == "tsv" else ",")
+        resolved = mapping.resolve(reader.fieldnames or [])
+        row = 0
+        while True:
+            row += 1
+            try:
+                values = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as e:
+                yield CatalogRow(source, row, error=f"invalid CSV: {e}")
+                continue
+            if None in values:  # More cells than header columns
+                yield CatalogRow(source, row, error="too many columns")
+                continue
+            yield _map_row(values, resolved, source, row)
+
+
+def batched(items: Iterable[T], size: int) -> Iterator[List[T]]:
+    """Consecutive lists of ``size`` items (the last may be shorter)."""
+    batch: List[T] = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def ingest_catalog(
+    openrag: Any,
+    path: Path,
+    batch_size: int = 200,
+    mapping: Optional[ColumnMapping] = None,
+    on_failed: Optional[Callable[[CatalogRow, str], Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Stream a catalog into ``openrag.ingest_lyrics_many`` batch by batch.
+
+    ``on_failed(row, error)`` is called for rows that mapped but could not
+    be written (e.g. to dead-letter them for retry); rows that could not be
+    mapped are only reported.
+
+    Returns:
+        ``{"rows", "successful", "failed", "errors"}``; ``errors`` holds
+        the first MAX_REPORTED_ROW_ERRORS failed rows
+    """
+    summary: Dict[str, Any] = {"rows": 0, "successful": 0, "failed": 0, "errors": []}
+
+    def fail(row: int, error: str) -> None:
+        summary["failed"] += 1
+        if len(summary["errors"]) < MAX_REPORTED_ROW_ERRORS:
+            summary["errors"].append({"row": row, "error": error})
+
+    for batch in batched(iter_catalog(path, mapping), batch_size):
+        summary["rows"] += len(batch)
+        valid = []
+        for row in batch:
+            if row.error:
+                fail(row.row, row.error)
+            else:
+                valid.append(row)
+        if not valid:
+            continue
+        results = await openrag.ingest_lyrics_many(
+            [row.data for row in valid], batch_size=batch_size
+        )
+        for row, result in zip(valid, results):
+            if result.status == "success":
+                summary["successful"] += 1
+            else:
+                fail(row.row, result.error or "ingestion failed")
+                if on_failed is not None:
+                    on_failed(row, result.error or "ingestion failed")
+        logger.info(f"{path}: {summary['rows']} rows read")
+    return summary
@@ -0,0 +1,259 @@
+"""
+Circuit Breakers - Fast-fail guards for KLM v2.3 dependencies
+
+Each external dependency (embedding provider, Supabase, LCI) gets its own
+breaker so a degraded dependency stops costing a full timeout per call.
+
+States:
+- CLOSED: calls flow through, outcomes recorded in a sliding time window
+- OPEN: calls fail immediately with CircuitOpenError until the cool-down ends
+- HALF_OPEN: a limited number of trial calls decide whether to close again
+
+Author: KLM v2.3
+Version: 2.3.0
+"""
+
+import inspect
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    """State of a circuit breaker."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is rejected because the circuit is open."""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Circuit '{name}' is open (retry in {retry_in:.1f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+@dataclass
+class CircuitBreakerConfig:
+    """Thresholds for a single circuit breaker."""
+
+    failure_rate_threshold: float = 0.5
+    minimum_calls: int = 5
+    window_seconds: float = 30.0
+    open_seconds: float = 15.0
+    half_open_max_calls: int = 1
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker over a sliding time window.
+
+    The breaker opens when at least ``minimum_calls`` outcomes were recorded
+    within ``window_seconds`` and the failure rate reaches
+    ``failure_rate_threshold``. After ``open_seconds`` it lets
+    ``half_open_max_calls`` trial calls through; one success closes it,
+    one failure re-opens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        config: Optional[CircuitBreakerConfig] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.config = config or CircuitBreakerConfig()
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self._total_rejected = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state, promoting OPEN to HALF_OPEN once the cool-down ends."""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> CircuitState:
+        if (
+            self._state == CircuitState.OPEN
+            and self._clock() - self._opened_at >= self.config.open_seconds
+        ):
+            self._transition(CircuitState.HALF_OPEN)
+        return self._state
+
+    def _transition(self, state: CircuitState) -> None:
+        if state == self._state:
+            return
+        logger.warning(f"Circuit '{self.name}': {self._state.value} -> {state.value}")
+        self._state = state
+        self._half_open_in_flight = 0
+        if state == CircuitState.OPEN:
+            self._opened_at = self._clock()
+        elif state == CircuitState.CLOSED:
+            self._outcomes.clear()
+
+    def _trim(self, now: float) -> None:
+        horizon = now - self.config.window_seconds
+        while self._outcomes and self._outcomes[0][0] < horizon:
+            self._outcomes.popleft()
+
+    def allow(self) -> bool:
+        """Reserve a call slot; False means the caller should fail fast."""
+        with self._lock:
+            state = self._current_state()
+            if state == CircuitState.CLOSED:
+                return True
+            if (
+                state == CircuitState.HALF_OPEN
+                and self._half_open_in_flight < self.config.half_open_max_calls
+            ):
+                self._half_open_in_flight += 1
+                return True
+            self._total_rejected += 1
+            return False
+
+    def is_open(self) -> bool:
+        """True while calls are being rejected, without reserving a slot."""
+        return self.state == CircuitState.OPEN
+
+    def check(self) -> None:
+        """Raise CircuitOpenError if a call would be rejected right now."""
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_in())
+
+    def retry_in(self) -> float:
+        """Seconds until the breaker will admit a trial call."""
+        with self._lock:
+            if self._state != CircuitState.OPEN:
+                return 0.0
+            return max(
+                0.0, self.config.open_seconds - (self._clock() - self._opened_at)
+            )
+
+    def record_success(self) -> None:
+        """Record a successful call."""
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN:
+                self._transition(CircuitState.CLOSED)
+                return
+            now = self._clock()
+            self._outcomes.append((now, True))
+            self._trim(now)
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the circuit if the threshold is hit."""
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN:
+                self._transition(CircuitState.OPEN)
+                return
+            now = self._clock()
+            self._outcomes.append((now, False))
+            self._trim(now)
+
+            total = len(self._outcomes)
+            if total < self.config.minimum_calls:
+                return
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            if failures / total >= self.config.failure_rate_threshold:
+                self._transition(CircuitState.OPEN)
+
+    def release(self) -> None:
+        """Give back a reserved trial slot without recording an outcome."""
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN and self._half_open_in_flight:
+                self._half_open_in_flight -= 1
+
+    async def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Run ``func`` through the breaker.
+
+        Works with both plain and coroutine functions. Exceptions from
+        ``func`` are recorded as failures and re-raised unchanged; a call
+        cancelled midway records nothing and frees its trial slot.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        self.check()
+        settled = False
+        try:
+            result = func(*args, **kwargs)
+            if inspect.isawaitable(result):
+                result = await result
+            settled = True
+        except Exception:
+            settled = True
+            self.record_failure()
+            raise
+        finally:
+            if not settled:  # Cancelled (BaseException): neither outcome
+                self.release()
+        self.record_success()
+        return result
+
+    def reset(self) -> None:
+        """Force the breaker back to CLOSED."""
+        with self._lock:
+            self._transition(CircuitState.CLOSED)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Breaker state for health reporting."""
+        with self._lock:
+            state = self._current_state()
+            self._trim(self._clock())
+            total = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            return {
+                "state": state.value,
+                "calls_in_window": total,
+                "failure_rate": round(failures / total, 3) if total else 0.0,
+                "rejected": self._total_rejected,
+            }
+
+
+class CircuitBreakerRegistry:
+    """Process-wide registry so breaker state outlives individual services."""
+
+    def __init__(self) -> None:
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self, name: str, config: Optional[CircuitBreakerConfig] = None
+    ) -> CircuitBreaker:
+        """Return the breaker for ``name``, creating it on first use."""
+        with self._lock:
+            breaker = self._breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(name, config)
+                self._breakers[name] = breaker
+            return breaker
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """State of every registered breaker."""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        return {b.name: b.snapshot() for b in breakers}
+
+    def reset(self) -> None:
+        """Reset every registered breaker."""
+        with self._lock:
+            breakers = list(self._breakers.values())
+        for breaker in breakers:
+            breaker.reset()
+
+
+circuit_breakers = CircuitBreakerRegistry()
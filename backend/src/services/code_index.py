@@ -0,0 +1,280 @@
+"""
+Code Index - In-process code search for the CODE context source
+
+Indexes Python sources by AST: modules, classes and functions with their
+signatures and docstrings. Lookups go through a trigram posting list, so
+CODE queries are answered in milliseconds with real relevance scores and
+without needing LCI or Node.
+
+The index is persisted as JSON and refreshed incrementally: only files
+whose mtime changed are re-parsed.
+
+Author: KLM v2.3
+Version: 2.3.0
+"""
+
+import ast
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+SKIP_DIRS = frozenset(
+    {".git", ".venv", "venv", "node_modules", "__pycache__", ".cache", "build", "dist"}
+)
+_WORD_RE = re.compile(r"[A-Za-z0-9]+")
+
+
+@dataclass
+class CodeSymbol:
+    """A module, class or function extracted from a Python file."""
+
+    path: str
+    line: int
+    kind: str  # module, class, function
+    qualname: str
+    signature: str
+    docstring: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.path}:{self.line}:{self.qualname}"
+
+    def search_text(self) -> str:
+        return f"{self.qualname} {self.path} {self.docstring}"
+
+
+@dataclass
+class CodeMatch:
+    """A scored code index hit."""
+
+    symbol: CodeSymbol
+    score: float
+
+
+def trigrams(text: str) -> Set[str]:
+    """Lowercase word trigrams (words padded so short names still match)."""
+    grams: Set[str] = set()
+    for word in _WORD_RE.findall(text.lower()):
+        padded = f" {word} "
+        grams.update(padded[i : i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _words(text: str) -> Set[str]:
+    """Lowercase words, with snake_case and CamelCase split apart."""
+    split = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", text).replace("_", " ")
+    return set(_WORD_RE.findall(split.lower()))
+
+
+def extract_symbols(path: str, source: str) -> List[CodeSymbol]:
+    """Extract symbols from Python ``source``; unparsable files yield none."""
+    try:
+        tree = ast.parse(source, filename=path)
+    except (SyntaxError, ValueError):
+        return []
+
+    lines = source.splitlines()
+    symbols = [
+        CodeSymbol(
+            path=path,
+            line=1,
+            kind="module",
+            qualname=Path(path).stem,
+            signature=path,
+            docstring=(ast.get_docstring(tree) or "").strip(),
+        )
+    ]
+
+    def visit(nodes: Iterable[ast.AST], prefix: str) -> None:
+        for node in nodes:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                qualname = f"{prefix}{node.name}"
+                header = (
+                    lines[node.lineno - 1].strip() if node.lineno <= len(lines) else ""
+                )
+                symbols.append(
+                    CodeSymbol(
+                        path=path,
+                        line=node.lineno,
+                        kind="class" if isinstance(node, ast.ClassDef) else "function",
+                        qualname=qualname,
+                        signature=header,
+                        docstring=(ast.get_docstring(node) or "").strip(),
+                    )
+                )
+                visit(node.body, f"{qualname}.")
+
+    visit(tree.body, "")
+    return symbols
+
+
+class CodeIndex:
+    """
+    Trigram index over Python symbols, persisted to disk.
+
+    Thread-safe: ``refresh`` and ``search`` may be called from worker threads.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        index_path: Optional[Path] = None,
+        refresh_interval: float = 30.0,
+    ):
+        self.root = Path(root).resolve()
+        self.index_path = index_path or self.root / ".cache" / "code_index.json"
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._files: Dict[str, Tuple[float, List[CodeSymbol]]] = {}
+        self._symbols: Dict[str, CodeSymbol] = {}
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._last_refresh = 0.0
+        self._loaded = False
+
+    def _load(self) -> None:
+        self._loaded = True
+        try:
+            data = json.loads(self.index_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("version") != INDEX_VERSION:
+            return
+        for path, entry in data.get("files", {}).items():
+            symbols = [CodeSymbol(**s) for s in entry["symbols"]]
+            self._add_file(path, entry["mtime"], symbols)
+
+    def _save(self) -> None:
+        data = {
+            "version": INDEX_VERSION,
+            "files": {
+                path: {"mtime": mtime, "symbols": [asdict(s) for s in symbols]}
+                for path, (mtime, symbols) in self._files.items()
+            },
+        }
+        try:
+            self.index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.index_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(data), encoding="utf-8")
+            os.replace(tmp, self.index_path)
+        except OSError as e:
+            logger.warning(f"Could not persist code index: {e}")
+
+    def _add_file(self, path: str, mtime: float, symbols: List[CodeSymbol]) -> None:
+        self._files[path] = (mtime, symbols)
+        for symbol in symbols:
+            self._symbols[symbol.key] = symbol
+            for gram in trigrams(symbol.search_text()):
+                self._postings[gram].add(symbol.key)
+
+    def _remove_file(self, path: str) -> None:
+        _, symbols = self._files.pop(path, (0.0, []))
+        for symbol in symbols:
+            self._symbols.pop(symbol.key, None)
+            for gram in trigrams(symbol.search_text()):
+                keys = self._postings.get(gram)
+                if keys is not None:
+                    keys.discard(symbol.key)
+                    if not keys:
+                        del self._postings[gram]
+
+    def _walk(self) -> Dict[str, float]:
+        found: Dict[str, float] = {}
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS]
+            for name in filenames:
+                if name.endswith(".py"):
+                    full = os.path.join(dirpath, name)
+                    rel = Path(full).relative_to(self.root).as_posix()
+                    try:
+                        found[rel] = os.stat(full).st_mtime
+                    except OSError:
+                        continue
+        return found
+
+    def refresh(self, force: bool = False) -> int:
+        """
+        Re-index files whose mtime changed since the last refresh.
+
+        Returns:
+            Number of files added, updated or removed
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_refresh < self.refresh_interval:
+                return 0
+            self._last_refresh = now
+            if not self._loaded:
+                self._load()
+
+            current = self._walk()
+            changed = 0
+            for path in set(self._files) - set(current):
+                self._remove_file(path)
+                changed += 1
+            for path, mtime in current.items():
+                known = self._files.get(path)
+                if known is not None and known[0] == mtime:
+                    continue
+                try:
+                    source = (self.root / path).read_text(encoding="utf-8")
+                except (OSError, UnicodeDecodeError):
+                    continue
+                self._remove_file(path)
+                self._add_file(path, mtime, extract_symbols(path, source))
+                changed += 1
+
+            if changed:
+                self._save()
+                logger.info(f"Code index updated: {changed} files changed")
+            return changed
+
+    def search(self, query: str, limit: int = 10) -> List[CodeMatch]:
+        """
+        Rank symbols against ``query``.
+
+        Score blends the share of query trigrams the symbol contains with
+        how well query words match the symbol name (recall and precision).
+        """
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+        query_words = _words(query)
+
+        with self._lock:
+            hits: Dict[str, int] = defaultdict(int)
+            for gram in query_grams:
+                for key in self._postings.get(gram, ()):
+                    hits[key] += 1
+            candidates = [(self._symbols[k], n) for k, n in hits.items()]
+
+        matches = []
+        for symbol, shared in candidates:
+            coverage = shared / len(query_grams)
+            name_words = _words(symbol.qualname)
+            shared_words = len(query_words & name_words)
+            name_recall = shared_words / len(query_words) if query_words else 0.0
+            name_precision = shared_words / len(name_words) if name_words else 0.0
+            score = 0.6 * coverage + 0.3 * name_recall + 0.1 * name_precision
+            matches.append(CodeMatch(symbol=symbol, score=round(score, 4)))
+
+        matches.sort(key=lambda m: (-m.score, m.symbol.path, m.symbol.line))
+        return matches[:limit]
+
+    def stats(self) -> Dict[str, int]:
+        """Index size for health reporting."""
+        with self._lock:
+            return {
+                "files": len(self._files),
+                "symbols": len(self._symbols),
+                "trigrams": len(self._postings),
+            }
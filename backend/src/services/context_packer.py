@@ -0,0 +1,172 @@
+"""
+Context Packer - Token-budgeted, diversity-aware context selection
+
+Agents pay LLM tokens for every context item, and near-duplicate lyrics
+or sessions add cost without adding coverage. The packer picks items by
+maximal marginal relevance (MMR) over their embeddings until a token
+budget is spent, truncating at Khmer-safe boundaries.
+
+MMR score for candidate i given the selected set S:
+
+    lambda * relevance(i) - (1 - lambda) * max_{j in S} cosine(i, j)
+
+Uses numpy for the similarity matrix when available; falls back to pure
+Python otherwise.
+
+Author: KLM v2.3
+Version: 2.3.0
+"""
+
+import json
+import logging
+import math
+from dataclasses import dataclass
+from typing import Any, List, Optional, Sequence
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from backend.src.utils.khmer import chars_for_tokens, estimate_tokens, safe_truncate
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PackResult:
+    """Indices chosen by the packer and the text each should carry."""
+
+    order: List[int]
+    contents: List[str]
+    tokens_used: int
+
+
+def parse_embedding(value: Any) -> Optional[List[float]]:
+    """Normalize an embedding from a PostgREST row (list or "[...]" string)."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return None
+    if isinstance(value, (list, tuple)) and value:
+        return [float(v) for v in value]
+    return None
+
+
+def _similarity_matrix(embeddings: Sequence[Optional[List[float]]]) -> Any:
+    """Pairwise cosine similarity; rows without an embedding are all zero."""
+    n = len(embeddings)
+    dims = {len(e) for e in embeddings if e}
+    dim = dims.pop() if len(dims) == 1 else 0
+
+    if np is not None:
+        matrix = np.zeros((n, dim or 1), dtype=np.float32)
+        for i, e in enumerate(embeddings):
+            if e and dim and len(e) == dim:
+                matrix[i] = e
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+        return matrix @ matrix.T
+
+    unit: List[Optional[List[float]]] = []
+    for e in embeddings:
+        norm = math.sqrt(sum(v * v for v in e)) if e and len(e) == dim else 0.0
+        unit.append([v / norm for v in e] if norm else None)
+    return [
+        [
+            sum(a * b for a, b in zip(u, v)) if u is not None and v is not None else 0.0
+            for v in unit
+        ]
+        for u in unit
+    ]
+
+
+def pack_context(
+    contents: Sequence[str],
+    relevance: Sequence[float],
+    embeddings: Sequence[Optional[List[float]]],
+    token_budget: int,
+    diversity: float = 0.3,
+    min_item_tokens: int = 32,
+) -> PackResult:
+    """
+    Select and order items to fit ``token_budget`` using MMR.
+
+    Args:
+        contents: Full text of each candidate
+        relevance: Relevance score of each candidate (higher is better)
+        embeddings: Embedding per candidate, or None if unavailable
+        token_budget: Total estimated tokens the packed context may use
+        diversity: Weight of the redundancy penalty (0 = pure relevance)
+        min_item_tokens: Smallest truncated item worth including
+
+    Returns:
+        PackResult with chosen indices in MMR order
+    """
+    n = len(contents)
+    if n == 0 or token_budget <= 0:
+        return PackResult(order=[], contents=[], tokens_used=0)
+
+    weight = 1.0 - diversity
+    sims = _similarity_matrix(embeddings)
+    tokens = [estimate_tokens(c) for c in contents]
+
+    order: List[int] = []
+    packed: List[str] = []
+    remaining = token_budget
+
+    if np is not None:
+        rel = np.asarray(relevance, dtype=np.float32)
+        max_sim = np.zeros(n, dtype=np.float32)
+        available = np.ones(n, dtype=bool)
+        while remaining >= min_item_tokens and available.any():
+            scores = weight * rel - diversity * max_sim
+            scores[~available] = -np.inf
+            best = int(np.argmax(scores))
+            available[best] = False
+            text = _fit(contents[best], tokens[best], remaining, min_item_tokens)
+            if text is None:
+                continue
+            order.append(best)
+            packed.append(text)
+            remaining -= estimate_tokens(text)
+            np.maximum(max_sim, sims[:, best], out=max_sim)
+    else:
+        max_sim_list = [0.0] * n
+        candidates = set(range(n))
+        while remaining >= min_item_tokens and candidates:
+            best = max(
+                candidates,
+                key=lambda i: (weight * relevance[i] - diversity * max_sim_list[i], -i),
+            )
+            candidates.discard(best)
+            text = _fit(contents[best], tokens[best], remaining, min_item_tokens)
+            if text is None:
+                continue
+            order.append(best)
+            packed.append(text)
+            remaining -= estimate_tokens(text)
+            for i in candidates:
+                max_sim_list[i] = max(max_sim_list[i], sims[i][best])
+
+    return PackResult(
+        order=order, contents=packed, tokens_used=token_budget - remaining
+    )
+
+
+def _fit(
+    content: str, tokens: int, remaining: int, min_item_tokens: int
+) -> Optional[str]:
+    """Return content as-is, truncated to ``remaining``, or None if too small."""
+    if tokens <= remaining:
+        return content
+    if remaining < min_item_tokens:
+        return None
+    text = safe_truncate(content, chars_for_tokens(content, remaining))
+    # The ellipsis and boundary rounding can tip the estimate over budget
+    while text and estimate_tokens(text) > remaining:
+        text = safe_truncate(text, len(text) - 8)
+    return text or None
@@ -0,0 +1,366 @@
+"""
+Dead Letter Store - Persistent retry queue for failed ingestion items
+
+Failed files and catalog rows used to live only in a run's in-memory
+``results["failed"]``; recovering meant re-running everything. They are
+now kept in a local SQLite store with their error class and attempt
+count, and a RetryScheduler re-feeds them in batches once their backoff
+(exponential, with jitter) has elapsed.
+
+Items are keyed by file path, or ``path#row`` for catalog rows (which
+carry their mapped lyrics data as payload, so the catalog is not re-read).
+Permanent errors (unparseable input, missing files) and items out of attempts are
+parked: kept for inspection, never retried until ``reset``.
+
+Author: KLM v2.3
+Version: 2.3.0
+"""
+
+import asyncio
+import json
+import logging
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEAD_LETTER_PATH = Path(".cache") / "ingest_dead_letters.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS dead_letters (
+    key TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    payload TEXT,
+    error_class TEXT NOT NULL,
+    error TEXT NOT NULL,
+    transient INTEGER NOT NULL,
+    attempts INTEGER NOT NULL,
+    next_attempt_at REAL,
+    first_failed_at TEXT NOT NULL,
+    last_failed_at TEXT NOT NULL
+)
+"""
+
+
+class IngestInputError(ValueError):
+    """A source file or row that cannot be parsed or mapped as lyrics."""
+
+
+# Bad input: retrying cannot help until the source changes. Plain
+# ValueError/KeyError/TypeError are not listed: providers raise them for
+# transient failures too (an undecodable error body, a missing field).
+PERMANENT_ERRORS: Tuple[type, ...] = (
+    IngestInputError,
+    FileNotFoundError,
+    IsADirectoryError,
+    PermissionError,
+)
+
+
+def classify_error(error: Union[BaseException, str]) -> Tuple[str, bool]:
+    """
+    ``(error_class, transient)`` for a failure.
+
+    Unknown exceptions (network, provider, Supabase) count as transient;
+    the attempt limit bounds them. Error strings (``IngestionResult.error``)
+    are write failures, also transient.
+    """
+    if isinstance(error, str):
+        return "IngestionError", True
+    return type(error).__name__, not isinstance(error, PERMANENT_ERRORS)
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff: base * factor**(attempts - 1), capped, jittered."""
+
+    base_seconds: float = 30.0
+    factor: float = 2.0
+    max_seconds: float = 3600.0
+    max_attempts: int = 6
+    jitter: float = 0.5  # Fraction of the delay drawn at random
+    lease_seconds: float = 600.0  # Claimed items reappear if never settled
+
+    def delay(self, attempts: int, rng: Callable[[], float] = random.random) -> float:
+        delay = min(self.max_seconds, self.base_seconds * self.factor ** (attempts - 1))
+        return delay * (1 - self.jitter * rng())
+
+
+@dataclass
+class DeadLetter:
+    """One failed item."""
+
+    key: str
+    kind: str  # "file" or "row"
+    payload: Optional[Dict[str, Any]]
+    error_class: str
+    error: str
+    transient: bool
+    attempts: int
+    next_attempt_at: Optional[float]  # None: parked
+    first_failed_at: str
+    last_failed_at: str
+
+
+class DeadLetterStore:
+    """SQLite-backed dead letters; safe to share between tasks and threads."""
+
+    def __init__(
+        self, path: Optional[Path] = None, policy: Optional[RetryPolicy] = None
+    ):
+        self.path = Path(path or DEFAULT_DEAD_LETTER_PATH)
+        self.policy = policy or RetryPolicy()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _entry(row: sqlite3.Row) -> DeadLetter:
+        return DeadLetter(
+            key=row["key"],
+            kind=row["kind"],
+            payload=json.loads(row["payload"]) if row["payload"] else None,
+            error_class=row["error_class"],
+            error=row["error"],
+            transient=bool(row["transient"]),
+            attempts=row["attempts"],
+            next_attempt_at=row["next_attempt_at"],
+            first_failed_at=row["first_failed_at"],
+            last_failed_at=row["last_failed_at"],
+        )
+
+    def get(self, key: str) -> Optional[DeadLetter]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM dead_letters WHERE key = ?", (key,)
+            ).fetchone()
+        return self._entry(row) if row else None
+
+    def add(
+        self,
+        key: str,
+        error: Union[BaseException, str],
+        payload: Optional[Dict[str, Any]] = None,
+        kind: str = "file",
+        now: Optional[float] = None,
+    ) -> DeadLetter:
+        """
+        Record a failure of ``key`` (a new one or another attempt) and
+        schedule its retry, or park it.
+        """
+        now = time.time() if now is None else now
+        error_class, transient = classify_error(error)
+        stamp = datetime.now().isoformat()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts, first_failed_at, payload FROM dead_letters "
+                "WHERE key = ?",
+                (key,),
+            ).fetchone()
+            attempts = (row["attempts"] if row else 0) + 1
+            first_failed_at = row["first_failed_at"] if row else stamp
+            stored_payload = (
+                json.dumps(payload, ensure_ascii=False, default=str)
+                if payload is not None
+                else (row["payload"] if row else None)
+            )
+            if transient and attempts < self.policy.max_attempts:
+                next_attempt_at = now + self.policy.delay(attempts)
+            else:
+                next_attempt_at = None
+            self._conn.execute(
+                "INSERT OR REPLACE INTO dead_letters (key, kind, payload, "
+                "error_class, error, transient, attempts, next_attempt_at, "
+                "first_failed_at, last_failed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    kind,
+                    stored_payload,
+                    error_class,
+                    str(error),
+                    int(transient),
+                    attempts,
+                    next_attempt_at,
+                    first_failed_at,
+                    stamp,
+                ),
+            )
+            self._conn.commit()
+        if next_attempt_at is None:
+            logger.warning(
+                f"Dead letter parked after {attempts} attempts: {key} "
+                f"({error_class}: {error})"
+            )
+        return self.get(key)
+
+    def resolve(self, key: str) -> bool:
+        """Forget ``key`` after it succeeded; False if it was not stored."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM dead_letters WHERE key = ?", (key,)
+            )
+            self._conn.commit()
+        return cursor.rowcount > 0
+
+    def claim(self, limit: int, now: Optional[float] = None) -> List[DeadLetter]:
+        """
+        Up to ``limit`` items due for retry, oldest due first. Their next
+        attempt moves out by the policy's lease, so a retry that never
+        reports back is picked up again later instead of twice now.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM dead_letters WHERE next_attempt_at <= ? "
+                "ORDER BY next_attempt_at LIMIT ?",
+                (now, limit),
+            ).fetchall()
+            self._conn.executemany(
+                "UPDATE dead_letters SET next_attempt_at = ? WHERE key = ?",
+                [(now + self.policy.lease_seconds, row["key"]) for row in rows],
+            )
+            self._conn.commit()
+        return [self._entry(row) for row in rows]
+
+    def next_due(self) -> Optional[float]:
+        """Earliest scheduled retry (epoch seconds), None if nothing is."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(next_attempt_at) FROM dead_letters"
+            ).fetchone()
+        return row[0]
+
+    def reset(
+        self, keys: Optional[List[str]] = None, now: Optional[float] = None
+    ) -> int:
+        """Make parked (or the given) items due now with a fresh attempt count."""
+        now = time.time() if now is None else now
+        with self._lock:
+            if keys is None:
+                cursor = self._conn.execute(
+                    "UPDATE dead_letters SET attempts = 0, next_attempt_at = ? "
+                    "WHERE next_attempt_at IS NULL",
+                    (now,),
+                )
+            else:
+                cursor = self._conn.executemany(
+                    "UPDATE dead_letters SET attempts = 0, next_attempt_at = ? "
+                    "WHERE key = ?",
+                    [(now, key) for key in keys],
+                )
+            self._conn.commit()
+        return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        """Scheduled/parked counts and failures per error class."""
+        with self._lock:
+            scheduled, parked = self._conn.execute(
+                "SELECT COUNT(next_attempt_at), "
+                "COUNT(*) - COUNT(next_attempt_at) FROM dead_letters"
+            ).fetchone()
+            by_class = self._conn.execute(
+                "SELECT error_class, COUNT(*) FROM dead_letters GROUP BY error_class"
+            ).fetchall()
+        return {
+            "scheduled": scheduled,
+            "parked": parked,
+            "by_error_class": {name: count for name, count in by_class},
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+async def retry_rows(
+    store: DeadLetterStore, openrag: Any, letters: List[DeadLetter]
+) -> int:
+    """
+    Re-ingest dead-lettered catalog rows from their stored payload in one
+    bulk call. Returns how many succeeded; failures are re-recorded.
+    """
+    rows = [letter for letter in letters if letter.payload is not None]
+    if not rows:
+        return 0
+    try:
+        results = await openrag.ingest_lyrics_many([row.payload for row in rows])
+    except Exception as e:
+        for row in rows:
+            store.add(row.key, e, kind=row.kind)
+        return 0
+    succeeded = 0
+    for row, result in zip(rows, results):
+        if result.status == "success":
+            store.resolve(row.key)
+            succeeded += 1
+        else:
+            store.add(row.key, result.error or "ingestion failed", kind=row.kind)
+    return succeeded
+
+
+class RetryScheduler:
+    """
+    Re-feeds due dead letters in batches.
+
+    ``feed`` receives each claimed batch and is responsible for settling
+    it: ingestion paths resolve items that succeed and ``add`` those that
+    fail again (which schedules the next, longer backoff).
+    """
+
+    def __init__(
+        self,
+        store: DeadLetterStore,
+        feed: Callable[[List[DeadLetter]], Awaitable[Any]],
+        batch_size: int = 50,
+        max_sleep_seconds: float = 60.0,
+    ):
+        self.store = store
+        self.feed = feed
+        self.batch_size = batch_size
+        self.max_sleep_seconds = max_sleep_seconds
+        self.retried = 0
+
+    async def run_once(self, now: Optional[float] = None) -> int:
+        """Feed one batch of due items; returns its size (0: none due)."""
+        letters = self.store.claim(self.batch_size, now)
+        if letters:
+            logger.info(f"Retrying {len(letters)} dead-lettered items")
+            await self.feed(letters)
+            self.retried += len(letters)
+        return len(letters)
+
+    async def drain(self, max_batches: Optional[int] = None) -> int:
+        """Feed batches until nothing is due (or ``max_batches``)."""
+        total = batches = 0
+        while max_batches is None or batches < max_batches:
+            fed = await self.run_once()
+            if not fed:
+                break
+            total += fed
+            batches += 1
+        return total
+
+    async def run(self, stop: asyncio.Event) -> None:
+        """Sleep until the next retry is due, feed it, repeat until ``stop``."""
+        while not stop.is_set():
+            await self.drain()
+            next_due = self.store.next_due()
+            sleep = self.max_sleep_seconds
+            if next_due is not None:
+                sleep = min(sleep, max(0.0, next_due - time.time()))
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=sleep)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,451 @@
+"""
+Ingest Daemon - Watch-folder ingestion for KLM v2.3
+
+Watches a lyrics folder (``assets/raw_lyrics`` by default) and ingests
+files as they appear or change, instead of waiting for someone to run
+the ingestion flow. File system events (watchdog: inotify, FSEvents,
+ReadDirectoryChangesW) feed a debounced queue; a burst of copies is
+flushed as one batch through the bulk embed/upsert path
+(``OpenRAGService.ingest_lyrics_many``), so new songs are searchable a
+few seconds after they land.
+
+The ingest manifest is shared with the flow: unchanged files are
+skipped, changed ones overwrite their record. The folder is scanned
+once at startup to catch up; after that only events are processed.
+Without watchdog installed the daemon falls back to polling (a stat of
+every file per interval) and logs a warning.
+
+Author: KLM v2.3
+Version: 2.3.0
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    FileSystemEventHandler = object
+    Observer = None
+
+from backend.src.services.catalog_reader import (
+    catalog_format,
+    ingest_catalog,
+    is_source_file,
+    read_lyrics_file,
+)
+from backend.src.services.dead_letter import (
+    DeadLetter,
+    DeadLetterStore,
+    RetryScheduler,
+    retry_rows,
+)
+from backend.src.services.ingest_manifest import FileAction, IngestManifest, Stage
+
+logger = logging.getLogger(__name__)
+
+# Editors and copy tools write through these before the final rename
+_TEMPORARY_SUFFIXES = (".tmp", ".part", ".swp", "~")
+
+
+class DebouncedQueue:
+    """
+    Paths waiting to be ingested, released once their burst is over.
+
+    A path is due when it has had no event for ``quiet_seconds``. Under a
+    continuous stream of events a path is still released after
+    ``max_wait_seconds``, but only once its size and mtime have stopped
+    changing for ``quiet_seconds``, so a file still being copied is never
+    ingested half-written.
+    Thread-safe: watcher threads add, the daemon loop takes.
+    """
+
+    def __init__(
+        self,
+        quiet_seconds: float = 1.0,
+        max_wait_seconds: float = 5.0,
+        clock=time.monotonic,
+    ):
+        self.quiet_seconds = quiet_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self._clock = clock
+        self._pending: Dict[str, float] = {}  # path -> last event
+        self._queued_at: Dict[str, float] = {}  # path -> first event
+        self._settling: Dict[str, tuple] = {}  # path -> ((size, mtime_ns), since)
+        self._lock = threading.Lock()
+
+    def add(self, path: str) -> None:
+        now = self._clock()
+        with self._lock:
+            self._pending[path] = now
+            self._queued_at.setdefault(path, now)
+
+    def _settled(self, path: str, now: float) -> bool:
+        """True once ``path``'s stat has not changed for ``quiet_seconds``."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return True  # Gone: the daemon resolves it
+        signature = (st.st_size, st.st_mtime_ns)
+        previous = self._settling.get(path)
+        if previous is None or previous[0] != signature:
+            self._settling[path] = (signature, now)
+            return False
+        return now - previous[1] >= self.quiet_seconds
+
+    def take(self, limit: int) -> List[str]:
+        """Up to ``limit`` due paths, oldest event first."""
+        now = self._clock()
+        with self._lock:
+            quiet = []
+            overdue = []
+            for path, seen in self._pending.items():
+                if now - seen >= self.quiet_seconds:
+                    quiet.append((seen, path))
+                elif now - self._queued_at[path] >= self.max_wait_seconds:
+                    overdue.append((seen, path))
+        # Stat outside the lock; overdue paths stay queued until they settle
+        settled = [(seen, path) for seen, path in overdue if self._settled(path, now)]
+        with self._lock:
+            due = sorted(quiet + settled)[:limit]
+            for _, path in due:
+                self._pending.pop(path, None)
+                self._queued_at.pop(path, None)
+                self._settling.pop(path, None)
+            return [path for _, path in due]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+
+class _EventHandler(FileSystemEventHandler):
+    """Routes watchdog events for source files into the queue."""
+
+    def __init__(self, queue: DebouncedQueue):
+        super().__init__()
+        self.queue = queue
+
+    def _offer(self, path: str) -> None:
+        name = os.path.basename(path)
+        if name.startswith(".") or name.endswith(_TEMPORARY_SUFFIXES):
+            return
+        if is_source_file(Path(path)):
+            self.queue.add(path)
+
+    def on_created(self, event) -> None:
+        if not event.is_directory:
+            self._offer(event.src_path)
+
+    def on_modified(self, event) -> None:
+        if not event.is_directory:
+            self._offer(event.src_path)
+
+    def on_moved(self, event) -> None:
+        if not event.is_directory:
+            self._offer(event.dest_path)
+
+
+class IngestDaemon:
+    """
+    Watch ``root`` and ingest new or changed files in debounced batches.
+
+    Args:
+        root: Folder to watch (recursively)
+        openrag: Connected OpenRAGService
+        manifest: Ingest manifest shared with the ingestion flow
+        quiet_seconds: Debounce window per file
+        max_wait_seconds: Longest a queued file waits during a burst
+        max_batch: Files per bulk batch
+        status_path: JSON file rewritten with queue depth and counters
+        dead_letters: Store for failed files/rows; due ones are re-queued
+            with backoff while the daemon runs
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        openrag: Any,
+        manifest: IngestManifest,
+        quiet_seconds: float = 1.0,
+        max_wait_seconds: float = 5.0,
+        max_batch: int = 200,
+        catalog_batch_size: int = 200,
+        poll_seconds: float = 2.0,
+        status_path: Optional[Path] = None,
+        dead_letters: Optional[DeadLetterStore] = None,
+    ):
+        self.root = Path(root)
+        self.openrag = openrag
+        self.manifest = manifest
+        self.queue = DebouncedQueue(quiet_seconds, max_wait_seconds)
+        self.max_batch = max_batch
+        self.catalog_batch_size = catalog_batch_size
+        self.poll_seconds = poll_seconds
+        self.status_path = status_path
+        self.dead_letters = dead_letters
+        self.retry = (
+            RetryScheduler(dead_letters, self._requeue, max_batch)
+            if dead_letters is not None
+            else None
+        )
+        self._observer = None
+        self._stats: Dict[str, tuple] = {}  # path -> (size, mtime_ns), polling
+        self._stop = asyncio.Event()
+        self.counters = {
+            "batches": 0,
+            "ingested": 0,
+            "unchanged": 0,
+            "duplicates": 0,
+            "failed": 0,
+            "catalog_rows": 0,
+        }
+        self.last_batch: Dict[str, Any] = {}
+
+    def scan(self) -> int:
+        """
+        Queue source files under ``root`` whose stat changed since the last
+        scan (every file on the first, startup catch-up scan).
+        """
+        count = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                path = os.path.join(dirpath, name)
+                if not is_source_file(Path(path)):
+                    continue
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                fingerprint = (st.st_size, st.st_mtime_ns)
+                if self._stats.get(path) != fingerprint:
+                    self._stats[path] = fingerprint
+                    self.queue.add(path)
+                    count += 1
+        return count
+
+    def start_watching(self) -> bool:
+        """Start the watchdog observer; False means polling is used."""
+        if Observer is None:
+            logger.warning(
+                "watchdog not installed (pip install watchdog); "
+                f"polling {self.root} every {self.poll_seconds}s"
+            )
+            return False
+        self._observer = Observer()
+        self._observer.schedule(
+            _EventHandler(self.queue), str(self.root), recursive=True
+        )
+        self._observer.start()
+        return True
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    async def run(self) -> None:
+        """Catch up, then ingest batches as they become due until stopped."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        logger.info(f"Ingest daemon: {self.scan()} files queued for catch-up")
+        watching = self.start_watching()
+        tick = max(0.05, self.queue.quiet_seconds / 4)
+        last_poll = time.monotonic()
+        try:
+            while not self._stop.is_set():
+                if not watching and time.monotonic() - last_poll >= self.poll_seconds:
+                    self.scan()
+                    last_poll = time.monotonic()
+                if self.retry is not None:
+                    await self.retry.run_once()
+                batch = self.queue.take(self.max_batch)
+                if batch:
+                    await self.ingest_batch(batch)
+                    self.write_status()
+                    continue
+                try:
+                    await asyncio.wait_for(self._stop.wait(), timeout=tick)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            if self._observer is not None:
+                self._observer.stop()
+                self._observer.join()
+            self.write_status()
+
+    async def ingest_batch(self, paths: List[str]) -> Dict[str, int]:
+        """
+        Ingest one batch: new files in a single bulk upsert, changed files
+        over their records, catalogs streamed row by row.
+        """
+        start = time.perf_counter()
+        counts = {
+            "ingested": 0,
+            "unchanged": 0,
+            "duplicates": 0,
+            "failed": 0,
+            "catalog_rows": 0,
+        }
+        fresh = []  # (state, lyrics_data) for the bulk upsert
+
+        for path in paths:
+            try:
+                state = self.manifest.classify(path)
+            except FileNotFoundError:
+                logger.info(f"Skipping {path}: deleted or moved away")
+                self._resolve(path)
+                continue
+            except OSError as e:
+                logger.warning(f"Skipping {path}: {e}")
+                self._dead_letter(path, e)
+                continue
+            if state.action is FileAction.SKIP:
+                counts["unchanged"] += 1
+                self._resolve(path)
+                continue
+            try:
+                if catalog_format(Path(path)):
+                    summary = await ingest_catalog(
+                        self.openrag,
+                        Path(path),
+                        self.catalog_batch_size,
+                        on_failed=self._dead_letter_row,
+                    )
+                    counts["catalog_rows"] += summary["successful"]
+                    counts["failed"] += summary["failed"]
+                    self.manifest.record(
+                        state,
+                        Stage.COMPLETE,
+                        error=(
+                            f"{summary['failed']} rows failed"
+                            if summary["failed"]
+                            else None
+                        ),
+                    )
+                    self._resolve(path)
+                elif state.action is FileAction.RESUME:
+                    if not await self.openrag.complete_lyrics(state.record_id):
+                        raise RuntimeError(f"Failed to complete {state.record_id}")
+                    self.manifest.record(state, Stage.COMPLETE)
+                    self._resolve(path)
+                    counts["ingested"] += 1
+                elif state.action is FileAction.UPDATE:
+                    lyrics_data = read_lyrics_file(path)
+                    result = await self.openrag.replace_lyrics(
+                        state.record_id, lyrics_data, status="complete"
+                    )
+                    self._record(state, lyrics_data, result, counts)
+                else:
+                    fresh.append((state, read_lyrics_file(path)))
+            except Exception as e:
+                logger.error(f"Ingest daemon failed on {path}: {e}")
+                self.manifest.record(state, Stage.PENDING, error=str(e))
+                self._dead_letter(path, e)
+                counts["failed"] += 1
+
+        if fresh:
+            try:
+                results = await self.openrag.ingest_lyrics_many(
+                    [data for _, data in fresh], status="complete"
+                )
+            except Exception as e:
+                # Whole batch rejected (provider down, breaker open)
+                logger.error(f"Ingest daemon bulk write failed: {e}")
+                for state, _ in fresh:
+                    self.manifest.record(state, Stage.PENDING, error=str(e))
+                    self._dead_letter(state.path, e)
+                counts["failed"] += len(fresh)
+            else:
+                for (state, data), result in zip(fresh, results):
+                    self._record(state, data, result, counts)
+
+        for key, value in counts.items():
+            self.counters[key] += value
+        self.counters["batches"] += 1
+        self.last_batch = {
+            "files": len(paths),
+            **counts,
+            "seconds": round(time.perf_counter() - start, 3),
+            "finished_at": time.time(),
+        }
+        logger.info(
+            f"Ingest daemon batch: {len(paths)} files, {counts['ingested']} "
+            f"ingested, {counts['failed']} failed, {len(self.queue)} queued"
+        )
+        return counts
+
+    def _record(self, state, lyrics_data, result, counts: Dict[str, int]) -> None:
+        if result.status == "success":
+            self.manifest.record(
+                state,
+                Stage.COMPLETE,
+                record_id=result.id,
+                content_hash=lyrics_data["metadata"]["content_hash"],
+            )
+            self._resolve(state.path)
+            counts["ingested"] += 1
+        elif result.status == "duplicate":
+            # Changed into a copy of another stored song; nothing to write
+            self.manifest.record(
+                state,
+                Stage.COMPLETE,
+                record_id=result.id,
+                content_hash=lyrics_data["metadata"]["content_hash"],
+                duplicate_of=f"lyrics:{result.id}",
+            )
+            self._resolve(state.path)
+            counts["duplicates"] += 1
+        else:
+            self.manifest.record(state, Stage.PENDING, error=result.error)
+            self._dead_letter(state.path, result.error or "ingestion failed")
+            counts["failed"] += 1
+
+    def _dead_letter(self, path: str, error) -> None:
+        if self.dead_letters is not None:
+            self.dead_letters.add(path, error)
+
+    def _dead_letter_row(self, row, error: str) -> None:
+        if self.dead_letters is not None:
+            self.dead_letters.add(
+                f"{row.source}#{row.row}", error, row.data, kind="row"
+            )
+
+    def _resolve(self, path: str) -> None:
+        if self.dead_letters is not None:
+            self.dead_letters.resolve(path)
+
+    async def _requeue(self, letters: List[DeadLetter]) -> None:
+        """Retry feed: files rejoin the queue, rows are re-ingested now."""
+        for letter in letters:
+            if letter.kind == "file":
+                self.queue.add(letter.key)
+        await retry_rows(self.dead_letters, self.openrag, letters)
+
+    def status(self) -> Dict[str, Any]:
+        """Queue depth and counters, for the status file or a health check."""
+        return {
+            "root": str(self.root),
+            "watching": self._observer is not None,
+            "queue_depth": len(self.queue),
+            "counters": dict(self.counters),
+            "last_batch": self.last_batch,
+            "dead_letters": (
+                self.dead_letters.stats() if self.dead_letters is not None else None
+            ),
+        }
+
+    def write_status(self) -> None:
+        if self.status_path is None:
+            return
+        try:
+            self.status_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.status_path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self.status(), indent=2), encoding="utf-8")
+            os.replace(tmp, self.status_path)
+        except OSError as e:
+            logger.warning(f"Could not write daemon status: {e}")
@@ -0,0 +1,253 @@
+"""
+Ingest Manifest - Local record of what the ingestion flow has done
+
+One SQLite row per source file: its size/mtime, a hash of its bytes,
+the lyrics content hash, the Supabase record id and the stage reached.
+Re-running the flow then costs one ``stat`` per unchanged file:
+
+- unchanged (same size and mtime, or same bytes): skipped
+- changed: re-embedded and written over its existing record
+- interrupted after the insert: resumes at the completion step
+- new or failed: processed from the start
+
+Author: KLM v2.3
+Version: 2.3.0
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MANIFEST_PATH = Path(".cache") / "ingest_manifest.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    file_hash TEXT NOT NULL,
+    content_hash TEXT,
+    record_id TEXT,
+    stage TEXT NOT NULL,
+    duplicate_of TEXT,
+    error TEXT,
+    updated_at TEXT NOT NULL
+)
+"""
+
+
+class Stage(str, Enum):
+    """Furthest ingestion stage a file has reached."""
+
+    PENDING = "pending"  # Seen (or failed) before a record was written
+    INGESTED = "ingested"  # Record written, completion step not done
+    COMPLETE = "complete"
+
+
+class FileAction(str, Enum):
+    """What the flow has to do with a file."""
+
+    SKIP = "skip"
+    INGEST = "ingest"  # New file, or a retry of a failed one
+    UPDATE = "update"  # Content changed; overwrite its record
+    RESUME = "resume"  # Only the completion step is missing
+
+
+@dataclass
+class ManifestEntry:
+    """Stored state of one file."""
+
+    path: str
+    size: int
+    mtime_ns: int
+    file_hash: str
+    content_hash: Optional[str]
+    record_id: Optional[str]
+    stage: Stage
+    duplicate_of: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class FileState:
+    """A file's current fingerprint and the action it needs."""
+
+    path: str
+    size: int
+    mtime_ns: int
+    file_hash: str  # Empty when skipped on size/mtime alone
+    action: FileAction
+    entry: Optional[ManifestEntry] = None
+
+    @property
+    def record_id(self) -> Optional[str]:
+        return self.entry.record_id if self.entry else None
+
+
+def file_digest(path: str) -> str:
+    """sha256 of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestManifest:
+    """
+    SQLite-backed manifest; safe to share between tasks and threads.
+
+    Writes are committed immediately, so an interrupted run loses at most
+    the step that was in flight.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or DEFAULT_MANIFEST_PATH)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> Optional[ManifestEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM files WHERE path = ?", (path,)
+            ).fetchone()
+        if row is None:
+            return None
+        return ManifestEntry(
+            path=row["path"],
+            size=row["size"],
+            mtime_ns=row["mtime_ns"],
+            file_hash=row["file_hash"],
+            content_hash=row["content_hash"],
+            record_id=row["record_id"],
+            stage=Stage(row["stage"]),
+            duplicate_of=row["duplicate_of"],
+            error=row["error"],
+        )
+
+    def classify(self, path: str) -> FileState:
+        """
+        Decide what ``path`` needs, reading it only if its stat changed.
+
+        Raises:
+            OSError: If the file cannot be read
+        """
+        st = os.stat(path)
+        entry = self.get(path)
+        if (
+            entry is not None
+            and entry.stage is Stage.COMPLETE
+            and entry.size == st.st_size
+            and entry.mtime_ns == st.st_mtime_ns
+        ):
+            return FileState(
+                path, st.st_size, st.st_mtime_ns, "", FileAction.SKIP, entry
+            )
+
+        file_hash = file_digest(path)
+        state = FileState(
+            path, st.st_size, st.st_mtime_ns, file_hash, FileAction.INGEST
+        )
+        state.entry = entry
+        if entry is None:
+            return state
+        if entry.file_hash == file_hash:
+            if entry.stage is Stage.COMPLETE:
+                # Touched but not modified: remember the new stat
+                self._touch(path, st.st_size, st.st_mtime_ns)
+                state.action = FileAction.SKIP
+            elif entry.stage is Stage.INGESTED and entry.record_id:
+                state.action = FileAction.RESUME
+            elif entry.record_id:
+                state.action = FileAction.UPDATE
+            return state
+        if entry.record_id:
+            state.action = FileAction.UPDATE
+        return state
+
+    def record(
+        self,
+        state: FileState,
+        stage: Stage,
+        record_id: Optional[str] = None,
+        content_hash: Optional[str] = None,
+        duplicate_of: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        Store the stage ``state``'s file reached.
+
+        ``record_id`` / ``content_hash`` default to the stored values, so a
+        failed retry keeps pointing at the file's existing record.
+        """
+        previous = state.entry
+        if record_id is None and previous is not None:
+            record_id = previous.record_id
+        if content_hash is None and previous is not None:
+            content_hash = previous.content_hash
+        file_hash = state.file_hash or (previous.file_hash if previous else "")
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (path, size, mtime_ns, file_hash, "
+                "content_hash, record_id, stage, duplicate_of, error, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    state.path,
+                    state.size,
+                    state.mtime_ns,
+                    file_hash,
+                    content_hash,
+                    record_id,
+                    stage.value,
+                    duplicate_of,
+                    error,
+                    datetime.now().isoformat(),
+                ),
+            )
+            self._conn.commit()
+        state.entry = ManifestEntry(
+            path=state.path,
+            size=state.size,
+            mtime_ns=state.mtime_ns,
+            file_hash=file_hash,
+            content_hash=content_hash,
+            record_id=record_id,
+            stage=stage,
+            duplicate_of=duplicate_of,
+            error=error,
+        )
+
+    def _touch(self, path: str, size: int, mtime_ns: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?",
+                (size, mtime_ns, path),
+            )
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Number of files per stage."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage, COUNT(*) FROM files GROUP BY stage"
+            ).fetchall()
+        return {stage: count for stage, count in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
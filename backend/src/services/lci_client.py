@@ -0,0 +1,430 @@
+"""
+LCI Client - Persistent code-search connection over the LCI MCP bridge
+
+Spawning ``npx lci search`` per query pays Node startup on every call.
+This client keeps a small pool of long-lived ``npx lci mcp`` processes
+and talks JSON-RPC 2.0 (newline-delimited, MCP stdio transport) to them.
+
+Features:
+- Connection pool with least-busy selection
+- Request multiplexing (many in-flight requests per connection)
+- Periodic health pings
+- Automatic restart with backoff when a bridge process dies
+- Background availability probing with a cached status
+
+Author: KLM v2.3
+Version: 2.3.0
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from shutil import which
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MCP_PROTOCOL_VERSION = "2024-11-05"
+
+
+class LCIError(RuntimeError):
+    """Raised when the LCI bridge fails or returns an error."""
+
+
+def npx_command(*args: str) -> List[str]:
+    """Build an npx command line that also works with Windows .cmd shims."""
+    npx_path = which("npx") or which("npx.cmd") or "npx"
+    if os.name == "nt" and npx_path.lower().endswith((".cmd", ".bat")):
+        return ["cmd.exe", "/c", npx_path, *args]
+    return [npx_path, *args]
+
+
+@dataclass
+class LCIClientConfig:
+    """Configuration for the persistent LCI client."""
+
+    command: List[str] = field(default_factory=lambda: npx_command("lci", "mcp"))
+    pool_size: int = 2
+    request_timeout: float = 10.0
+    startup_timeout: float = 30.0
+    ping_interval: float = 30.0
+    restart_backoff: float = 1.0
+    max_restart_backoff: float = 60.0
+    search_tool: str = "search"
+    max_results: int = 10
+    line_limit: int = 16 * 1024 * 1024  # Longest JSON-RPC line read from a bridge
+
+
+class _MCPConnection:
+    """One ``lci mcp`` process with multiplexed JSON-RPC requests."""
+
+    def __init__(self, config: LCIClientConfig, index: int):
+        self.config = config
+        self.index = index
+        self._proc: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._write_lock = asyncio.Lock()
+        self._eof = False
+
+    @property
+    def alive(self) -> bool:
+        return (
+            self._proc is not None and self._proc.returncode is None and not self._eof
+        )
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    async def start(self) -> None:
+        """Spawn the bridge and perform the MCP initialize handshake."""
+        self._eof = False
+        self._proc = await asyncio.create_subprocess_exec(
+            *self.config.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            limit=self.config.line_limit,
+        )
+        self._reader = asyncio.create_task(self._read_loop())
+        await self.request(
+            "initialize",
+            {
+                "protocolVersion": MCP_PROTOCOL_VERSION,
+                "capabilities": {},
+                "clientInfo": {"name": "klm-context-api", "version": "2.3.0"},
+            },
+            timeout=self.config.startup_timeout,
+        )
+        await self._send({"jsonrpc": "2.0", "method": "notifications/initialized"})
+        logger.info(f"LCI bridge #{self.index} started (pid {self._proc.pid})")
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        if not self.alive or self._proc.stdin is None:
+            raise LCIError("LCI bridge is not running")
+        data = (json.dumps(message) + "\n").encode("utf-8")
+        async with self._write_lock:
+            self._proc.stdin.write(data)
+            await self._proc.stdin.drain()
+
+    async def request(
+        self,
+        method: str,
+        params: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """Send a JSON-RPC request and wait for its matching response."""
+        request_id = next(self._ids)
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+
+        message: Dict[str, Any] = {"jsonrpc": "2.0", "id": request_id, "method": method}
+        if params is not None:
+            message["params"] = params
+
+        try:
+            await self._send(message)
+            return await asyncio.wait_for(
+                future, timeout or self.config.request_timeout
+            )
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def _read_loop(self) -> None:
+        assert self._proc is not None and self._proc.stdout is not None
+        reason = "LCI bridge exited"
+        try:
+            while True:
+                try:
+                    line = await self._proc.stdout.readline()
+                except ValueError as e:  # Line over line_limit; stream is unusable
+                    reason = f"LCI response exceeded {self.config.line_limit} bytes"
+                    logger.warning(f"LCI bridge #{self.index}: {e}; restarting")
+                    break
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue  # Bridge log output on stdout
+
+                future = self._pending.get(message.get("id"))
+                if future is None or future.done():
+                    continue
+                if "error" in message:
+                    error = message["error"]
+                    future.set_exception(
+                        LCIError(
+                            f"LCI error {error.get('code')}: {error.get('message')}"
+                        )
+                    )
+                else:
+                    future.set_result(message.get("result"))
+        finally:
+            self._eof = True  # Not alive: the pool restarts it on next use
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(LCIError(reason))
+
+    async def close(self) -> None:
+        """Terminate the bridge process."""
+        proc, self._proc = self._proc, None
+        if proc is not None and proc.returncode is None:
+            try:
+                proc.terminate()
+                await asyncio.wait_for(proc.wait(), timeout=2)
+            except (ProcessLookupError, asyncio.TimeoutError):
+                try:
+                    proc.kill()
+                except ProcessLookupError:
+                    pass
+        if self._reader is not None:
+            self._reader.cancel()
+            self._reader = None
+
+
+class LCIClient:
+    """
+    Pooled, long-lived client for LCI code search.
+
+    Connections are started lazily on first use and restarted on demand
+    after a crash, with exponential backoff between failed restarts.
+    """
+
+    def __init__(self, config: Optional[LCIClientConfig] = None):
+        self.config = config or LCIClientConfig()
+        self._connections = [
+            _MCPConnection(self.config, i) for i in range(self.config.pool_size)
+        ]
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._backoff = self.config.restart_backoff
+        self._next_restart = 0.0
+        self._ping_task: Optional[asyncio.Task] = None
+        self._restarts = 0
+
+    async def _acquire(self) -> _MCPConnection:
+        """Pick the least-busy live connection, (re)starting dead ones."""
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+
+        live = [c for c in self._connections if c.alive]
+        if len(live) < len(self._connections):
+            async with self._start_lock:
+                await self._restart_dead()
+            live = [c for c in self._connections if c.alive]
+
+        if not live:
+            raise LCIError("No LCI bridge available")
+        return min(live, key=lambda c: c.in_flight)
+
+    async def _restart_dead(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop.time() < self._next_restart:
+            return
+
+        for conn in self._connections:
+            if conn.alive:
+                continue
+            await conn.close()
+            try:
+                await conn.start()
+                self._restarts += 1
+                self._backoff = self.config.restart_backoff
+            except Exception as e:
+                await conn.close()
+                self._next_restart = loop.time() + self._backoff
+                self._backoff = min(self._backoff * 2, self.config.max_restart_backoff)
+                logger.warning(f"LCI bridge #{conn.index} failed to start: {e}")
+                break
+
+        if self._ping_task is None or self._ping_task.done():
+            self._ping_task = asyncio.create_task(self._ping_loop())
+
+    async def _ping_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.config.ping_interval)
+            for conn in self._connections:
+                if not conn.alive:
+                    continue
+                try:
+                    await conn.request("ping")
+                except Exception as e:
+                    logger.warning(f"LCI bridge #{conn.index} failed ping: {e}")
+                    await conn.close()
+
+    async def search(self, query: str) -> List[str]:
+        """
+        Run a code search and return matching lines.
+
+        Raises:
+            LCIError: If no bridge is available or the call fails
+        """
+        conn = await self._acquire()
+        try:
+            result = await conn.request(
+                "tools/call",
+                {"name": self.config.search_tool, "arguments": {"query": query}},
+            )
+        except asyncio.TimeoutError as e:
+            raise LCIError(
+                f"LCI search timed out after {self.config.request_timeout}s"
+            ) from e
+
+        if result and result.get("isError"):
+            raise LCIError(f"LCI search failed: {_content_text(result)}")
+
+        lines = [line for line in _content_text(result).splitlines() if line.strip()]
+        return lines[: self.config.max_results]
+
+    async def ping(self) -> bool:
+        """True if at least one bridge answers a ping."""
+        try:
+            conn = await self._acquire()
+            await conn.request("ping")
+            return True
+        except Exception:
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool state for health reporting."""
+        return {
+            "pool_size": len(self._connections),
+            "alive": sum(1 for c in self._connections if c.alive),
+            "in_flight": sum(c.in_flight for c in self._connections),
+            "restarts": self._restarts,
+        }
+
+    async def close(self) -> None:
+        """Stop pings and terminate every bridge process."""
+        if self._ping_task is not None:
+            self._ping_task.cancel()
+            self._ping_task = None
+        for conn in self._connections:
+            await conn.close()
+
+
+class LCIStatusProbe:
+    """
+    Cached LCI availability, refreshed by a background task.
+
+    ``available`` never blocks: it is None until the first probe finishes
+    and is then refreshed every ``interval`` seconds while LCI is up. After
+    a failed probe the next one is delayed exponentially, from
+    ``initial_backoff`` up to ``max_backoff``.
+    """
+
+    def __init__(
+        self,
+        command: Optional[List[str]] = None,
+        timeout: float = 5.0,
+        interval: float = 60.0,
+        initial_backoff: float = 5.0,
+        max_backoff: float = 300.0,
+    ):
+        self.command = command or npx_command("lci", "status")
+        self.timeout = timeout
+        self.interval = interval
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.available: Optional[bool] = None
+        self.last_checked: Optional[float] = None
+        self._backoff = initial_backoff
+        self._next_probe = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def ensure_running(self) -> None:
+        """Start the refresh task on the running loop if it is not running."""
+        loop = asyncio.get_running_loop()
+        if (
+            self._task is not None
+            and not self._task.done()
+            and self._task.get_loop() is loop
+        ):
+            return
+        self._task = loop.create_task(self._run())
+
+    async def probe(self) -> bool:
+        """Run one ``lci status`` check and update the cached result."""
+        proc = None
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *self.command,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            ok = await asyncio.wait_for(proc.wait(), self.timeout) == 0
+        except (OSError, asyncio.TimeoutError):
+            ok = False
+        finally:
+            if proc is not None and proc.returncode is None:
+                try:
+                    proc.kill()
+                except ProcessLookupError:
+                    pass
+
+        if ok != self.available:
+            logger.info(f"LCI availability: {self.available} -> {ok}")
+        self.available = ok
+        self.last_checked = time.monotonic()
+        if ok:
+            self._backoff = self.initial_backoff
+            self._next_probe = self.last_checked + self.interval
+        else:
+            self._next_probe = self.last_checked + self._backoff
+            self._backoff = min(self._backoff * 2, self.max_backoff)
+        return ok
+
+    async def _run(self) -> None:
+        while True:
+            delay = self._next_probe - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self.probe()
+
+    def status(self) -> Dict[str, Any]:
+        """Cached status for health reporting."""
+        return {
+            "available": self.available,
+            "checked_ago_s": (
+                round(time.monotonic() - self.last_checked, 1)
+                if self.last_checked is not None
+                else None
+            ),
+            "next_probe_in_s": round(max(0.0, self._next_probe - time.monotonic()), 1),
+        }
+
+    async def stop(self) -> None:
+        """
+        Cancel the refresh task; one on the running loop is awaited, so
+        the loop can be closed right after.
+        """
+        task, self._task = self._task, None
+        if task is None or task.done():
+            return
+        loop = task.get_loop()
+        if loop is not asyncio.get_running_loop():
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(task.cancel)
+            return
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+
+lci_status_probe = LCIStatusProbe()
+
+
+def _content_text(result: Optional[Dict[str, Any]]) -> str:
+    """Join the text parts of an MCP tools/call result."""
+    if not result:
+        return ""
+    return "\n".join(
+        part.get("text", "")
+        for part in result.get("content", [])
+        if part.get("type") == "text"
+    )
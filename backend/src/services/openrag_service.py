@@ -2,7 +2,7 @@
 OpenRAG Service - Unified Retrieval Layer for KLM v2.3
 
 Provides:
-- Hybrid search (SQL + semantic vector search)
+- Hybrid search (SQL + semantic vector search + full-text/trigram)
 - Query expansion for better recall
 - Result reranking for precision
 - Zero data drift architecture
@@ -11,12 +11,20 @@ Author: KLM v2.3
 Version: 2.3.0
 """
 
+import asyncio
 import os
 import json
+import hashlib
 import logging
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Any, Tuple, Union
+from dataclasses import asdict, dataclass, field
 from datetime import datetime
+from enum import Enum
 
 try:
     from supabase import create_client, Client
@@ -24,12 +32,219 @@ except ImportError:
     Client = None
     create_client = None
 
+from backend.src.services.circuit_breaker import (
+    CircuitBreakerConfig,
+    CircuitOpenError,
+    circuit_breakers,
+)
+from backend.src.services.context_packer import parse_embedding
+from backend.src.services.pagination import (
+    CandidateCache,
+    Cursor,
+    fingerprint,
+    paginate,
+)
+from backend.src.services.query_expansion import QueryExpander, load_expander
+from backend.src.utils.khmer import (
+    chunk_text,
+    content_hash,
+    estimate_tokens,
+    normalize,
+    segment_for_index,
+    spaced,
+)
+
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+# Row columns kept on SearchResult.metadata; everything else (notably the
+# embedding and the other-language lyric bodies) is dropped after ranking.
+RESULT_METADATA_FIELDS = (
+    "artist",
+    "era",
+    "agent_id",
+    "session_id",
+    "created_at",
+    "matched_chunk",
+    "chunk_hits",
+)
+
+
+def _is_unique_violation(error: Exception) -> bool:
+    """True for a Postgres unique_violation (23505) reported by PostgREST."""
+    return getattr(error, "code", None) == "23505" or "23505" in str(error)
+
+
+class DataVersion:
+    """
+    Version of the lyrics/session data, for context API ETags.
+
+    The authoritative version is the ``data_version`` row (migration 009),
+    bumped by triggers on every write from any process: the ingestion
+    flow, the watch daemon, n8n. It is read through ``get_data_version``
+    and cached for ``ttl`` seconds, so all API workers agree and an ETag
+    goes stale at most ``ttl`` seconds after a write. Writes made by this
+    process also ``bump`` a local counter, which drops the cached version.
+
+    If the database version cannot be read, the token falls back to the
+    local counter plus a ``ttl``-second time bucket, so ETags still expire.
+    """
+
+    def __init__(self, ttl: float = 5.0) -> None:
+        self.epoch = uuid.uuid4().hex[:8]
+        self.ttl = ttl
+        self._value = 0
+        self._lock = threading.Lock()
+        self._remote: Optional[int] = None
+        self._fetched_at: Optional[float] = None
+
+    @property
+    def value(self) -> int:
+        return self._value
+
+    def bump(self) -> int:
+        with self._lock:
+            self._value += 1
+            self._fetched_at = None
+            return self._value
+
+    async def refresh(self, client: Callable[[], Any]) -> Optional[int]:
+        """
+        Database version, at most ``ttl`` seconds old; None if unreadable.
+
+        ``client`` returns the Supabase client (it may connect, or raise).
+        """
+        now = time.monotonic()
+        if self._fetched_at is not None and now - self._fetched_at < self.ttl:
+            return self._remote
+        self._fetched_at = now
+        try:
+            result = await asyncio.to_thread(
+                lambda: client().rpc("get_data_version", {}).execute()
+            )
+            self._remote = int(result.data)
+        except Exception as e:
+            logger.warning(f"Data version unavailable, using local version: {e}")
+            self._remote = None
+        return self._remote
+
+    async def token(self, client: Callable[[], Any]) -> str:
+        remote = await self.refresh(client)
+        if remote is not None:
+            return f"db.{remote}"
+        return f"{self.epoch}.{self._value}.{int(time.time() // self.ttl)}"
+
+
+data_version = DataVersion()
+
+
+class EmbeddingCache:
+    """
+    Process-wide LRU of embeddings keyed by model and normalized text.
+
+    Texts differing only in Khmer mark order, ZWSP or spacing share one
+    entry, so re-ingesting or re-querying them costs no provider call.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(model: str, dimensions: int, text: str) -> str:
+        digest = hashlib.sha1(text.encode("utf-8")).hexdigest()
+        return f"{model}:{dimensions}:{digest}"
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, key: str, embedding: List[float]) -> None:
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+embedding_cache = EmbeddingCache()
+
+
+@dataclass(frozen=True)
+class SearchProjection:
+    """Which heavy columns a search should fetch (pushed into the RPCs)."""
+
+    include_content: bool = True
+    include_embedding: bool = True
+
+
+class SearchMode(str, Enum):
+    """How hybrid_search finds candidates."""
+
+    AUTO = "auto"  # LEXICAL for "quoted" queries, HYBRID otherwise
+    HYBRID = "hybrid"  # Vector + lexical, scores fused
+    VECTOR = "vector"  # Embedding + ANN only
+    LEXICAL = "lexical"  # Full-text + trigram only; no embedding generated
+
+
+HNSW_EF_SEARCH_MAX = 1000
+
+
+@dataclass(frozen=True)
+class SearchTuning:
+    """
+    Per-call vector index knobs (pushed into the RPCs).
+
+    ef_search sets ``hnsw.ef_search`` and ivf_probes sets ``ivfflat.probes``
+    for that call only; None leaves the server setting untouched. Higher
+    values trade latency for recall.
+    """
+
+    ef_search: Optional[int] = None
+    ivf_probes: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.ef_search is not None and not (
+            1 <= self.ef_search <= HNSW_EF_SEARCH_MAX
+        ):
+            raise ValueError(f"ef_search must be in 1..{HNSW_EF_SEARCH_MAX}")
+        if self.ivf_probes is not None and self.ivf_probes < 1:
+            raise ValueError("ivf_probes must be >= 1")
+
+    def merged(self, override: Optional["SearchTuning"]) -> "SearchTuning":
+        """Fields set on ``override`` win over this (config) tuning."""
+        if override is None:
+            return self
+        return SearchTuning(
+            ef_search=(
+                override.ef_search if override.ef_search is not None else self.ef_search
+            ),
+            ivf_probes=(
+                override.ivf_probes
+                if override.ivf_probes is not None
+                else self.ivf_probes
+            ),
+        )
+
+    def rpc_params(self) -> Dict[str, Optional[int]]:
+        return {"ef_search": self.ef_search, "ivf_probes": self.ivf_probes}
+
+
+@dataclass(slots=True)
 class SearchResult:
-    """Represents a search result with metadata."""
+    """Represents a search result with the fields responses need."""
 
     id: str
     title: str
@@ -37,6 +252,36 @@ class SearchResult:
     metadata: Dict[str, Any]
     similarity: float
     source: str
+    embedding: Optional[List[float]] = field(default=None, repr=False)
+    content_length: int = 0
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "SearchResult":
+        """Build a compact result from an RPC row."""
+        content = row.get("lyrics_khmer") or row.get("summary") or ""
+        return cls(
+            id=row["id"],
+            title=row.get("title") or row.get("task_description") or "Unknown",
+            content=content,
+            metadata={
+                key: row[key]
+                for key in RESULT_METADATA_FIELDS
+                if row.get(key) is not None
+            },
+            similarity=row["similarity"],
+            source=row.get("source", "unknown"),
+            embedding=parse_embedding(row.get("embedding")),
+            content_length=row.get("content_length") or len(content),
+        )
+
+
+@dataclass
+class SearchPage:
+    """One page of ranked results plus the cursor for the next page."""
+
+    results: List[SearchResult]
+    next_cursor: Optional[str]
+    total_candidates: int
 
 
 @dataclass
@@ -47,6 +292,38 @@ class IngestionResult:
     status: str
     embedding_generated: bool
     stored_at: datetime
+    error: Optional[str] = None
+
+
+@dataclass
+class LyricsEmbedding:
+    """
+    Embedding of one song. With lyrics chunking, a long song also carries
+    its chunks (text, vector) and ``embedding`` is their normalized mean.
+    """
+
+    embedding: List[float]
+    chunks: List[Tuple[str, List[float]]] = field(default_factory=list)
+
+
+# Unique lyrics column upserts conflict on (migration 007)
+LYRICS_UPSERT_KEY = "content_hash"
+
+
+def mean_embedding(vectors: List[List[float]]) -> List[float]:
+    """Unit-length mean of ``vectors`` (a song vector from its chunks)."""
+    mean = [sum(values) / len(vectors) for values in zip(*vectors)]
+    norm = sum(value * value for value in mean) ** 0.5
+    return [value / norm for value in mean] if norm else mean
+
+
+def lyrics_content_hash(lyrics_data: Dict[str, Any]) -> str:
+    """Dedup key for a lyric: normalized title, artist and Khmer body."""
+    return content_hash(
+        "\n".join(
+            lyrics_data.get(key) or "" for key in ("title", "artist", "lyrics_khmer")
+        )
+    )
 
 
 class OpenRAGConfig:
@@ -65,6 +342,26 @@ class OpenRAGConfig:
         rerank_top_k: int = 5,
         enable_query_expansion: bool = True,
         expansion_max_terms: int = 5,
+        expansion_data_path: Optional[str] = None,
+        expansion_stats_path: Optional[str] = None,
+        embedding_segmentation: bool = False,
+        breaker_failure_rate: float = 0.5,
+        breaker_minimum_calls: int = 5,
+        breaker_window_seconds: float = 30.0,
+        breaker_open_seconds: float = 15.0,
+        hnsw_ef_search: Optional[int] = 40,
+        ivfflat_probes: Optional[int] = None,
+        lexical_weight: float = 0.5,
+        trigram_threshold: float = 0.3,
+        page_candidates: int = 200,
+        page_cache_ttl: float = 120.0,
+        page_cache_max_bytes: int = 64 * 1024 * 1024,
+        ingest_batch_size: int = 200,
+        embedding_batch_size: int = 100,
+        embedding_concurrency: int = 4,
+        lyrics_chunking: bool = False,
+        chunk_max_tokens: int = 512,
+        chunk_overlap_tokens: int = 64,
     ):
         self.supabase_url = supabase_url or os.getenv("SUPABASE_URL")
         self.supabase_key = supabase_key or os.getenv("SUPABASE_SERVICE_ROLE_KEY")
@@ -77,6 +374,55 @@ class OpenRAGConfig:
         self.rerank_top_k = rerank_top_k
         self.enable_query_expansion = enable_query_expansion
         self.expansion_max_terms = expansion_max_terms
+        self.expansion_data_path = expansion_data_path
+        self.expansion_stats_path = expansion_stats_path or os.getenv(
+            "QUERY_EXPANSION_STATS"
+        )
+        # Space-separate Khmer words before embedding. Changes the vectors,
+        # so stored embeddings must be regenerated when this is switched.
+        self.embedding_segmentation = embedding_segmentation
+        self.breaker_failure_rate = breaker_failure_rate
+        self.breaker_minimum_calls = breaker_minimum_calls
+        self.breaker_window_seconds = breaker_window_seconds
+        self.breaker_open_seconds = breaker_open_seconds
+        self.hnsw_ef_search = hnsw_ef_search
+        self.ivfflat_probes = ivfflat_probes
+        self.lexical_weight = lexical_weight
+        self.trigram_threshold = trigram_threshold
+        # Paged searches rank this many candidates once and serve every
+        # page from them while they stay cached
+        self.page_candidates = page_candidates
+        self.page_cache_ttl = page_cache_ttl
+        # Estimated size bound of each page cache; candidates may carry
+        # embeddings for token-budget packing
+        self.page_cache_max_bytes = page_cache_max_bytes
+        # Rows per multi-row insert and texts per embedding request in
+        # bulk ingestion
+        self.ingest_batch_size = ingest_batch_size
+        self.embedding_batch_size = embedding_batch_size
+        # Embedding requests of one generate_embeddings call in flight
+        self.embedding_concurrency = embedding_concurrency
+        # Embed long lyrics as overlapping chunks of at most
+        # chunk_max_tokens (title included) stored in lyrics_chunks, and
+        # search them aggregated per song (migration 008)
+        self.lyrics_chunking = lyrics_chunking
+        self.chunk_max_tokens = chunk_max_tokens
+        self.chunk_overlap_tokens = chunk_overlap_tokens
+
+    def breaker_config(self) -> CircuitBreakerConfig:
+        """Circuit breaker thresholds shared by all OpenRAG dependencies."""
+        return CircuitBreakerConfig(
+            failure_rate_threshold=self.breaker_failure_rate,
+            minimum_calls=self.breaker_minimum_calls,
+            window_seconds=self.breaker_window_seconds,
+            open_seconds=self.breaker_open_seconds,
+        )
+
+    def search_tuning(self) -> SearchTuning:
+        """Default vector index tuning for every search."""
+        return SearchTuning(
+            ef_search=self.hnsw_ef_search, ivf_probes=self.ivfflat_probes
+        )
 
 
 class OpenRAGService:
@@ -91,6 +437,26 @@ class OpenRAGService:
         self.config = config or OpenRAGConfig()
         self._client: Optional[Client] = None
         self._connected = False
+        self.embedding_breaker = circuit_breakers.get(
+            "embedding", self.config.breaker_config()
+        )
+        self.supabase_breaker = circuit_breakers.get(
+            "supabase", self.config.breaker_config()
+        )
+        # Ranked candidates of search_page(); /context/retrieve pages its
+        # ContextItem candidates in its own cache (UnifiedContextAPI)
+        self.page_cache: CandidateCache = CandidateCache(
+            self.config.page_cache_ttl, max_bytes=self.config.page_cache_max_bytes
+        )
+        # Searches that failed and were answered with no rows; callers
+        # compare it before and after a search to avoid caching the result
+        self.search_errors = 0
+        # Provider clients, created on first use and reused until aclose().
+        # Async clients are bound to the event loop they run on, so a
+        # service shared by flows on several loops keeps one per loop.
+        self._openai: Optional[Any] = None
+        self._http: "weakref.WeakKeyDictionary[Any, Any]" = weakref.WeakKeyDictionary()
+        self._clients_lock = threading.Lock()
 
     def connect(self) -> bool:
         """Establish connection to Supabase."""
@@ -113,6 +479,49 @@ class OpenRAGService:
             logger.error(f"Failed to connect to Supabase: {e}")
             return False
 
+    async def aclose(self) -> None:
+        """
+        Release pooled provider clients and the Supabase connection.
+
+        Clients of other, still running loops are closed on their loop.
+        """
+        with self._clients_lock:
+            http = dict(self._http)
+            self._http = weakref.WeakKeyDictionary()
+        current = asyncio.get_running_loop()
+        for loop, client in http.items():
+            if loop is current:
+                await client.aclose()
+            elif loop.is_running():
+                asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        if self._openai is not None:
+            self._openai.close()
+            self._openai = None
+        self._client = None
+        self._connected = False
+
+    def _openai_client(self) -> Any:
+        """Shared OpenAI client (keeps its HTTP connections warm)."""
+        if self._openai is None:
+            try:
+                from openai import OpenAI
+            except ImportError:
+                logger.error("OpenAI client not installed. Run: pip install openai")
+                raise
+            self._openai = OpenAI()
+        return self._openai
+
+    def _http_client(self) -> Any:
+        """httpx client for the OpenRAG API, shared per event loop."""
+        loop = asyncio.get_running_loop()
+        with self._clients_lock:
+            client = self._http.get(loop)
+            if client is None:
+                import httpx
+
+                client = self._http[loop] = httpx.AsyncClient()
+        return client
+
     @property
     def client(self) -> Client:
         """Get Supabase client, connecting if necessary."""
@@ -121,6 +530,11 @@ class OpenRAGService:
                 raise RuntimeError("Not connected to Supabase")
         return self._client
 
+    @staticmethod
+    async def _execute(query: Any) -> Any:
+        """Run a built Supabase query in a worker thread (the client is sync)."""
+        return await asyncio.to_thread(query.execute)
+
     async def generate_embedding(self, text: str) -> List[float]:
         """
         Generate embedding for text using OpenAI or OpenRAG.
@@ -130,79 +544,219 @@ class OpenRAGService:
 
         Returns:
             List of floats representing the embedding
+
+        Raises:
+            CircuitOpenError: If the embedding provider circuit is open
         """
+        text = self.embedding_text(text)
+        cache_key = EmbeddingCache.key(
+            self.config.embedding_model, self.config.embedding_dimensions, text
+        )
+        cached = embedding_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
         try:
             if self.config.openrag_api_url:
-                return await self._generate_openrag_embedding(text)
+                embedding = await self.embedding_breaker.call(
+                    self._generate_openrag_embedding, text
+                )
             else:
-                return await self._generate_openai_embedding(text)
+                embedding = await self.embedding_breaker.call(
+                    self._generate_openai_embedding, text
+                )
+            embedding_cache.put(cache_key, embedding)
+            return embedding
+        except CircuitOpenError:
+            raise
         except Exception as e:
             logger.error(f"Embedding generation failed: {e}")
             raise
 
+    async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed many texts, in order, with one provider request per
+        ``embedding_batch_size`` texts.
+
+        Cached and repeated texts are embedded once (or not at all).
+
+        Raises:
+            CircuitOpenError: If the embedding provider circuit is open
+        """
+        canonical = [self.embedding_text(text) for text in texts]
+        keys = [
+            EmbeddingCache.key(
+                self.config.embedding_model, self.config.embedding_dimensions, text
+            )
+            for text in canonical
+        ]
+        found: Dict[str, List[float]] = {}
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, canonical):
+            if key in found or key in missing:
+                continue
+            cached = embedding_cache.get(key)
+            if cached is not None:
+                found[key] = cached
+            else:
+                missing[key] = text
+
+        pending = list(missing.items())
+        size = max(1, self.config.embedding_batch_size)
+        generate = (
+            self._generate_openrag_embeddings
+            if self.config.openrag_api_url
+            else self._generate_openai_embeddings
+        )
+        limit = asyncio.Semaphore(max(1, self.config.embedding_concurrency))
+
+        async def embed_batch(batch: List[Tuple[str, str]]) -> None:
+            async with limit:
+                try:
+                    embeddings = await self.embedding_breaker.call(
+                        generate, [text for _, text in batch]
+                    )
+                except CircuitOpenError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Batch embedding generation failed: {e}")
+                    raise
+            for (key, _), embedding in zip(batch, embeddings):
+                embedding_cache.put(key, embedding)
+                found[key] = embedding
+
+        await asyncio.gather(
+            *(
+                embed_batch(pending[start : start + size])
+                for start in range(0, len(pending), size)
+            )
+        )
+        return [found[key] for key in keys]
+
+    async def embed_lyrics(self, lyrics: List[Dict[str, Any]]) -> List[LyricsEmbedding]:
+        """
+        Embed songs for ingestion, in order.
+
+        Without ``lyrics_chunking`` each song is one input (title + body).
+        With it, bodies over ``chunk_max_tokens`` are split into overlapping
+        chunks at Khmer-safe breaks, every chunk of every song is embedded
+        in the same batched requests, and the song vector is the mean of
+        its chunk vectors, so no input exceeds the bound.
+
+        Raises:
+            CircuitOpenError: If the embedding provider circuit is open
+        """
+        inputs = [self._lyrics_chunks(data) for data in lyrics]
+        vectors = iter(
+            await self.generate_embeddings(
+                [text for chunks in inputs for _, text in chunks]
+            )
+        )
+        embedded = []
+        for chunks in inputs:
+            pairs = [(content, next(vectors)) for content, _ in chunks]
+            if len(pairs) == 1:
+                embedded.append(LyricsEmbedding(pairs[0][1]))
+            else:
+                embedded.append(
+                    LyricsEmbedding(mean_embedding([v for _, v in pairs]), pairs)
+                )
+        return embedded
+
+    def _lyrics_chunks(self, lyrics_data: Dict[str, Any]) -> List[Tuple[str, str]]:
+        """
+        ``(content, embedding input)`` per chunk of a song: the whole text,
+        or chunks of the body each prefixed with the title.
+        """
+        text = self._lyrics_embedding_text(lyrics_data)
+        if (
+            not self.config.lyrics_chunking
+            or estimate_tokens(text) <= self.config.chunk_max_tokens
+        ):
+            return [(text, text)]
+        title = lyrics_data.get("title", "")
+        chunks = chunk_text(
+            lyrics_data.get("lyrics_khmer", ""),
+            max(1, self.config.chunk_max_tokens - estimate_tokens(title) - 1),
+            self.config.chunk_overlap_tokens,
+        )
+        return [(chunk, f"{title} {chunk}") for chunk in chunks] or [(text, text)]
+
+    def embedding_text(self, text: str) -> str:
+        """Canonical text sent to the embedding provider (and cache key)."""
+        return spaced(text) if self.config.embedding_segmentation else normalize(text)
+
     async def _generate_openai_embedding(self, text: str) -> List[float]:
         """Generate embedding using OpenAI API."""
-        try:
-            from openai import OpenAI
-        except ImportError:
-            logger.error("OpenAI client not installed. Run: pip install openai")
-            raise
-
-        client = OpenAI()
-        response = client.embeddings.create(
+        response = await asyncio.to_thread(
+            self._openai_client().embeddings.create,
             model=self.config.embedding_model,
             dimensions=self.config.embedding_dimensions,
             input=text,
         )
         return response.data[0].embedding
 
+    async def _generate_openai_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generate several embeddings with one OpenAI request."""
+        response = await asyncio.to_thread(
+            self._openai_client().embeddings.create,
+            model=self.config.embedding_model,
+            dimensions=self.config.embedding_dimensions,
+            input=texts,
+        )
+        return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+    async def _generate_openrag_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Generate several embeddings via OpenRAG (its /embed takes one text)."""
+        return list(
+            await asyncio.gather(
+                *(self._generate_openrag_embedding(text) for text in texts)
+            )
+        )
+
     async def _generate_openrag_embedding(self, text: str) -> List[float]:
         """Generate embedding using OpenRAG API."""
-        import httpx
+        response = await self._http_client().post(
+            f"{self.config.openrag_api_url}/embed",
+            json={"text": text, "model": self.config.embedding_model},
+            headers={"Authorization": f"Bearer {self.config.openrag_api_key}"},
+        )
+        response.raise_for_status()
+        return response.json()["embedding"]
 
-        async with httpx.AsyncClient() as http_client:
-            response = await http_client.post(
-                f"{self.config.openrag_api_url}/embed",
-                json={"text": text, "model": self.config.embedding_model},
-                headers={"Authorization": f"Bearer {self.config.openrag_api_key}"},
-            )
-            response.raise_for_status()
-            return response.json()["embedding"]
+    @property
+    def expander(self) -> QueryExpander:
+        """Compiled expansion engine (shared per data/stats file pair)."""
+        return load_expander(
+            self.config.expansion_data_path, self.config.expansion_stats_path
+        )
+
+    def reload_expansions(self) -> QueryExpander:
+        """Recompile the expansion engine, e.g. after new stats were mined."""
+        return load_expander(
+            self.config.expansion_data_path,
+            self.config.expansion_stats_path,
+            reload=True,
+        )
 
     def expand_query(self, query: str) -> List[str]:
         """
         Expand query with related terms for better recall.
 
-        Uses simple synonym expansion. In production, could use
-        OpenRAG's advanced query expansion.
+        English, romanized and Khmer triggers from the expansion data file
+        are matched in one pass; expansions come back heaviest first, so
+        the result (and anything keyed on it) is stable.
 
         Args:
             query: Original search query
 
         Returns:
-            List of expanded queries including original
+            List of expanded queries, original first
         """
         if not self.config.enable_query_expansion:
             return [query]
 
-        expansions = [query]
-
-        khmer_related = {
-            "love": ["romance", "heart", "feeling", "miss"],
-            "home": ["family", "mother", "father", "country", "village"],
-            "sad": ["lonely", "missing", "cry", "tears", "pain"],
-            "happy": ["joy", "celebrate", "laugh", "smile"],
-            "song": ["lyrics", "music", "melody", "voice"],
-            "river": ["water", "flow", "current", " Mekong"],
-            "moon": ["night", "sky", "stars", "light"],
-        }
-
-        query_lower = query.lower()
-        for word, related in khmer_related.items():
-            if word in query_lower:
-                expansions.extend(related)
-
-        return list(set(expansions))[: self.config.expansion_max_terms + 1]
+        return list(self.expander.expand(query, self.config.expansion_max_terms))
 
     def rerank_results(
         self, query: str, results: List[Dict], top_k: Optional[int] = None
@@ -219,7 +773,9 @@ class OpenRAGService:
             top_k: Number of top results to return
 
         Returns:
-            Reranked results
+            Reranked results, each annotated with its ``rank_score``; ties
+            are broken by id so the order is total (keyset pagination
+            relies on it)
         """
         if top_k is None:
             top_k = self.config.rerank_top_k
@@ -242,13 +798,19 @@ class OpenRAGService:
                 except Exception:
                     pass
 
+            # Lean RPCs return content_length (body may be projected away)
+            # and has_english instead of the English body
             completeness_bonus = 0.0
-            if result.get("lyrics_khmer") and result.get("lyrics_english"):
+            has_khmer = result.get("lyrics_khmer") or result.get("content_length")
+            has_english = result.get("has_english") or result.get("lyrics_english")
+            if has_khmer and has_english:
                 completeness_bonus = 0.05
 
             return similarity + recency_bonus + completeness_bonus
 
-        reranked = sorted(results, key=calculate_relevance, reverse=True)
+        for result in results:
+            result["rank_score"] = calculate_relevance(result)
+        reranked = sorted(results, key=lambda r: (-r["rank_score"], str(r["id"])))
         return reranked[:top_k]
 
     async def hybrid_search(
@@ -257,6 +819,12 @@ class OpenRAGService:
         filters: Optional[Dict[str, str]] = None,
         include_lyrics: bool = True,
         include_sessions: bool = True,
+        expand: bool = True,
+        projection: Optional[SearchProjection] = None,
+        tuning: Optional[SearchTuning] = None,
+        mode: SearchMode = SearchMode.AUTO,
+        top_k: Optional[int] = None,
+        match_count: Optional[int] = None,
     ) -> List[SearchResult]:
         """
         Perform hybrid search combining SQL filters with vector similarity.
@@ -269,79 +837,348 @@ class OpenRAGService:
             filters: SQL filters (e.g., {"artist": "Ros Serey Sothea"})
             include_lyrics: Search lyrics table
             include_sessions: Search agent sessions
+            expand: Run query expansion; callers that expand (and stop
+                early) themselves pass False
+            projection: Heavy columns to fetch; defaults to everything
+            tuning: Per-call ef_search / ivf_probes overriding the config
+            mode: Vector, lexical or both (fused); LEXICAL skips embedding
+                generation and searches lyrics only
+            top_k: Results to return after reranking (config default)
+            match_count: Candidates fetched per table and query (config
+                default)
 
         Returns:
             List of SearchResult objects sorted by relevance
+
+        Raises:
+            CircuitOpenError: If Supabase or the embedding provider is
+                failing fast, so callers can skip this source outright
         """
-        expanded_queries = self.expand_query(query)
+        reranked = await self._ranked_rows(
+            query,
+            filters,
+            include_lyrics,
+            include_sessions,
+            expand,
+            projection,
+            tuning,
+            mode,
+            top_k,
+            match_count,
+        )
+        return [SearchResult.from_row(r) for r in reranked]
+
+    async def _ranked_rows(
+        self,
+        query: str,
+        filters: Optional[Dict[str, str]],
+        include_lyrics: bool,
+        include_sessions: bool,
+        expand: bool,
+        projection: Optional[SearchProjection],
+        tuning: Optional[SearchTuning],
+        mode: SearchMode,
+        top_k: Optional[int],
+        match_count: Optional[int],
+    ) -> List[Dict]:
+        """hybrid_search without the final conversion (rows keep rank_score)."""
+        if self.supabase_breaker.is_open():
+            raise CircuitOpenError(
+                self.supabase_breaker.name, self.supabase_breaker.retry_in()
+            )
+
+        mode = self.resolve_search_mode(query, mode)
+        if mode is SearchMode.LEXICAL:
+            lexical_results = (
+                await self._search_lyrics_lexical(
+                    query, filters, projection, match_count
+                )
+                if include_lyrics
+                else []
+            )
+            return self.rerank_results(query, lexical_results, top_k)
+
+        tuning = self.config.search_tuning().merged(tuning)
+        expanded_queries = self.expand_query(query) if expand else [query]
         all_results: List[Dict] = []
 
         for expanded_query in expanded_queries:
             query_embedding = await self.generate_embedding(expanded_query)
 
             if include_lyrics:
-                lyrics_results = await self._search_lyrics(query_embedding, filters)
+                lyrics_results = await self._search_lyrics(
+                    query_embedding, filters, projection, tuning, match_count
+                )
                 all_results.extend(lyrics_results)
 
             if include_sessions:
-                session_results = await self._search_sessions(query_embedding, filters)
+                session_results = await self._search_sessions(
+                    query_embedding, filters, projection, tuning, match_count
+                )
                 all_results.extend(session_results)
 
         unique_results = self._deduplicate_results(all_results)
-        reranked = self.rerank_results(query, unique_results)
-
-        return [
-            SearchResult(
-                id=r["id"],
-                title=r.get("title", r.get("task_description", "Unknown")),
-                content=r.get("lyrics_khmer", r.get("summary", "")),
-                metadata=r,
-                similarity=r["similarity"],
-                source=r.get("source", "unknown"),
+        if mode is SearchMode.HYBRID and include_lyrics:
+            lexical_results = await self._search_lyrics_lexical(
+                query, filters, projection, match_count
             )
-            for r in reranked
-        ]
+            unique_results = self.fuse_lexical(unique_results, lexical_results)
+        return self.rerank_results(query, unique_results, top_k)
+
+    async def search_page(
+        self,
+        query: str,
+        filters: Optional[Dict[str, str]] = None,
+        include_lyrics: bool = True,
+        include_sessions: bool = True,
+        page_size: int = 10,
+        cursor: Optional[str] = None,
+        projection: Optional[SearchProjection] = None,
+        tuning: Optional[SearchTuning] = None,
+        mode: SearchMode = SearchMode.AUTO,
+    ) -> SearchPage:
+        """
+        Keyset-paginated hybrid_search.
+
+        The paging entry point for library callers of this service
+        (scripts, agents); the context API pages its own reranked
+        ContextItems in UnifiedContextAPI._retrieve_page with the same
+        cursors.
+
+        The first page ranks up to ``page_candidates`` results and caches
+        them; later pages seek past the cursor's (rank_score, id) in that
+        list. If the candidates expired they are re-ranked once and the
+        seek continues from the same boundary.
+
+        Raises:
+            CursorError: If ``cursor`` is malformed or from another query
+        """
+        query_fingerprint = fingerprint(
+            {
+                "query": normalize(query),
+                "filters": filters,
+                "lyrics": include_lyrics,
+                "sessions": include_sessions,
+                "projection": asdict(projection) if projection else None,
+                "tuning": asdict(tuning) if tuning else None,
+                "mode": mode.value,
+            }
+        )
+        after = Cursor.decode(cursor, query_fingerprint) if cursor else None
+
+        ranked = self.page_cache.get(query_fingerprint)
+        if ranked is None:
+            errors = self.search_errors
+            rows = await self._ranked_rows(
+                query,
+                filters,
+                include_lyrics,
+                include_sessions,
+                True,
+                projection,
+                tuning,
+                mode,
+                self.config.page_candidates,
+                self.config.page_candidates,
+            )
+            ranked = [(r["rank_score"], SearchResult.from_row(r)) for r in rows]
+            if self.search_errors == errors:  # Never cache a degraded ranking
+                self.page_cache.put(query_fingerprint, ranked)
+
+        page, next_cursor = paginate(
+            ranked,
+            lambda entry: (entry[0], str(entry[1].id)),
+            page_size,
+            after,
+            query_fingerprint,
+        )
+        return SearchPage(
+            results=[result for _, result in page],
+            next_cursor=next_cursor,
+            total_candidates=len(ranked),
+        )
+
+    async def lexical_search(
+        self,
+        query: str,
+        filters: Optional[Dict[str, str]] = None,
+        projection: Optional[SearchProjection] = None,
+    ) -> List[SearchResult]:
+        """Full-text + trigram lyrics search; never generates an embedding."""
+        return await self.hybrid_search(
+            query,
+            filters,
+            include_sessions=False,
+            projection=projection,
+            mode=SearchMode.LEXICAL,
+        )
+
+    @staticmethod
+    def resolve_search_mode(query: str, mode: SearchMode) -> SearchMode:
+        """Map AUTO to LEXICAL for a "quoted" exact-match query, else HYBRID."""
+        if mode is not SearchMode.AUTO:
+            return mode
+        stripped = query.strip()
+        if len(stripped) > 2 and stripped[0] == stripped[-1] == '"':
+            return SearchMode.LEXICAL
+        return SearchMode.HYBRID
+
+    def fuse_lexical(
+        self, vector_results: List[Dict], lexical_results: List[Dict]
+    ) -> List[Dict]:
+        """
+        Fold lexical scores into vector similarities.
+
+        fused = 1 - (1 - vector) * (1 - weight * lexical), so either signal
+        alone counts, agreement counts more, and the result stays in [0, 1].
+        Lexical-only hits enter with a vector similarity of 0.
+        """
+        weight = self.config.lexical_weight
+        lexical_by_id = {row["id"]: row for row in lexical_results}
+        fused: List[Dict] = []
+        for row in vector_results:
+            lexical = lexical_by_id.pop(row["id"], None)
+            if lexical is None:
+                fused.append(row)
+                continue
+            score = lexical["lexical_score"]
+            fused.append(
+                {
+                    **row,
+                    "lexical_score": score,
+                    "similarity": 1 - (1 - row["similarity"]) * (1 - weight * score),
+                }
+            )
+        for row in lexical_by_id.values():
+            fused.append({**row, "similarity": weight * row["lexical_score"]})
+        return fused
 
     async def _search_lyrics(
-        self, embedding: List[float], filters: Optional[Dict[str, str]]
+        self,
+        embedding: List[float],
+        filters: Optional[Dict[str, str]],
+        projection: Optional[SearchProjection] = None,
+        tuning: Optional[SearchTuning] = None,
+        match_count: Optional[int] = None,
     ) -> List[Dict]:
-        """Search lyrics table using hybrid_search_lyrics function."""
+        """
+        Search lyrics table using hybrid_search_lyrics_lean function, or
+        hybrid_search_lyrics_chunked_lean (chunk hits aggregated per song)
+        with lyrics chunking.
+        """
+        projection = projection or SearchProjection()
+        tuning = tuning or self.config.search_tuning()
+        function = (
+            "hybrid_search_lyrics_chunked_lean"
+            if self.config.lyrics_chunking
+            else "hybrid_search_lyrics_lean"
+        )
         try:
-            result = self.client.rpc(
-                "hybrid_search_lyrics",
-                {
-                    "query_embedding": embedding,
-                    "match_threshold": self.config.match_threshold,
-                    "match_count": self.config.match_count,
-                    "filter_artist": filters.get("artist") if filters else None,
-                    "filter_era": filters.get("era") if filters else None,
-                    "filter_status": filters.get("status") if filters else None,
-                },
-            ).execute()
+            result = await self.supabase_breaker.call(
+                lambda: self._execute(
+                    self.client.rpc(
+                        function,
+                        {
+                            "query_embedding": embedding,
+                            "match_threshold": self.config.match_threshold,
+                            "match_count": match_count or self.config.match_count,
+                            "filter_artist": filters.get("artist") if filters else None,
+                            "filter_era": filters.get("era") if filters else None,
+                            "filter_status": filters.get("status") if filters else None,
+                            "include_content": projection.include_content,
+                            "include_embedding": projection.include_embedding,
+                            **tuning.rpc_params(),
+                        },
+                    )
+                )
+            )
 
             return [{**row, "source": "lyrics"} for row in (result.data or [])]
+        except CircuitOpenError:
+            raise
         except Exception as e:
             logger.error(f"Lyrics search failed: {e}")
+            self.search_errors += 1
+            return []
+
+    async def _search_lyrics_lexical(
+        self,
+        query: str,
+        filters: Optional[Dict[str, str]],
+        projection: Optional[SearchProjection] = None,
+        match_count: Optional[int] = None,
+    ) -> List[Dict]:
+        """Search lyrics using lexical_search_lyrics_lean (no embedding)."""
+        projection = projection or SearchProjection()
+        query_text = segment_for_index(query.strip().strip('"'))
+        if not query_text:
+            return []
+        try:
+            result = await self.supabase_breaker.call(
+                lambda: self._execute(
+                    self.client.rpc(
+                        "lexical_search_lyrics_lean",
+                        {
+                            "query_text": query_text,
+                            "match_count": match_count or self.config.match_count,
+                            "filter_artist": filters.get("artist") if filters else None,
+                            "filter_era": filters.get("era") if filters else None,
+                            "filter_status": filters.get("status") if filters else None,
+                            "include_content": projection.include_content,
+                            "include_embedding": projection.include_embedding,
+                            "trigram_threshold": self.config.trigram_threshold,
+                        },
+                    )
+                )
+            )
+
+            return [
+                {**row, "similarity": row["lexical_score"], "source": "lyrics"}
+                for row in (result.data or [])
+            ]
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            logger.error(f"Lexical lyrics search failed: {e}")
+            self.search_errors += 1
             return []
 
     async def _search_sessions(
-        self, embedding: List[float], filters: Optional[Dict[str, str]]
+        self,
+        embedding: List[float],
+        filters: Optional[Dict[str, str]],
+        projection: Optional[SearchProjection] = None,
+        tuning: Optional[SearchTuning] = None,
+        match_count: Optional[int] = None,
     ) -> List[Dict]:
-        """Search agent sessions table."""
+        """Search agent sessions table using search_similar_sessions_lean."""
+        projection = projection or SearchProjection()
+        tuning = tuning or self.config.search_tuning()
         try:
-            result = self.client.rpc(
-                "search_similar_sessions",
-                {
-                    "query_embedding": embedding,
-                    "match_threshold": self.config.match_threshold,
-                    "match_count": self.config.match_count,
-                    "agent_filter": filters.get("agent_id") if filters else None,
-                },
-            ).execute()
+            result = await self.supabase_breaker.call(
+                lambda: self._execute(
+                    self.client.rpc(
+                        "search_similar_sessions_lean",
+                        {
+                            "query_embedding": embedding,
+                            "match_threshold": self.config.match_threshold,
+                            "match_count": match_count or self.config.match_count,
+                            "agent_filter": (
+                                filters.get("agent_id") if filters else None
+                            ),
+                            "include_content": projection.include_content,
+                            **tuning.rpc_params(),
+                        },
+                    )
+                )
+            )
 
             return [{**row, "source": "sessions"} for row in (result.data or [])]
+        except CircuitOpenError:
+            raise
         except Exception as e:
             logger.error(f"Session search failed: {e}")
+            self.search_errors += 1
             return []
 
     def _deduplicate_results(self, results: List[Dict]) -> List[Dict]:
@@ -355,13 +1192,20 @@ class OpenRAGService:
         return unique
 
     async def ingest_lyrics(
-        self, lyrics_data: Dict[str, Any], embedding: Optional[List[float]] = None
+        self,
+        lyrics_data: Dict[str, Any],
+        embedding: Optional[Union[List[float], LyricsEmbedding]] = None,
     ) -> IngestionResult:
         """
-        Ingest lyrics into Supabase with vector embedding.
+        Ingest lyrics into Supabase with vector embedding, as 'processing'.
 
         Zero data drift - metadata and embedding in same transaction.
 
+        This is the two-phase path for jobs that do more work before
+        ``complete_lyrics``; otherwise use ``upsert_lyrics``, which writes
+        the final row in one statement. Both are keyed by content hash,
+        so a retried call updates the row it already wrote.
+
         Args:
             lyrics_data: Lyrics metadata and content
             embedding: Pre-generated embedding (generated if not provided)
@@ -369,37 +1213,354 @@ class OpenRAGService:
         Returns:
             IngestionResult with ID and status
         """
-        text_for_embedding = (
-            f"{lyrics_data.get('title', '')} {lyrics_data.get('lyrics_khmer', '')}"
-        )
+        return await self.upsert_lyrics(lyrics_data, embedding, status="processing")
+
+    async def upsert_lyrics(
+        self,
+        lyrics_data: Dict[str, Any],
+        embedding: Optional[Union[List[float], LyricsEmbedding]] = None,
+        status: str = "complete",
+    ) -> IngestionResult:
+        """
+        Write lyrics in their final state with a single idempotent statement.
+
+        ``INSERT ... ON CONFLICT (content_hash) DO UPDATE``: the same
+        normalized title/artist/lyrics always lands on the same row, so
+        retries and re-runs never duplicate it.
+
+        Args:
+            lyrics_data: Lyrics metadata and content
+            embedding: Pre-generated embedding (generated if not provided;
+                with lyrics chunking, a plain vector for a song that needs
+                chunks is regenerated)
+            status: Status stored on the row
+
+        Returns:
+            IngestionResult with ID and status
+        """
+        if status != "complete":
+            # A retried or repeated two-phase write must not move a
+            # finished row back to 'processing'
+            existing = await self._lyrics_by_hash(
+                lyrics_content_hash(lyrics_data), status="complete"
+            )
+            if existing is not None:
+                return self._ingested(existing)
 
-        if embedding is None:
-            embedding = await self.generate_embedding(text_for_embedding)
+        song = await self._song_embedding(lyrics_data, embedding)
 
         try:
-            result = (
-                self.client.table("lyrics")
-                .insert({**lyrics_data, "embedding": embedding, "status": "processing"})
-                .execute()
+            row = self._lyrics_row(lyrics_data, song.embedding, status)
+            result = await self._execute(
+                self.client.table("lyrics").upsert(row, on_conflict=LYRICS_UPSERT_KEY)
             )
 
             record = result.data[0]
-            return IngestionResult(
-                id=record["id"],
-                status="success",
-                embedding_generated=True,
-                stored_at=datetime.fromisoformat(
-                    record["created_at"].replace("Z", "+00:00")
-                ),
-            )
+            data_version.bump()
+            ingested = self._ingested(record)
         except Exception as e:
             logger.error(f"Lyrics ingestion failed: {e}")
-            return IngestionResult(
-                id="",
-                status="failed",
-                embedding_generated=True,
-                stored_at=datetime.now(),
+            return self._ingest_failed(str(e), embedding_generated=True)
+        return (await self._store_chunks([ingested], [song]))[0]
+
+    async def replace_lyrics(
+        self,
+        lyrics_id: str,
+        lyrics_data: Dict[str, Any],
+        embedding: Optional[Union[List[float], LyricsEmbedding]] = None,
+        status: str = "processing",
+    ) -> IngestionResult:
+        """
+        Overwrite an existing lyrics record with changed content.
+
+        Falls back to an upsert when the record no longer exists. If the
+        new content is already stored as another record, nothing is
+        written and the result has status "duplicate" with that record's
+        id.
+        """
+        song = await self._song_embedding(lyrics_data, embedding)
+
+        try:
+            row = self._lyrics_row(lyrics_data, song.embedding, status)
+            result = await self._execute(
+                self.client.table("lyrics").update(row).eq("id", lyrics_id)
             )
+            if not result.data:
+                logger.info(f"Lyrics {lyrics_id} is gone; inserting instead")
+                return await self.upsert_lyrics(lyrics_data, song, status)
+
+            data_version.bump()
+            ingested = self._ingested(result.data[0])
+        except Exception as e:
+            if _is_unique_violation(e):
+                existing = await self._lyrics_by_hash(lyrics_content_hash(lyrics_data))
+                if existing is not None:
+                    logger.info(
+                        f"Lyrics {lyrics_id} now duplicates {existing['id']}; "
+                        "left unchanged"
+                    )
+                    return IngestionResult(
+                        id=existing["id"],
+                        status="duplicate",
+                        embedding_generated=True,
+                        stored_at=datetime.now(),
+                        error=f"Content already stored as lyrics {existing['id']}",
+                    )
+            logger.error(f"Lyrics update failed: {e}")
+            return self._ingest_failed(str(e), embedding_generated=True)
+        return (await self._store_chunks([ingested], [song]))[0]
+
+    async def ingest_lyrics_many(
+        self,
+        lyrics: List[Dict[str, Any]],
+        embeddings: Optional[
+            List[Optional[Union[List[float], LyricsEmbedding]]]
+        ] = None,
+        batch_size: Optional[int] = None,
+        status: str = "complete",
+    ) -> List[IngestionResult]:
+        """
+        Bulk ingest lyrics with batched embeddings and multi-row upserts.
+
+        Each chunk of ``batch_size`` rows (default ``ingest_batch_size``)
+        costs one embedding request per ``embedding_batch_size`` missing
+        embeddings and one upsert keyed by content hash. Rows are written
+        with their final ``status`` directly, so no follow-up status
+        update is needed, and re-ingesting a chunk updates its rows
+        instead of duplicating them. Rows of a chunk with the same
+        content hash share one row (and one result id).
+
+        A failed chunk upsert is retried row by row, so one bad row only
+        fails itself.
+
+        Args:
+            lyrics: Lyrics metadata and content, one dict per row
+            embeddings: Pre-generated embeddings aligned with ``lyrics``
+                (None entries are generated, see ``embed_lyrics``)
+            batch_size: Rows per insert
+            status: Status stored on every row
+
+        Returns:
+            One IngestionResult per input row, in input order
+        """
+        if embeddings is not None and len(embeddings) != len(lyrics):
+            raise ValueError("embeddings must align with lyrics")
+
+        size = max(1, batch_size or self.config.ingest_batch_size)
+        results: List[IngestionResult] = []
+        for start in range(0, len(lyrics), size):
+            chunk = lyrics[start : start + size]
+            given = (
+                embeddings[start : start + size] if embeddings else [None] * len(chunk)
+            )
+            results.extend(await self._ingest_chunk(chunk, list(given), status))
+
+        failed = sum(1 for r in results if r.status != "success")
+        logger.info(f"Bulk ingested {len(results) - failed}/{len(results)} lyrics")
+        return results
+
+    async def _ingest_chunk(
+        self,
+        chunk: List[Dict[str, Any]],
+        embeddings: List[Optional[Union[List[float], LyricsEmbedding]]],
+        status: str,
+    ) -> List[IngestionResult]:
+        """Embed what is missing, then upsert the chunk in one request."""
+        songs = [
+            self._given_embedding(data, embedding)
+            for data, embedding in zip(chunk, embeddings)
+        ]
+        missing = [i for i, song in enumerate(songs) if song is None]
+        if missing:
+            try:
+                generated = await self.embed_lyrics([chunk[i] for i in missing])
+            except Exception as e:
+                logger.error(f"Bulk embedding failed for {len(chunk)} lyrics: {e}")
+                return [self._ingest_failed(str(e)) for _ in chunk]
+            for i, song in zip(missing, generated):
+                songs[i] = song
+
+        rows = [
+            self._lyrics_row(data, song.embedding, status)
+            for data, song in zip(chunk, songs)
+        ]
+        # ON CONFLICT cannot touch one row twice in a statement
+        unique = list({row[LYRICS_UPSERT_KEY]: row for row in rows}.values())
+        try:
+            # Rows may omit different optional columns; let those take defaults
+            result = await self._execute(
+                self.client.table("lyrics").upsert(
+                    unique, on_conflict=LYRICS_UPSERT_KEY, default_to_null=False
+                )
+            )
+            records = {r[LYRICS_UPSERT_KEY]: r for r in result.data or []}
+            if len(records) != len(unique):
+                raise RuntimeError(
+                    f"Upserted {len(records)} of {len(unique)} rows in one request"
+                )
+        except Exception as e:
+            if len(rows) == 1:
+                logger.error(f"Lyrics ingestion failed: {e}")
+                return [self._ingest_failed(str(e), embedding_generated=True)]
+            logger.warning(f"Bulk upsert of {len(rows)} rows failed ({e}); retrying")
+            return await self._store_chunks(await self._upsert_rows_singly(rows), songs)
+
+        data_version.bump()
+        results = [self._ingested(records[row[LYRICS_UPSERT_KEY]]) for row in rows]
+        return await self._store_chunks(results, songs)
+
+    def _given_embedding(
+        self,
+        lyrics_data: Dict[str, Any],
+        embedding: Optional[Union[List[float], LyricsEmbedding]],
+    ) -> Optional[LyricsEmbedding]:
+        """A caller's embedding, or None if it has to be (re)generated."""
+        if isinstance(embedding, LyricsEmbedding):
+            return embedding
+        if embedding is None or len(self._lyrics_chunks(lyrics_data)) > 1:
+            return None  # A whole-text vector of a song that needs chunks
+        return LyricsEmbedding(embedding)
+
+    async def _song_embedding(
+        self,
+        lyrics_data: Dict[str, Any],
+        embedding: Optional[Union[List[float], LyricsEmbedding]],
+    ) -> LyricsEmbedding:
+        song = self._given_embedding(lyrics_data, embedding)
+        if song is None:
+            song = (await self.embed_lyrics([lyrics_data]))[0]
+        return song
+
+    async def _store_chunks(
+        self, results: List[IngestionResult], songs: List[LyricsEmbedding]
+    ) -> List[IngestionResult]:
+        """
+        Replace the lyrics_chunks rows of the songs written successfully.
+
+        A song whose chunks could not be written is reported failed (its
+        row is already upserted, so retrying it is safe).
+        """
+        if not self.config.lyrics_chunking:
+            return results
+        written: Dict[str, LyricsEmbedding] = {}
+        for result, song in zip(results, songs):
+            if result.status == "success":
+                written.setdefault(result.id, song)  # Same hash, same row
+        if not written:
+            return results
+        rows = [
+            {
+                "lyrics_id": lyrics_id,
+                "chunk_index": index,
+                "content": content,
+                "embedding": vector,
+            }
+            for lyrics_id, song in written.items()
+            for index, (content, vector) in enumerate(song.chunks)
+        ]
+        try:
+            # One RPC, one transaction: searches never see a song without chunks
+            await self._execute(
+                self.client.rpc(
+                    "replace_lyrics_chunks",
+                    {"lyrics_ids": list(written), "chunks": rows},
+                )
+            )
+        except Exception as e:
+            logger.error(f"Lyrics chunk write failed for {len(written)} songs: {e}")
+            return [
+                (
+                    self._ingest_failed(
+                        f"Chunk write failed: {e}", embedding_generated=True
+                    )
+                    if result.id in written
+                    else result
+                )
+                for result in results
+            ]
+        return results
+
+    async def _upsert_rows_singly(
+        self, rows: List[Dict[str, Any]]
+    ) -> List[IngestionResult]:
+        """Fallback for a failed chunk: isolate the rows that fail."""
+        results = []
+        for row in rows:
+            try:
+                result = await self._execute(
+                    self.client.table("lyrics").upsert(
+                        row, on_conflict=LYRICS_UPSERT_KEY
+                    )
+                )
+                results.append(self._ingested(result.data[0]))
+            except Exception as e:
+                logger.error(f"Lyrics ingestion failed: {e}")
+                results.append(self._ingest_failed(str(e), embedding_generated=True))
+        if any(r.status == "success" for r in results):
+            data_version.bump()
+        return results
+
+    @staticmethod
+    def _lyrics_embedding_text(lyrics_data: Dict[str, Any]) -> str:
+        return f"{lyrics_data.get('title', '')} {lyrics_data.get('lyrics_khmer', '')}"
+
+    @staticmethod
+    def _lyrics_row(
+        lyrics_data: Dict[str, Any], embedding: List[float], status: str
+    ) -> Dict[str, Any]:
+        """Writable lyrics row: data, dedup key, embedding and segmentation."""
+        digest = lyrics_content_hash(lyrics_data)
+        row = {
+            **lyrics_data,
+            LYRICS_UPSERT_KEY: digest,
+            "metadata": {**(lyrics_data.get("metadata") or {}), "content_hash": digest},
+            "embedding": embedding,
+            "status": status,
+        }
+        if row.get("lyrics_khmer"):
+            row["lyrics_khmer_segmented"] = segment_for_index(row["lyrics_khmer"])
+        return row
+
+    async def _lyrics_by_hash(
+        self, digest: str, status: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """The record stored under content hash ``digest`` (None if unknown)."""
+        try:
+            query = (
+                self.client.table("lyrics")
+                .select("id, status, created_at")
+                .eq(LYRICS_UPSERT_KEY, digest)
+            )
+            if status is not None:
+                query = query.eq("status", status)
+            result = await self._execute(query.limit(1))
+        except Exception as e:
+            logger.warning(f"Lyrics lookup by content hash failed: {e}")
+            return None
+        return result.data[0] if result.data else None
+
+    @staticmethod
+    def _ingested(record: Dict[str, Any]) -> IngestionResult:
+        return IngestionResult(
+            id=record["id"],
+            status="success",
+            embedding_generated=True,
+            stored_at=datetime.fromisoformat(
+                record["created_at"].replace("Z", "+00:00")
+            ),
+        )
+
+    @staticmethod
+    def _ingest_failed(
+        error: str, embedding_generated: bool = False
+    ) -> IngestionResult:
+        return IngestionResult(
+            id="",
+            status="failed",
+            embedding_generated=embedding_generated,
+            stored_at=datetime.now(),
+            error=error,
+        )
 
     async def update_lyrics_status(
         self, lyrics_id: str, status: str, embedding: Optional[List[float]] = None
@@ -410,10 +1571,11 @@ class OpenRAGService:
             if embedding is not None:
                 update_data["embedding"] = embedding
 
-            self.client.table("lyrics").update(update_data).eq(
-                "id", lyrics_id
-            ).execute()
+            await self._execute(
+                self.client.table("lyrics").update(update_data).eq("id", lyrics_id)
+            )
 
+            data_version.bump()
             return True
         except Exception as e:
             logger.error(f"Status update failed: {e}")
@@ -439,7 +1601,10 @@ class OpenRAGService:
             Session ID
         """
         try:
-            result = self.client.table("agent_sessions").insert(session_data).execute()
+            result = await self._execute(
+                self.client.table("agent_sessions").insert(session_data)
+            )
+            data_version.bump()
             return result.data[0]["id"]
         except Exception as e:
             logger.error(f"Session save failed: {e}")
@@ -450,6 +1615,11 @@ class OpenRAGService:
         return {
             "status": "healthy" if self._connected else "disconnected",
             "supabase": self._connected,
+            "circuits": {
+                "embedding": self.embedding_breaker.snapshot(),
+                "supabase": self.supabase_breaker.snapshot(),
+            },
+            "embedding_cache": embedding_cache.stats(),
             "config": {
                 "embedding_model": self.config.embedding_model,
                 "match_threshold": self.config.match_threshold,
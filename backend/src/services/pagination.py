@@ -0,0 +1,188 @@
+"""
+Pagination - Keyset cursors over ranked search candidates
+
+Results are ordered by (score descending, id ascending), a total order,
+so a page boundary is fully described by the last (score, id) served.
+Cursors carry that pair plus a fingerprint of the query that produced
+them; the ranked candidate list is kept for a short TTL so later pages
+are a binary search instead of a new search. When the candidates have
+expired the search is re-run once and the same keyset seek continues
+from the boundary, so page N costs about what page 1 did.
+
+Author: KLM v2.3
+Version: 2.3.0
+"""
+
+import base64
+import hashlib
+import json
+import threading
+import time
+from bisect import bisect_right
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+)
+
+T = TypeVar("T")
+
+CURSOR_VERSION = 1
+MAX_PAGE_SIZE = 100
+
+
+class CursorError(ValueError):
+    """Raised for malformed cursors or cursors from a different query."""
+
+
+def fingerprint(payload: Dict[str, Any]) -> str:
+    """Stable short digest of everything that determines a result order."""
+    canonical = json.dumps(payload, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class Cursor:
+    """Position after the last item served: its (score, id)."""
+
+    fingerprint: str
+    score: float
+    id: str
+
+    def encode(self) -> str:
+        raw = json.dumps(
+            [CURSOR_VERSION, self.fingerprint, self.score, self.id],
+            separators=(",", ":"),
+        ).encode("utf-8")
+        return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str, expected_fingerprint: str) -> "Cursor":
+        """Parse ``token`` and check that it belongs to this query."""
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            version, fp, score, item_id = json.loads(
+                base64.urlsafe_b64decode(padded.encode("ascii"))
+            )
+            cursor = cls(str(fp), float(score), str(item_id))
+        except (ValueError, TypeError, UnicodeError) as e:
+            raise CursorError(f"Malformed cursor: {e}") from None
+        if version != CURSOR_VERSION:
+            raise CursorError(f"Unsupported cursor version {version}")
+        if cursor.fingerprint != expected_fingerprint:
+            raise CursorError("Cursor belongs to a different query")
+        return cursor
+
+
+def candidate_bytes(items: Iterable[Any]) -> int:
+    """
+    Rough resident size of ranked candidates: their content text plus any
+    embedding (a list of Python floats costs ~32 bytes per dimension).
+    Items may be ``(score, item)`` pairs.
+    """
+    total = 0
+    for item in items:
+        if isinstance(item, tuple):
+            item = item[-1]
+        total += 200 + 2 * len(getattr(item, "content", "") or "")
+        embedding = getattr(item, "embedding", None)
+        if embedding is not None:
+            total += 32 * len(embedding)
+    return total
+
+
+class CandidateCache(Generic[T]):
+    """
+    Short-lived LRU of ranked candidate lists keyed by fingerprint.
+
+    With ``max_bytes`` (and a ``sizeof`` for values) least recently used
+    entries are also evicted to keep the estimated total under the bound;
+    a value larger than the whole bound is not cached.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 120.0,
+        max_entries: int = 256,
+        clock: Callable[[], float] = time.monotonic,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[T], int] = candidate_bytes,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, T, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[T]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if self._clock() - entry[0] > self.ttl_seconds:
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, value: T) -> None:
+        size = self._sizeof(value) if self.max_bytes is not None else 0
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._entries[key] = (self._clock(), value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self._drop(next(iter(self._entries)))
+
+    def _drop(self, key: str) -> None:
+        self._bytes -= self._entries.pop(key)[2]
+
+    @property
+    def size_bytes(self) -> int:
+        """Estimated size of the cached values (0 without ``max_bytes``)."""
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def paginate(
+    ranked: List[T],
+    key: Callable[[T], Tuple[float, str]],
+    page_size: int,
+    after: Optional[Cursor],
+    query_fingerprint: str,
+) -> Tuple[List[T], Optional[str]]:
+    """
+    Slice the page after ``after`` from a list ranked by (-score, id).
+
+    Returns the page and the cursor for the next one (None on the last).
+    """
+    start = 0
+    if after is not None:
+        start = bisect_right(
+            ranked,
+            (-after.score, after.id),
+            key=lambda item: (-key(item)[0], key(item)[1]),
+        )
+    page = ranked[start : start + page_size]
+    if not page or start + page_size >= len(ranked):
+        return page, None
+    score, item_id = key(page[-1])
+    return page, Cursor(query_fingerprint, score, item_id).encode()
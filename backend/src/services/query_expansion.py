@@ -0,0 +1,298 @@
+"""
+Query Expansion - Compiled multilingual expansion engine for KLM v2.3
+
+Expansion concepts live in a data file (``backend/src/data/
+query_expansions.json``): each concept has English, romanized and Khmer
+trigger terms and a set of weighted expansions. The file is compiled
+once into an Aho-Corasick automaton, so matching a query is a single
+pass over its characters regardless of how many triggers exist.
+
+Expansions are ordered by weight then term, so the same query always
+yields the same expansions (and therefore the same cache keys). Weights
+can be refreshed from corpus co-occurrence statistics mined offline by
+``scripts/mine_query_cooccurrence.py``.
+
+Author: KLM v2.3
+Version: 2.3.0
+"""
+
+import hashlib
+import json
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from backend.src.utils.khmer import is_cluster_boundary, is_khmer, normalize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DATA_PATH = (
+    Path(__file__).resolve().parents[1] / "data" / "query_expansions.json"
+)
+
+# Mined weights are conditional probabilities; scale them below curated ones
+MINED_WEIGHT_SCALE = 0.8
+MINED_MIN_COUNT = 3
+MINED_MAX_PER_CONCEPT = 5
+
+
+@dataclass(frozen=True)
+class Concept:
+    """One expansion concept: trigger terms and weighted expansions."""
+
+    name: str
+    triggers: Tuple[str, ...]
+    expansions: Tuple[Tuple[str, float], ...]  # sorted by (-weight, term)
+
+
+class _Automaton:
+    """Aho-Corasick matcher over casefolded patterns."""
+
+    def __init__(self, patterns: Dict[str, List[int]]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, Tuple[int, ...]]]] = [[]]
+
+        for pattern, payload in patterns.items():
+            state = 0
+            for char in pattern:
+                nxt = self._goto[state].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][char] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append((len(pattern), tuple(payload)))
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(char, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text: str) -> Iterator[Tuple[int, int, Tuple[int, ...]]]:
+        """Yield (start, end, payload) for every pattern occurrence."""
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, payload in self._out[state]:
+                yield index + 1 - length, index + 1, payload
+
+
+def _fold(text: str) -> str:
+    """Matching form: normalized (Khmer mark order, ZWSP) and casefolded."""
+    return normalize(text).casefold()
+
+
+def _is_word_match(text: str, start: int, end: int) -> bool:
+    """Latin triggers must be whole words; Khmer ones whole clusters."""
+    if is_khmer(text[start]):
+        return is_cluster_boundary(text, start) and is_cluster_boundary(text, end)
+    before_ok = start == 0 or not text[start - 1].isalnum()
+    after_ok = end == len(text) or not text[end].isalnum()
+    return before_ok and after_ok
+
+
+def _contains_word(text: str, term: str) -> bool:
+    """True if ``term`` occurs in ``text`` as a whole word (or cluster)."""
+    start = text.find(term)
+    while start != -1:
+        if _is_word_match(text, start, start + len(term)):
+            return True
+        start = text.find(term, start + 1)
+    return False
+
+
+class QueryExpander:
+    """
+    Compiled expansion engine.
+
+    ``expand`` is memoized per instance; build a new instance (see
+    ``with_cooccurrence`` / ``load_expander``) to change the data.
+    """
+
+    def __init__(self, concepts: List[Concept]):
+        self.concepts = tuple(sorted(concepts, key=lambda c: c.name))
+        patterns: Dict[str, List[int]] = {}
+        for index, concept in enumerate(self.concepts):
+            for trigger in concept.triggers:
+                patterns.setdefault(_fold(trigger), []).append(index)
+        self._automaton = _Automaton(patterns)
+        self.fingerprint = hashlib.sha1(
+            json.dumps(
+                [[c.name, c.triggers, c.expansions] for c in self.concepts],
+                ensure_ascii=False,
+            ).encode("utf-8")
+        ).hexdigest()[:12]
+        self._expand_cached = lru_cache(maxsize=4096)(self._expand)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QueryExpander":
+        """Compile the ``query_expansions.json`` structure."""
+        concepts = []
+        for name, spec in data.get("concepts", {}).items():
+            triggers = tuple(t for t in spec.get("triggers", [name]) if t.strip())
+            expansions = tuple(
+                sorted(
+                    (
+                        (term.strip(), float(w))
+                        for term, w in spec["expansions"].items()
+                    ),
+                    key=lambda tw: (-tw[1], tw[0]),
+                )
+            )
+            concepts.append(Concept(name, triggers, expansions))
+        return cls(concepts)
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "QueryExpander":
+        """Compile a data file (defaults to the bundled one)."""
+        with open(path or DEFAULT_DATA_PATH, encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def with_cooccurrence(
+        self,
+        stats: Dict[str, Any],
+        min_count: int = MINED_MIN_COUNT,
+        max_per_concept: int = MINED_MAX_PER_CONCEPT,
+    ) -> "QueryExpander":
+        """
+        New engine with expansions mined from co-occurrence statistics.
+
+        ``stats`` is the output of scripts/mine_query_cooccurrence.py:
+        ``{"documents": n, "trigger_counts": {trigger: docs},
+        "cooccurrence": {trigger: {term: docs}}, "document_frequency":
+        {term: docs}}``. A mined term's weight is its added value
+        (P(term | trigger) - P(term)) / (1 - P(term)), so terms found in
+        every document score zero, scaled by MINED_WEIGHT_SCALE. Without
+        document frequencies P(term | trigger) is used. Curated weights
+        are never lowered.
+        """
+        trigger_counts = stats.get("trigger_counts", {})
+        cooccurrence = stats.get("cooccurrence", {})
+        documents = stats.get("documents") or 0
+        frequency = stats.get("document_frequency", {})
+
+        def score(term: str, count: int, trigger_docs: int) -> float:
+            conditional = count / trigger_docs
+            if not documents or term not in frequency:
+                return conditional
+            prior = frequency[term] / documents
+            if prior >= 1.0:
+                return 0.0
+            return max(0.0, (conditional - prior) / (1.0 - prior))
+
+        refreshed = []
+        for concept in self.concepts:
+            weights = dict(concept.expansions)
+            triggers = {_fold(t) for t in concept.triggers}
+            mined: Dict[str, float] = {}
+            for trigger in concept.triggers:
+                docs = trigger_counts.get(_fold(trigger), 0)
+                if not docs:
+                    continue
+                for term, count in cooccurrence.get(_fold(trigger), {}).items():
+                    if count < min_count or _fold(term) in triggers:
+                        continue
+                    weight = round(MINED_WEIGHT_SCALE * score(term, count, docs), 4)
+                    if weight > 0:
+                        mined[term] = max(mined.get(term, 0.0), weight)
+            top = sorted(mined.items(), key=lambda tw: (-tw[1], tw[0]))
+            for term, weight in top[:max_per_concept]:
+                weights[term] = max(weights.get(term, 0.0), weight)
+            refreshed.append(
+                Concept(
+                    concept.name,
+                    concept.triggers,
+                    tuple(sorted(weights.items(), key=lambda tw: (-tw[1], tw[0]))),
+                )
+            )
+        return QueryExpander(refreshed)
+
+    def matches(self, query: str) -> List[str]:
+        """Names of the concepts triggered by ``query``, in concept order."""
+        return [self.concepts[i].name for i in self._matched(_fold(query))]
+
+    def matched_triggers(self, text: str) -> Set[str]:
+        """Casefolded trigger terms that occur in ``text`` as whole words."""
+        folded = _fold(text)
+        return {
+            folded[start:end]
+            for start, end, _ in self._automaton.find(folded)
+            if _is_word_match(folded, start, end)
+        }
+
+    def _matched(self, folded: str) -> List[int]:
+        found = set()
+        for start, end, payload in self._automaton.find(folded):
+            if _is_word_match(folded, start, end):
+                found.update(payload)
+        return sorted(found)
+
+    def _expand(self, query: str, max_terms: int) -> Tuple[str, ...]:
+        folded = _fold(query)
+        weights: Dict[str, Tuple[float, str]] = {}
+        for index in self._matched(folded):
+            for term, weight in self.concepts[index].expansions:
+                key = _fold(term)
+                if not key or _contains_word(folded, key):
+                    continue
+                if key not in weights or weight > weights[key][0]:
+                    weights[key] = (weight, term)
+        ranked = sorted(weights.values(), key=lambda wt: (-wt[0], wt[1]))
+        return (query,) + tuple(term for _, term in ranked[:max_terms])
+
+    def expand(self, query: str, max_terms: int = 5) -> Tuple[str, ...]:
+        """
+        The query followed by up to ``max_terms`` expansions.
+
+        Deterministic: heaviest first, ties broken alphabetically.
+        """
+        return self._expand_cached(query, max_terms)
+
+    def cache_key(self, query: str, max_terms: int = 5) -> str:
+        """Stable key for caching anything derived from the expansions."""
+        expansions = self.expand(query, max_terms)[1:]
+        return f"{self.fingerprint}:" + "\x1f".join((normalize(query),) + expansions)
+
+
+_load_lock = threading.Lock()
+_loaded: Dict[Tuple[Optional[str], Optional[str]], QueryExpander] = {}
+
+
+def load_expander(
+    data_path: Optional[str] = None,
+    stats_path: Optional[str] = None,
+    reload: bool = False,
+) -> QueryExpander:
+    """
+    Shared engine for a (data file, co-occurrence stats) pair.
+
+    Compiled once per process; ``reload=True`` recompiles from disk, e.g.
+    after the miner has written fresh statistics.
+    """
+    key = (data_path, stats_path)
+    with _load_lock:
+        if reload or key not in _loaded:
+            expander = QueryExpander.load(Path(data_path) if data_path else None)
+            if stats_path:
+                try:
+                    with open(stats_path, encoding="utf-8") as f:
+                        expander = expander.with_cooccurrence(json.load(f))
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Ignoring expansion stats {stats_path}: {e}")
+            _loaded[key] = expander
+        return _loaded[key]
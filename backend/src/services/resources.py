@@ -0,0 +1,140 @@
+"""
+Resources - Per-worker registry of warm service instances for KLM v2.3
+
+Prefect tasks used to build (and connect) a new OpenRAGService for every
+call, so each ingested file paid several client constructions and TLS
+handshakes. Tasks now ask the worker's registry instead: the first call
+builds and connects the instance, later calls get the same warm one, and
+the last flow using the registry closes everything when it ends.
+
+Resources are shared across threads and event loops (flow runs served
+on separate loops), so they must not hold loop-bound state themselves:
+OpenRAGService keeps one async HTTP client per event loop.
+
+Usage:
+    async with flow_resources() as resources:
+        openrag = resources.openrag()  # in any task of the flow
+
+Author: KLM v2.3
+Version: 2.3.0
+"""
+
+import inspect
+import logging
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from backend.src.services.openrag_service import OpenRAGConfig, OpenRAGService
+
+logger = logging.getLogger(__name__)
+
+
+class ResourceRegistry:
+    """Process-wide (per worker) cache of named, closable resources."""
+
+    def __init__(self) -> None:
+        self._resources: Dict[str, Any] = {}
+        self._closers: Dict[str, Optional[Callable[[Any], Any]]] = {}
+        self._lock = threading.Lock()
+        self._users = 0
+        self.created = 0
+        self.reused = 0
+
+    def get(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        close: Optional[Callable[[Any], Any]] = None,
+    ) -> Any:
+        """
+        Return the resource ``name``, building it with ``factory`` once.
+
+        A factory that raises leaves nothing cached, so the next call
+        retries. ``close`` (sync or async) is called on shutdown.
+        """
+        with self._lock:
+            if name in self._resources:
+                self.reused += 1
+                return self._resources[name]
+            resource = factory()
+            self._resources[name] = resource
+            self._closers[name] = close
+            self.created += 1
+            return resource
+
+    def openrag(self, config: Optional[OpenRAGConfig] = None) -> OpenRAGService:
+        """
+        Shared, connected OpenRAGService.
+
+        Raises:
+            RuntimeError: If Supabase is not reachable/configured
+        """
+
+        def build() -> OpenRAGService:
+            service = OpenRAGService(config)
+            if not service.connect():
+                raise RuntimeError("Failed to connect to Supabase")
+            return service
+
+        return self.get("openrag", build, OpenRAGService.aclose)
+
+    async def aclose(self) -> None:
+        """Close and forget every resource (errors are logged, not raised)."""
+        with self._lock:
+            resources = list(self._resources.items())
+            closers = dict(self._closers)
+            self._resources.clear()
+            self._closers.clear()
+        for name, resource in reversed(resources):
+            close = closers.get(name)
+            if close is None:
+                continue
+            try:
+                result = close(resource)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.warning(f"Closing resource {name} failed: {e}")
+
+    def acquire(self) -> None:
+        """Register one more user (a running flow)."""
+        with self._lock:
+            self._users += 1
+
+    async def release(self) -> None:
+        """Drop one user; the last one out closes the resources."""
+        with self._lock:
+            self._users -= 1
+            last = self._users == 0
+        if last:
+            await self.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "resources": sorted(self._resources),
+                "users": self._users,
+                "created": self.created,
+                "reused": self.reused,
+            }
+
+
+worker_resources = ResourceRegistry()
+
+
+@asynccontextmanager
+async def flow_resources(
+    registry: ResourceRegistry = worker_resources,
+) -> AsyncIterator[ResourceRegistry]:
+    """
+    Scope a flow run's use of the worker registry.
+
+    Concurrent flows in one worker share the instances; they are closed
+    when the last of them exits.
+    """
+    registry.acquire()
+    try:
+        yield registry
+    finally:
+        await registry.release()
@@ -0,0 +1,231 @@
+"""
+Stage Pipeline - Connected async stages with bounded queues for KLM v2.3
+
+A pipeline is a chain of stages joined by bounded ``asyncio.Queue``s.
+Each stage has its own worker count and batch size: a worker takes up
+to ``batch_size`` items (waiting at most ``max_wait_seconds`` for a
+batch to fill), hands them to the stage's handler and forwards what the
+handler returns. A full queue blocks the stage feeding it, so a slow
+stage throttles the ones before it instead of letting work pile up in
+memory, while every stage keeps working on its own items: parsing goes
+on while embeddings and writes wait on the network.
+
+Per stage, throughput (items/s over the stage's active time), busy
+time, batches and queue depth (max and mean, sampled at every take) are
+recorded; ``snapshot()`` reads them while the pipeline runs.
+
+Author: KLM v2.3
+Version: 2.3.0
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()  # End of stream; re-queued so every worker sees it
+
+
+@dataclass
+class Stage:
+    """
+    One pipeline stage.
+
+    ``handler`` gets a batch and returns the items to pass downstream
+    (all, some or none of them, or new ones). It should settle failures
+    itself; an exception drops the batch and counts as an error.
+    """
+
+    name: str
+    handler: Callable[[List[Any]], Awaitable[Iterable[Any]]]
+    concurrency: int = 1
+    batch_size: int = 1
+    max_wait_seconds: float = 0.05
+    queue_size: int = 0  # Inbox bound; 0: two batches per worker
+
+
+@dataclass
+class StageMetrics:
+    """Counters for one stage."""
+
+    name: str
+    items_in: int = 0
+    items_out: int = 0
+    batches: int = 0
+    errors: int = 0
+    busy_seconds: float = 0.0
+    queue_depth_max: int = 0
+    queue_depth_total: int = 0
+    queue_samples: int = 0
+    first_at: Optional[float] = None
+    last_at: Optional[float] = None
+
+    def sample(self, depth: int) -> None:
+        self.queue_depth_max = max(self.queue_depth_max, depth)
+        self.queue_depth_total += depth
+        self.queue_samples += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        active = (
+            (self.last_at or time.perf_counter()) - self.first_at
+            if self.first_at is not None
+            else 0.0
+        )
+        return {
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "batches": self.batches,
+            "errors": self.errors,
+            "mean_batch": (
+                round(self.items_in / self.batches, 1) if self.batches else 0.0
+            ),
+            "busy_seconds": round(self.busy_seconds, 3),
+            "throughput": round(self.items_in / active, 1) if active > 0 else 0.0,
+            "queue_depth_max": self.queue_depth_max,
+            "queue_depth_mean": (
+                round(self.queue_depth_total / self.queue_samples, 1)
+                if self.queue_samples
+                else 0.0
+            ),
+        }
+
+
+class Pipeline:
+    """Runs items through ``stages`` in order; see the module docstring."""
+
+    def __init__(self, stages: List[Stage]):
+        if not stages:
+            raise ValueError("A pipeline needs at least one stage")
+        self.stages = stages
+        self.queues: List[asyncio.Queue] = []
+        self.metrics = [StageMetrics(stage.name) for stage in stages]
+
+    async def _take(self, stage: Stage, inbox: asyncio.Queue) -> Optional[List[Any]]:
+        """Next batch, or None once the stream has ended."""
+        first = await inbox.get()
+        if first is _DONE:
+            inbox.put_nowait(_DONE)
+            return None
+        batch = [first]
+        deadline = time.monotonic() + stage.max_wait_seconds
+        while len(batch) < stage.batch_size:
+            try:
+                item = inbox.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(inbox.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            if item is _DONE:
+                inbox.put_nowait(_DONE)
+                break
+            batch.append(item)
+        return batch
+
+    async def _worker(
+        self,
+        stage: Stage,
+        metrics: StageMetrics,
+        inbox: asyncio.Queue,
+        emit: Callable[[Any], Awaitable[None]],
+    ) -> None:
+        while True:
+            depth = inbox.qsize()
+            batch = await self._take(stage, inbox)
+            if batch is None:
+                return
+            metrics.sample(depth)
+            start = time.perf_counter()
+            if metrics.first_at is None:
+                metrics.first_at = start
+            try:
+                forward = list(await stage.handler(batch))
+            except Exception as e:
+                logger.error(f"Stage {stage.name} dropped {len(batch)} items: {e}")
+                metrics.errors += 1
+                forward = []
+            end = time.perf_counter()
+            metrics.busy_seconds += end - start
+            metrics.last_at = end
+            metrics.items_in += len(batch)
+            metrics.batches += 1
+            metrics.items_out += len(forward)
+            for item in forward:
+                await emit(item)
+
+    async def run(
+        self, source: Iterable[Any], report_every: Optional[float] = None
+    ) -> List[Any]:
+        """
+        Feed ``source`` through every stage; returns the last stage's
+        output (in completion order).
+        """
+        self.queues = [
+            asyncio.Queue(
+                maxsize=stage.queue_size
+                or 2 * max(1, stage.concurrency) * max(1, stage.batch_size)
+            )
+            for stage in self.stages
+        ]
+        outputs: List[Any] = []
+
+        async def collect(item: Any) -> None:
+            outputs.append(item)
+
+        async def feed() -> None:
+            for item in source:
+                await self.queues[0].put(item)
+            await self.queues[0].put(_DONE)
+
+        async def run_stage(index: int) -> None:
+            stage = self.stages[index]
+            emit = (
+                self.queues[index + 1].put if index + 1 < len(self.stages) else collect
+            )
+            await asyncio.gather(
+                *(
+                    self._worker(stage, self.metrics[index], self.queues[index], emit)
+                    for _ in range(max(1, stage.concurrency))
+                )
+            )
+            if index + 1 < len(self.stages):
+                await self.queues[index + 1].put(_DONE)
+
+        reporter = (
+            asyncio.ensure_future(self._report(report_every)) if report_every else None
+        )
+        try:
+            await asyncio.gather(
+                feed(), *(run_stage(i) for i in range(len(self.stages)))
+            )
+        finally:
+            if reporter is not None:
+                reporter.cancel()
+        return outputs
+
+    async def _report(self, every: float) -> None:
+        while True:
+            await asyncio.sleep(every)
+            logger.info(
+                "Pipeline: "
+                + ", ".join(
+                    f"{name} {s['items_in']} done / {s['queue_depth']} queued"
+                    for name, s in self.snapshot().items()
+                )
+            )
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-stage metrics plus current queue depth."""
+        return {
+            metrics.name: {
+                **metrics.as_dict(),
+                "queue_depth": self.queues[i].qsize() if self.queues else 0,
+            }
+            for i, metrics in enumerate(self.metrics)
+        }
@@ -0,0 +1,395 @@
+"""
+Khmer Text Utilities - Script-aware helpers for KLM v2.3
+
+Khmer is written without spaces between words, and a single written
+syllable is a base consonant followed by subscript (COENG + consonant)
+and dependent vowel/sign code points. Cutting a string between those
+code points produces broken glyphs, so truncation here only ever cuts
+at cluster boundaries, preferring spaces, ZWSP and Khmer punctuation.
+
+The same text also arrives in several encodings (mark order, split
+vowels, stray ZWSP). ``normalize`` maps them to one form so hashing,
+caching and dedup agree, and ``segment`` splits Khmer into dictionary
+words with a dynamic-programming segmenter (results are memoized per
+run of Khmer text, so repeated choruses and queries are free).
+
+Author: KLM v2.3
+Version: 2.3.0
+"""
+
+import hashlib
+import math
+import os
+import re
+import threading
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import FrozenSet, List, Optional, Tuple
+
+COENG = "\u17d2"
+ZWSP = "\u200b"
+KHAN = "\u17d4"  # ។ sentence end
+BARIYOOSAN = "\u17d5"  # ៕ section end
+RO = "\u179a"
+
+DEFAULT_DICTIONARY_PATH = (
+    Path(__file__).resolve().parents[1] / "data" / "khmer_words.txt"
+)
+MAX_MEMO_RUN = 256  # Longer Khmer runs are segmented but not memoized
+
+_BREAK_CHARS = frozenset(" \t\n\r" + ZWSP + KHAN + BARIYOOSAN + ".,;:!?")
+
+
+def is_khmer(char: str) -> bool:
+    """True for characters in the Khmer and Khmer Symbols blocks."""
+    code = ord(char)
+    return 0x1780 <= code <= 0x17FF or 0x19E0 <= code <= 0x19FF
+
+
+def is_khmer_mark(char: str) -> bool:
+    """True for dependent vowels, signs and COENG (never start a cluster)."""
+    code = ord(char)
+    return 0x17B4 <= code <= 0x17D3 or code == 0x17DD
+
+
+def is_cluster_boundary(text: str, index: int) -> bool:
+    """True if ``text`` may be split before ``index`` without breaking a glyph."""
+    if index <= 0 or index >= len(text):
+        return True
+    if is_khmer_mark(text[index]):
+        return False
+    # A consonant after COENG is a subscript of the previous cluster
+    return text[index - 1] != COENG
+
+
+def safe_truncate(text: str, max_chars: int, ellipsis: str = "…") -> str:
+    """
+    Truncate ``text`` to at most ``max_chars`` characters at a safe boundary.
+
+    Prefers the last word/sentence break in the back half of the window,
+    then falls back to the nearest Khmer cluster boundary.
+
+    Args:
+        text: Text to truncate
+        max_chars: Maximum length of the result, including ``ellipsis``
+        ellipsis: Marker appended when text was cut
+
+    Returns:
+        The original text if it fits, otherwise a truncated copy
+    """
+    if len(text) <= max_chars:
+        return text
+    limit = max(0, max_chars - len(ellipsis))
+
+    cut = limit
+    for i in range(limit, limit // 2, -1):
+        if text[i - 1] in _BREAK_CHARS:
+            cut = i
+            break
+    else:
+        while cut > 0 and not is_cluster_boundary(text, cut):
+            cut -= 1
+
+    return text[:cut].rstrip() + ellipsis
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap LLM token estimate without a tokenizer dependency.
+
+    BPE vocabularies average ~4 characters per token for Latin text but
+    split Khmer far more finely, so Khmer characters are weighted higher.
+    """
+    if not text:
+        return 0
+    khmer = sum(1 for c in text if is_khmer(c))
+    other = len(text) - khmer
+    return math.ceil(other / 4 + khmer / 1.5)
+
+
+def chars_for_tokens(text: str, tokens: int) -> int:
+    """Largest prefix length of ``text`` whose token estimate fits ``tokens``."""
+    budget = float(tokens)
+    for i, c in enumerate(text):
+        budget -= 1 / 1.5 if is_khmer(c) else 1 / 4
+        if budget < 0:
+            return i
+    return len(text)
+
+
+_LINE_BREAK_CHARS = frozenset("\n" + KHAN + BARIYOOSAN)
+
+
+def _chunk_end(text: str, start: int, end: int) -> int:
+    """Best cut in ``text[start:end]``: a line/sentence break, then any
+    break, in the back half of the window; else a cluster boundary."""
+    floor = start + (end - start) // 2
+    for breaks in (_LINE_BREAK_CHARS, _BREAK_CHARS):
+        for i in range(end, floor, -1):
+            if text[i - 1] in breaks:
+                return i
+    cut = end
+    while cut > start + 1 and not is_cluster_boundary(text, cut):
+        cut -= 1
+    return cut
+
+
+def chunk_text(text: str, max_tokens: int, overlap_tokens: int = 0) -> List[str]:
+    """
+    Split ``text`` into overlapping chunks of at most ``max_tokens``
+    (``estimate_tokens``), cut at line/sentence/word breaks where possible
+    and never inside a Khmer cluster.
+
+    Each chunk after the first starts about ``overlap_tokens`` before the
+    previous one ended (at a break or cluster boundary), so a phrase cut
+    by one boundary is whole in the next chunk.
+
+    Returns:
+        ``[text]`` if it fits, otherwise the chunks in order
+    """
+    text = text.strip()
+    if estimate_tokens(text) <= max_tokens:
+        return [text] if text else []
+
+    chunks: List[str] = []
+    start = 0
+    while start < len(text):
+        end = start + max(1, chars_for_tokens(text[start:], max_tokens))
+        if end < len(text):
+            end = _chunk_end(text, start, end)
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+
+        # Step back by the overlap, then forward to the next break, but
+        # always past the middle of this chunk so the loop advances
+        overlap = chars_for_tokens(text[start:end][::-1], overlap_tokens)
+        nxt = max(end - overlap, start + (end - start + 1) // 2)
+        for i in range(nxt, end):
+            if text[i - 1] in _BREAK_CHARS:
+                nxt = i
+                break
+        else:
+            while nxt < end and not is_cluster_boundary(text, nxt):
+                nxt += 1
+        start = nxt
+    return chunks
+
+
+# A cluster is a non-mark character followed by its marks, where COENG
+# also swallows the subscript consonant after it; a stray leading mark
+# forms its own cluster (same rule as is_cluster_boundary).
+_CLUSTER_RE = re.compile(
+    "[^\u17b4-\u17d3\u17dd](?:\u17d2.?|[\u17b4-\u17d1\u17d3\u17dd])*|.", re.S
+)
+_MARK_UNIT = "(?:\u17d2[\u1780-\u17b3]|[\u17b4-\u17d1\u17d3\u17dd])"
+# A run of mark units containing an adjacent pair out of canonical order
+# (or repeated). Clean text never matches, so it never reaches Python.
+_DISORDERED_MARKS_RE = re.compile(
+    _MARK_UNIT
+    + "*(?:"
+    + "[\u17b6-\u17d1\u17d3\u17dd]\u17d2[\u1780-\u17b3]"
+    + "|\u17d2\u179a\u17d2(?!\u179a)[\u1780-\u17b3]"
+    + "|[\u17b6-\u17c8\u17cb-\u17d1\u17d3\u17dd][\u17c9\u17ca]"
+    + "|[\u17c6-\u17c8\u17cb-\u17d1\u17d3\u17dd][\u17b6-\u17c5]"
+    + "|([\u17b6-\u17d1\u17d3\u17dd])\\1|(\u17d2[\u1780-\u17b3])\\2"
+    + ")"
+    + _MARK_UNIT
+    + "*"
+)
+_MARK_UNIT_RE = re.compile("\u17d2[\u1780-\u17b3]|[\u17b4-\u17d1\u17d3\u17dd]")
+_SPACE_RE = re.compile(r"[^\S\n]+")
+_KHMER_RUN_RE = re.compile("[\u1780-\u17d3\u17dd]+")
+_TOKEN_RE = re.compile(
+    "[\u1780-\u17d3\u17dd]+|[^\\s\u200b\u1780-\u17dd.,;:!?\"'()\\[\\]]+"
+)
+
+_CHAR_FIXES = str.maketrans(
+    {
+        "\u17b4": None,  # Inherent vowels are invisible and deprecated
+        "\u17b5": None,
+        "\u17a3": "\u17a2",  # Deprecated independent vowels
+        "\u17a4": "\u17a2\u17b6",
+        "\ufeff": None,
+    }
+)
+_FIX_CHARS_RE = re.compile("[\u17a3\u17a4\u17b4\u17b5\ufeff]")
+# Split vowels typed as two code points
+_VOWEL_FIXES = (("\u17c1\u17b8", "\u17be"), ("\u17c1\u17b6", "\u17c4"))
+
+
+def _mark_rank(unit: str) -> int:
+    """Canonical order: subscripts, COENG RO, shifters, vowels, signs."""
+    if unit[0] == COENG:
+        return 1 if unit[1] == RO else 0
+    code = ord(unit)
+    if code in (0x17C9, 0x17CA):
+        return 2
+    if 0x17B6 <= code <= 0x17C5:
+        return 3
+    return 4
+
+
+def _reorder_marks(match: "re.Match[str]") -> str:
+    units = _MARK_UNIT_RE.findall(match.group())
+    ordered: List[str] = []
+    for unit in sorted(units, key=_mark_rank):
+        if not ordered or ordered[-1] != unit:
+            ordered.append(unit)
+    return "".join(ordered)
+
+
+def _normalize(text: str, keep_zwsp: bool) -> str:
+    text = unicodedata.normalize("NFC", text)
+    if text.isascii():
+        return _SPACE_RE.sub(" ", text).strip()
+    if _FIX_CHARS_RE.search(text):
+        text = text.translate(_CHAR_FIXES)
+    if not keep_zwsp and ZWSP in text:
+        text = text.replace(ZWSP, "")
+    text = _DISORDERED_MARKS_RE.sub(_reorder_marks, text)
+    for split, joined in _VOWEL_FIXES:
+        if split in text:
+            text = text.replace(split, joined)
+    return _SPACE_RE.sub(" ", text).strip()
+
+
+def normalize(text: str) -> str:
+    """
+    Canonical form of ``text`` for hashing, caching and comparison.
+
+    NFC, ZWSP/BOM removed, Khmer marks in canonical order with duplicates
+    dropped, split vowels joined, deprecated characters replaced and
+    horizontal whitespace collapsed. Case is preserved.
+    """
+    if len(text) <= MAX_MEMO_RUN:
+        return _normalize_short(text)
+    return _normalize(text, keep_zwsp=False)
+
+
+@lru_cache(maxsize=16384)
+def _normalize_short(text: str) -> str:
+    return _normalize(text, keep_zwsp=False)
+
+
+def content_hash(text: str) -> str:
+    """Stable hash of the normalized, casefolded text (for dedup keys)."""
+    return hashlib.sha256(normalize(text).casefold().encode("utf-8")).hexdigest()
+
+
+def clusters(text: str) -> List[str]:
+    """Split a run of Khmer text into orthographic syllable clusters."""
+    return _CLUSTER_RE.findall(text)
+
+
+_dictionary_lock = threading.Lock()
+_dictionary: Optional[Tuple[FrozenSet[str], int]] = None
+
+
+def load_dictionary(path: Optional[str] = None) -> int:
+    """
+    Load the segmentation word list, replacing the current one.
+
+    Defaults to KHMER_DICTIONARY or the bundled seed list. Clears the
+    segmentation memo. Returns the number of words loaded.
+    """
+    global _dictionary
+    source = Path(path or os.getenv("KHMER_DICTIONARY") or DEFAULT_DICTIONARY_PATH)
+    words = set()
+    with open(source, encoding="utf-8") as f:
+        for line in f:
+            word = normalize(line.split("#", 1)[0])
+            if word:
+                words.add(word)
+    longest = max((len(clusters(w)) for w in words), default=1)
+    with _dictionary_lock:
+        _dictionary = (frozenset(words), longest)
+        _segment_run.cache_clear()
+    return len(words)
+
+
+def _words() -> Tuple[FrozenSet[str], int]:
+    if _dictionary is None:
+        load_dictionary()
+    return _dictionary
+
+
+@lru_cache(maxsize=65536)
+def _segment_run(run: str) -> Tuple[str, ...]:
+    """
+    Segment one run of Khmer letters into words.
+
+    Dynamic programming over cluster boundaries minimizing (unknown
+    clusters, tokens): dictionary words always beat leftovers, then the
+    fewest words win. Unknown clusters become single-cluster tokens.
+    """
+    words, longest = _words()
+    bounds = [0]
+    for cluster in clusters(run):
+        bounds.append(bounds[-1] + len(cluster))
+    n = len(bounds) - 1
+
+    best: List[Tuple[int, int]] = [(0, 0)] + [(n + 1, n + 1)] * n
+    back = [0] * (n + 1)
+    for end in range(1, n + 1):
+        unknown, tokens = best[end - 1]
+        best[end] = (unknown + 1, tokens + 1)
+        back[end] = end - 1
+        for start in range(max(0, end - longest), end):
+            if run[bounds[start] : bounds[end]] in words:
+                unknown, tokens = best[start]
+                if (unknown, tokens + 1) < best[end]:
+                    best[end] = (unknown, tokens + 1)
+                    back[end] = start
+
+    out: List[str] = []
+    end = n
+    while end > 0:
+        start = back[end]
+        out.append(run[bounds[start] : bounds[end]])
+        end = start
+    out.reverse()
+    return tuple(out)
+
+
+def _segment_khmer(run: str) -> Tuple[str, ...]:
+    if len(run) > MAX_MEMO_RUN:
+        return _segment_run.__wrapped__(run)
+    return _segment_run(run)
+
+
+def segment(text: str) -> List[str]:
+    """
+    Word tokens of ``text``: Khmer runs segmented, other words as-is.
+
+    Text is normalized first; ZWSP, spaces and punctuation separate
+    tokens and are dropped.
+    """
+    tokens: List[str] = []
+    for match in _TOKEN_RE.finditer(_normalize(text, keep_zwsp=True)):
+        token = match.group()
+        if is_khmer(token[0]):
+            tokens.extend(_segment_khmer(token))
+        else:
+            tokens.append(token)
+    return tokens
+
+
+def segment_for_index(text: str) -> str:
+    """Space-separated word tokens, for full-text indexes and queries."""
+    return " ".join(segment(text))
+
+
+def spaced(text: str) -> str:
+    """
+    Normalized text with spaces between Khmer words.
+
+    Unlike ``segment_for_index`` punctuation and line breaks are kept, so
+    the result is still readable (used as embedding input).
+    """
+    text = _normalize(text, keep_zwsp=True).replace(ZWSP, " ")
+    text = _KHMER_RUN_RE.sub(lambda m: " ".join(_segment_khmer(m.group())), text)
+    return _SPACE_RE.sub(" ", text).strip()
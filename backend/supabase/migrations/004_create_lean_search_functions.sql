@@ -0,0 +1,95 @@
+-- Migration: Lean search functions with column projection
+-- Status: Ready to execute (after 003_create_agent_sessions_table.sql)
+--
+-- hybrid_search_lyrics / search_similar_sessions always return every
+-- column, including the 1536-float embedding. These variants let callers
+-- skip the heavy columns they do not need; skipped columns come back NULL
+-- and content_length still reports the body size for quality scoring.
+
+-- Lean lyrics search (content and embedding are opt-in per request)
+CREATE OR REPLACE FUNCTION hybrid_search_lyrics_lean(
+    query_embedding VECTOR(1536),
+    match_threshold FLOAT,
+    match_count INT,
+    filter_artist TEXT DEFAULT NULL,
+    filter_era TEXT DEFAULT NULL,
+    filter_status TEXT DEFAULT NULL,
+    include_content BOOLEAN DEFAULT TRUE,
+    include_embedding BOOLEAN DEFAULT FALSE
+)
+RETURNS TABLE (
+    id UUID,
+    title TEXT,
+    artist TEXT,
+    era TEXT,
+    lyrics_khmer TEXT,
+    content_length INT,
+    embedding VECTOR(1536),
+    similarity FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        l.id,
+        l.title,
+        l.artist,
+        l.era,
+        CASE WHEN include_content THEN l.lyrics_khmer END,
+        COALESCE(char_length(l.lyrics_khmer), 0),
+        CASE WHEN include_embedding THEN l.embedding END,
+        1 - (l.embedding <=> query_embedding) AS similarity
+    FROM lyrics l
+    WHERE
+        (filter_artist IS NULL OR l.artist = filter_artist) AND
+        (filter_era IS NULL OR l.era = filter_era) AND
+        (filter_status IS NULL OR l.status::TEXT = filter_status) AND
+        l.embedding IS NOT NULL AND
+        1 - (l.embedding <=> query_embedding) > match_threshold
+    ORDER BY l.embedding <=> query_embedding
+    LIMIT match_count;
+END;
+$$;
+
+-- Lean session search (summary is opt-in per request)
+CREATE OR REPLACE FUNCTION search_similar_sessions_lean(
+    query_embedding VECTOR(1536),
+    match_threshold FLOAT DEFAULT 0.7,
+    match_count INT DEFAULT 5,
+    agent_filter TEXT DEFAULT NULL,
+    include_content BOOLEAN DEFAULT TRUE
+)
+RETURNS TABLE (
+    id UUID,
+    session_id TEXT,
+    agent_id TEXT,
+    task_description TEXT,
+    summary TEXT,
+    content_length INT,
+    similarity FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        s.id,
+        s.session_id,
+        s.agent_id,
+        s.task_description,
+        CASE WHEN include_content THEN s.summary END,
+        COALESCE(char_length(s.summary), 0),
+        1 - (s.context_embedding <=> query_embedding) AS similarity
+    FROM agent_sessions s
+    WHERE
+        (agent_filter IS NULL OR s.agent_id = agent_filter) AND
+        s.context_embedding IS NOT NULL AND
+        1 - (s.context_embedding <=> query_embedding) > match_threshold
+    ORDER BY s.context_embedding <=> query_embedding
+    LIMIT match_count;
+END;
+$$;
+
+COMMENT ON FUNCTION hybrid_search_lyrics_lean IS 'Projected lyrics search: heavy columns only when requested';
+COMMENT ON FUNCTION search_similar_sessions_lean IS 'Projected session search: summary only when requested';
@@ -0,0 +1,143 @@
+-- Migration: Switch vector indexes from IVFFlat to HNSW
+-- Status: Ready to execute (after 004_create_lean_search_functions.sql)
+-- Requires: pgvector >= 0.5.0 (HNSW support)
+--
+-- The IVFFlat indexes from 002/003 were built on empty tables, so their
+-- list centroids never reflected real data and recall drifts as rows are
+-- added. HNSW needs no training data and keeps recall stable with growth.
+-- Search functions gain per-call ef_search / ivf_probes knobs, applied with
+-- SET LOCAL semantics so they only affect the calling transaction.
+
+-- Replace IVFFlat indexes with HNSW
+DROP INDEX IF EXISTS idx_lyrics_embedding_cosine;
+CREATE INDEX IF NOT EXISTS idx_lyrics_embedding_hnsw
+    ON lyrics USING hnsw (embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
+
+DROP INDEX IF EXISTS idx_agent_sessions_embedding_cosine;
+CREATE INDEX IF NOT EXISTS idx_agent_sessions_embedding_hnsw
+    ON agent_sessions USING hnsw (context_embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
+
+-- Apply per-call index tuning for the current transaction only
+CREATE OR REPLACE FUNCTION apply_vector_search_tuning(
+    ef_search INT DEFAULT NULL,
+    ivf_probes INT DEFAULT NULL
+)
+RETURNS VOID
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF ef_search IS NOT NULL THEN
+        PERFORM set_config('hnsw.ef_search', ef_search::TEXT, true);
+    END IF;
+    IF ivf_probes IS NOT NULL THEN
+        PERFORM set_config('ivfflat.probes', ivf_probes::TEXT, true);
+    END IF;
+END;
+$$;
+
+-- Signatures change, so drop the 004 versions rather than overloading them
+DROP FUNCTION IF EXISTS hybrid_search_lyrics_lean(
+    VECTOR(1536), FLOAT, INT, TEXT, TEXT, TEXT, BOOLEAN, BOOLEAN
+);
+DROP FUNCTION IF EXISTS search_similar_sessions_lean(
+    VECTOR(1536), FLOAT, INT, TEXT, BOOLEAN
+);
+
+CREATE OR REPLACE FUNCTION hybrid_search_lyrics_lean(
+    query_embedding VECTOR(1536),
+    match_threshold FLOAT,
+    match_count INT,
+    filter_artist TEXT DEFAULT NULL,
+    filter_era TEXT DEFAULT NULL,
+    filter_status TEXT DEFAULT NULL,
+    include_content BOOLEAN DEFAULT TRUE,
+    include_embedding BOOLEAN DEFAULT FALSE,
+    ef_search INT DEFAULT NULL,
+    ivf_probes INT DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    title TEXT,
+    artist TEXT,
+    era TEXT,
+    lyrics_khmer TEXT,
+    content_length INT,
+    embedding VECTOR(1536),
+    similarity FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM apply_vector_search_tuning(ef_search, ivf_probes);
+
+    RETURN QUERY
+    SELECT
+        l.id,
+        l.title,
+        l.artist,
+        l.era,
+        CASE WHEN include_content THEN l.lyrics_khmer END,
+        COALESCE(char_length(l.lyrics_khmer), 0),
+        CASE WHEN include_embedding THEN l.embedding END,
+        1 - (l.embedding <=> query_embedding) AS similarity
+    FROM lyrics l
+    WHERE
+        (filter_artist IS NULL OR l.artist = filter_artist) AND
+        (filter_era IS NULL OR l.era = filter_era) AND
+        (filter_status IS NULL OR l.status::TEXT = filter_status) AND
+        l.embedding IS NOT NULL AND
+        1 - (l.embedding <=> query_embedding) > match_threshold
+    ORDER BY l.embedding <=> query_embedding
+    LIMIT match_count;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION search_similar_sessions_lean(
+    query_embedding VECTOR(1536),
+    match_threshold FLOAT DEFAULT 0.7,
+    match_count INT DEFAULT 5,
+    agent_filter TEXT DEFAULT NULL,
+    include_content BOOLEAN DEFAULT TRUE,
+    ef_search INT DEFAULT NULL,
+    ivf_probes INT DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    session_id TEXT,
+    agent_id TEXT,
+    task_description TEXT,
+    summary TEXT,
+    content_length INT,
+    similarity FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM apply_vector_search_tuning(ef_search, ivf_probes);
+
+    RETURN QUERY
+    SELECT
+        s.id,
+        s.session_id,
+        s.agent_id,
+        s.task_description,
+        CASE WHEN include_content THEN s.summary END,
+        COALESCE(char_length(s.summary), 0),
+        1 - (s.context_embedding <=> query_embedding) AS similarity
+    FROM agent_sessions s
+    WHERE
+        (agent_filter IS NULL OR s.agent_id = agent_filter) AND
+        s.context_embedding IS NOT NULL AND
+        1 - (s.context_embedding <=> query_embedding) > match_threshold
+    ORDER BY s.context_embedding <=> query_embedding
+    LIMIT match_count;
+END;
+$$;
+
+COMMENT ON FUNCTION apply_vector_search_tuning IS 'Transaction-local hnsw.ef_search / ivfflat.probes';
+COMMENT ON FUNCTION hybrid_search_lyrics_lean IS 'Projected lyrics search: heavy columns only when requested';
+COMMENT ON FUNCTION search_similar_sessions_lean IS 'Projected session search: summary only when requested';
+COMMENT ON INDEX idx_lyrics_embedding_hnsw IS 'HNSW cosine index; tune recall per call with ef_search';
+COMMENT ON INDEX idx_agent_sessions_embedding_hnsw IS 'HNSW cosine index; tune recall per call with ef_search';
@@ -0,0 +1,98 @@
+-- Migration: Lexical (full-text + trigram) search over lyrics
+-- Status: Ready to execute (after 005_hnsw_vector_indexes.sql)
+--
+-- Exact title, artist and phrase lookups do not need an embedding. This
+-- adds a weighted tsvector over title/artist, romanized lyrics and a
+-- space-segmented copy of the Khmer lyrics, plus trigram indexes for
+-- fuzzy title/artist matches, and a lean RPC that ranks by both.
+--
+-- lyrics_khmer_segmented is written by the application (Postgres has no
+-- Khmer word breaker); the 'simple' configuration is used throughout so
+-- Khmer and romanized tokens are never stemmed.
+--
+-- Backfill: existing rows get lyrics_khmer_segmented = NULL and stay out
+-- of the Khmer term branch until it is filled. After applying this
+-- migration, run scripts/backfill_segmented_lyrics.py once.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+ALTER TABLE lyrics ADD COLUMN IF NOT EXISTS lyrics_khmer_segmented TEXT;
+
+ALTER TABLE lyrics ADD COLUMN IF NOT EXISTS search_tsv TSVECTOR
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', COALESCE(title, '')), 'A') ||
+        setweight(to_tsvector('simple', COALESCE(artist, '')), 'A') ||
+        setweight(to_tsvector('simple', COALESCE(lyrics_romanized, '')), 'B') ||
+        setweight(to_tsvector('simple', COALESCE(lyrics_khmer_segmented, '')), 'C')
+    ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_lyrics_search_tsv
+    ON lyrics USING gin (search_tsv);
+CREATE INDEX IF NOT EXISTS idx_lyrics_title_trgm
+    ON lyrics USING gin (lower(title) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_lyrics_artist_trgm
+    ON lyrics USING gin (lower(artist) gin_trgm_ops);
+
+-- Lexical lyrics search; lexical_score is in [0, 1]
+-- query_text must already be segmented the same way as the column
+CREATE OR REPLACE FUNCTION lexical_search_lyrics_lean(
+    query_text TEXT,
+    match_count INT,
+    filter_artist TEXT DEFAULT NULL,
+    filter_era TEXT DEFAULT NULL,
+    filter_status TEXT DEFAULT NULL,
+    include_content BOOLEAN DEFAULT TRUE,
+    include_embedding BOOLEAN DEFAULT FALSE,
+    trigram_threshold FLOAT DEFAULT 0.3
+)
+RETURNS TABLE (
+    id UUID,
+    title TEXT,
+    artist TEXT,
+    era TEXT,
+    lyrics_khmer TEXT,
+    content_length INT,
+    embedding VECTOR(1536),
+    lexical_score FLOAT
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    ts_query TSQUERY := websearch_to_tsquery('simple', query_text);
+    needle TEXT := lower(query_text);
+BEGIN
+    -- % uses this threshold and, unlike similarity() > x, the trigram indexes
+    PERFORM set_config('pg_trgm.similarity_threshold', trigram_threshold::TEXT, true);
+
+    RETURN QUERY
+    SELECT
+        l.id,
+        l.title,
+        l.artist,
+        l.era,
+        CASE WHEN include_content THEN l.lyrics_khmer END,
+        COALESCE(char_length(l.lyrics_khmer), 0),
+        CASE WHEN include_embedding THEN l.embedding END,
+        GREATEST(
+            -- normalization 32 maps rank to rank / (rank + 1)
+            ts_rank_cd(l.search_tsv, ts_query, 32),
+            similarity(lower(l.title), needle),
+            similarity(lower(COALESCE(l.artist, '')), needle)
+        )::FLOAT AS lexical_score
+    FROM lyrics l
+    WHERE
+        (filter_artist IS NULL OR l.artist = filter_artist) AND
+        (filter_era IS NULL OR l.era = filter_era) AND
+        (filter_status IS NULL OR l.status::TEXT = filter_status) AND
+        (
+            l.search_tsv @@ ts_query OR
+            lower(l.title) % needle OR
+            lower(l.artist) % needle
+        )
+    ORDER BY 8 DESC, l.id  -- positional: lexical_score is also an OUT name
+    LIMIT match_count;
+END;
+$$;
+
+COMMENT ON COLUMN lyrics.lyrics_khmer_segmented IS 'Khmer lyrics with spaces between segments, written by the app for full-text search';
+COMMENT ON FUNCTION lexical_search_lyrics_lean IS 'Full-text + trigram lyrics search with column projection';
@@ -0,0 +1,43 @@
+-- Migration: Content-hash key for idempotent lyrics upserts
+-- Status: Ready to execute (after 006_lexical_search.sql)
+--
+-- Ingestion used to insert each song as 'processing' and then update it
+-- to 'complete': two writes, and a retried insert created a duplicate.
+-- The application now writes the final row with one
+--   INSERT ... ON CONFLICT (content_hash) DO UPDATE
+-- (PostgREST upsert with on_conflict=content_hash), keyed by the hash of
+-- the normalized title, artist and Khmer lyrics it already stores in
+-- metadata.content_hash.
+--
+-- The unique index must not be partial: PostgREST cannot name an index
+-- predicate in ON CONFLICT. NULLs never conflict, so rows ingested
+-- before content hashing keep working.
+
+ALTER TABLE lyrics ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+UPDATE lyrics
+SET content_hash = metadata->>'content_hash'
+WHERE content_hash IS NULL
+  AND metadata ? 'content_hash';
+
+-- Existing duplicates would block the unique index: keep the key on the
+-- oldest row of each group and leave the others unkeyed (not deleted)
+WITH ranked AS (
+    SELECT id,
+           ROW_NUMBER() OVER (
+               PARTITION BY content_hash ORDER BY created_at, id
+           ) AS position
+    FROM lyrics
+    WHERE content_hash IS NOT NULL
+)
+UPDATE lyrics l
+SET content_hash = NULL
+FROM ranked r
+WHERE l.id = r.id
+  AND r.position > 1;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_lyrics_content_hash
+    ON lyrics (content_hash);
+
+COMMENT ON COLUMN lyrics.content_hash IS
+    'sha256 of normalized title/artist/Khmer lyrics; upsert conflict key';
@@ -0,0 +1,132 @@
+-- Migration: Chunk embeddings for long lyrics
+-- Status: Ready to execute (after 007_lyrics_content_hash_upsert.sql)
+--
+-- A song was embedded as one input (title + whole Khmer body), so long
+-- lyrics were truncated or rejected by the embedding provider. With
+-- lyrics chunking enabled (OpenRAGConfig.lyrics_chunking) the application
+-- splits long bodies into overlapping chunks, embeds each one, stores
+-- them here and writes the mean of the chunk vectors as the song's own
+-- embedding, so songs without chunks and older clients keep working.
+--
+-- hybrid_search_lyrics_chunked_lean ranks chunk and song embeddings
+-- together and aggregates hits back to the parent song: one row per song
+-- scored by its best match, with the matching chunk and the number of
+-- its chunks among the candidates.
+
+CREATE TABLE IF NOT EXISTS lyrics_chunks (
+    id UUID DEFAULT gen_random_uuid() PRIMARY KEY,
+    lyrics_id UUID NOT NULL REFERENCES lyrics(id) ON DELETE CASCADE,
+    chunk_index INT NOT NULL,
+    content TEXT NOT NULL,
+    embedding VECTOR(1536),
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    UNIQUE (lyrics_id, chunk_index)
+);
+
+CREATE INDEX IF NOT EXISTS idx_lyrics_chunks_embedding_hnsw
+    ON lyrics_chunks USING hnsw (embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
+
+-- Enable Row Level Security (same access as lyrics)
+ALTER TABLE lyrics_chunks ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Enable read access for authenticated users" ON lyrics_chunks
+    FOR SELECT TO authenticated USING (true);
+
+CREATE POLICY "Enable insert for authenticated users" ON lyrics_chunks
+    FOR INSERT TO authenticated WITH CHECK (true);
+
+CREATE POLICY "Enable update for authenticated users" ON lyrics_chunks
+    FOR UPDATE TO authenticated USING (true);
+
+-- Re-ingesting a song replaces its chunks (delete, then insert)
+CREATE POLICY "Enable delete for authenticated users" ON lyrics_chunks
+    FOR DELETE TO authenticated USING (true);
+
+CREATE OR REPLACE FUNCTION hybrid_search_lyrics_chunked_lean(
+    query_embedding VECTOR(1536),
+    match_threshold FLOAT,
+    match_count INT,
+    filter_artist TEXT DEFAULT NULL,
+    filter_era TEXT DEFAULT NULL,
+    filter_status TEXT DEFAULT NULL,
+    include_content BOOLEAN DEFAULT TRUE,
+    include_embedding BOOLEAN DEFAULT FALSE,
+    ef_search INT DEFAULT NULL,
+    ivf_probes INT DEFAULT NULL,
+    candidate_factor INT DEFAULT 4
+)
+RETURNS TABLE (
+    id UUID,
+    title TEXT,
+    artist TEXT,
+    era TEXT,
+    lyrics_khmer TEXT,
+    content_length INT,
+    embedding VECTOR(1536),
+    similarity FLOAT,
+    matched_chunk INT,
+    chunk_hits INT
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM apply_vector_search_tuning(ef_search, ivf_probes);
+
+    -- Both candidate lists come straight off the HNSW indexes; filters
+    -- apply after aggregation, so candidate_factor leaves room for them
+    RETURN QUERY
+    WITH candidates AS (
+        (
+            SELECT c.lyrics_id, c.chunk_index AS chunk_no,
+                   1 - (c.embedding <=> query_embedding) AS score
+            FROM lyrics_chunks c
+            WHERE c.embedding IS NOT NULL
+            ORDER BY c.embedding <=> query_embedding
+            LIMIT match_count * candidate_factor
+        )
+        UNION ALL
+        (
+            SELECT s.id, NULL::INT,
+                   1 - (s.embedding <=> query_embedding)
+            FROM lyrics s
+            WHERE s.embedding IS NOT NULL
+            ORDER BY s.embedding <=> query_embedding
+            LIMIT match_count * candidate_factor
+        )
+    ),
+    best AS (
+        SELECT DISTINCT ON (k.lyrics_id)
+            k.lyrics_id,
+            k.chunk_no,
+            k.score,
+            (COUNT(k.chunk_no) OVER (PARTITION BY k.lyrics_id))::INT AS hits
+        FROM candidates k
+        WHERE k.score > match_threshold
+        ORDER BY k.lyrics_id, k.score DESC
+    )
+    SELECT
+        l.id,
+        l.title,
+        l.artist,
+        l.era,
+        CASE WHEN include_content THEN l.lyrics_khmer END,
+        COALESCE(char_length(l.lyrics_khmer), 0),
+        CASE WHEN include_embedding THEN l.embedding END,
+        b.score::FLOAT,
+        b.chunk_no,
+        b.hits
+    FROM best b
+    JOIN lyrics l ON l.id = b.lyrics_id
+    WHERE
+        (filter_artist IS NULL OR l.artist = filter_artist) AND
+        (filter_era IS NULL OR l.era = filter_era) AND
+        (filter_status IS NULL OR l.status::TEXT = filter_status)
+    ORDER BY b.score DESC
+    LIMIT match_count;
+END;
+$$;
+
+COMMENT ON TABLE lyrics_chunks IS 'Overlapping chunks of long lyrics with their own embeddings';
+COMMENT ON FUNCTION hybrid_search_lyrics_chunked_lean IS 'Lyrics search over song and chunk embeddings, aggregated per song';
+COMMENT ON INDEX idx_lyrics_chunks_embedding_hnsw IS 'HNSW cosine index; tune recall per call with ef_search';
@@ -0,0 +1,65 @@
+-- Migration: Database-wide data version for context API ETags
+-- Status: Ready to execute (after 008_lyrics_chunks.sql)
+--
+-- The context API tags responses with a weak ETag derived from the
+-- version of the searchable data. That version used to be a counter in
+-- the API process, which never moved when songs were written by the
+-- ingestion flow, the watch daemon or n8n, and differed between API
+-- workers. It now lives in a single row here, bumped by statement-level
+-- triggers on every table search reads from; the API reads it through
+-- get_data_version() and caches it for a few seconds.
+
+CREATE TABLE IF NOT EXISTS data_version (
+    id BOOLEAN DEFAULT TRUE PRIMARY KEY CHECK (id),
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+INSERT INTO data_version (id) VALUES (TRUE) ON CONFLICT (id) DO NOTHING;
+
+ALTER TABLE data_version ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Enable read access for authenticated users" ON data_version
+    FOR SELECT TO authenticated USING (true);
+
+-- SECURITY DEFINER: writers only need rights on the table they change
+CREATE OR REPLACE FUNCTION bump_data_version()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    UPDATE data_version SET version = version + 1, updated_at = NOW() WHERE id;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trigger_lyrics_data_version ON lyrics;
+CREATE TRIGGER trigger_lyrics_data_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON lyrics
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION bump_data_version();
+
+DROP TRIGGER IF EXISTS trigger_lyrics_chunks_data_version ON lyrics_chunks;
+CREATE TRIGGER trigger_lyrics_chunks_data_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON lyrics_chunks
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION bump_data_version();
+
+DROP TRIGGER IF EXISTS trigger_agent_sessions_data_version ON agent_sessions;
+CREATE TRIGGER trigger_agent_sessions_data_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON agent_sessions
+    FOR EACH STATEMENT
+    EXECUTE FUNCTION bump_data_version();
+
+CREATE OR REPLACE FUNCTION get_data_version()
+RETURNS BIGINT
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT version FROM data_version WHERE id;
+$$;
+
+COMMENT ON TABLE data_version IS 'Single-row version of searchable data, bumped on every write';
+COMMENT ON FUNCTION get_data_version IS 'Current data version; the context API derives ETags from it';
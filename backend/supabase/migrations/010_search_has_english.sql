@@ -0,0 +1,221 @@
+-- Migration: Report English translations from the lean lyrics searches
+-- Status: Ready to execute (after 009_data_version.sql)
+--
+-- Reranking gives a completeness bonus to songs with both Khmer lyrics
+-- and an English translation, but the lean search functions stopped
+-- returning lyrics_english, so the bonus was silently always 0. They now
+-- return a has_english flag instead of the (heavy) English body.
+--
+-- The return types change, so the functions are dropped and recreated.
+
+DROP FUNCTION IF EXISTS hybrid_search_lyrics_lean(
+    VECTOR(1536), FLOAT, INT, TEXT, TEXT, TEXT, BOOLEAN, BOOLEAN, INT, INT
+);
+DROP FUNCTION IF EXISTS lexical_search_lyrics_lean(
+    TEXT, INT, TEXT, TEXT, TEXT, BOOLEAN, BOOLEAN, FLOAT
+);
+DROP FUNCTION IF EXISTS hybrid_search_lyrics_chunked_lean(
+    VECTOR(1536), FLOAT, INT, TEXT, TEXT, TEXT, BOOLEAN, BOOLEAN, INT, INT, INT
+);
+
+CREATE OR REPLACE FUNCTION hybrid_search_lyrics_lean(
+    query_embedding VECTOR(1536),
+    match_threshold FLOAT,
+    match_count INT,
+    filter_artist TEXT DEFAULT NULL,
+    filter_era TEXT DEFAULT NULL,
+    filter_status TEXT DEFAULT NULL,
+    include_content BOOLEAN DEFAULT TRUE,
+    include_embedding BOOLEAN DEFAULT FALSE,
+    ef_search INT DEFAULT NULL,
+    ivf_probes INT DEFAULT NULL
+)
+RETURNS TABLE (
+    id UUID,
+    title TEXT,
+    artist TEXT,
+    era TEXT,
+    lyrics_khmer TEXT,
+    content_length INT,
+    embedding VECTOR(1536),
+    similarity FLOAT,
+    has_english BOOLEAN
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM apply_vector_search_tuning(ef_search, ivf_probes);
+
+    RETURN QUERY
+    SELECT
+        l.id,
+        l.title,
+        l.artist,
+        l.era,
+        CASE WHEN include_content THEN l.lyrics_khmer END,
+        COALESCE(char_length(l.lyrics_khmer), 0),
+        CASE WHEN include_embedding THEN l.embedding END,
+        1 - (l.embedding <=> query_embedding) AS similarity,
+        l.lyrics_english IS NOT NULL AND l.lyrics_english <> ''
+    FROM lyrics l
+    WHERE
+        (filter_artist IS NULL OR l.artist = filter_artist) AND
+        (filter_era IS NULL OR l.era = filter_era) AND
+        (filter_status IS NULL OR l.status::TEXT = filter_status) AND
+        l.embedding IS NOT NULL AND
+        1 - (l.embedding <=> query_embedding) > match_threshold
+    ORDER BY l.embedding <=> query_embedding
+    LIMIT match_count;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION lexical_search_lyrics_lean(
+    query_text TEXT,
+    match_count INT,
+    filter_artist TEXT DEFAULT NULL,
+    filter_era TEXT DEFAULT NULL,
+    filter_status TEXT DEFAULT NULL,
+    include_content BOOLEAN DEFAULT TRUE,
+    include_embedding BOOLEAN DEFAULT FALSE,
+    trigram_threshold FLOAT DEFAULT 0.3
+)
+RETURNS TABLE (
+    id UUID,
+    title TEXT,
+    artist TEXT,
+    era TEXT,
+    lyrics_khmer TEXT,
+    content_length INT,
+    embedding VECTOR(1536),
+    lexical_score FLOAT,
+    has_english BOOLEAN
+)
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    ts_query TSQUERY := websearch_to_tsquery('simple', query_text);
+    needle TEXT := lower(query_text);
+BEGIN
+    -- % uses this threshold and, unlike similarity() > x, the trigram indexes
+    PERFORM set_config('pg_trgm.similarity_threshold', trigram_threshold::TEXT, true);
+
+    RETURN QUERY
+    SELECT
+        l.id,
+        l.title,
+        l.artist,
+        l.era,
+        CASE WHEN include_content THEN l.lyrics_khmer END,
+        COALESCE(char_length(l.lyrics_khmer), 0),
+        CASE WHEN include_embedding THEN l.embedding END,
+        GREATEST(
+            -- normalization 32 maps rank to rank / (rank + 1)
+            ts_rank_cd(l.search_tsv, ts_query, 32),
+            similarity(lower(l.title), needle),
+            similarity(lower(COALESCE(l.artist, '')), needle)
+        )::FLOAT AS lexical_score,
+        l.lyrics_english IS NOT NULL AND l.lyrics_english <> ''
+    FROM lyrics l
+    WHERE
+        (filter_artist IS NULL OR l.artist = filter_artist) AND
+        (filter_era IS NULL OR l.era = filter_era) AND
+        (filter_status IS NULL OR l.status::TEXT = filter_status) AND
+        (
+            l.search_tsv @@ ts_query OR
+            lower(l.title) % needle OR
+            lower(l.artist) % needle
+        )
+    ORDER BY 8 DESC, l.id  -- positional: lexical_score is also an OUT name
+    LIMIT match_count;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION hybrid_search_lyrics_chunked_lean(
+    query_embedding VECTOR(1536),
+    match_threshold FLOAT,
+    match_count INT,
+    filter_artist TEXT DEFAULT NULL,
+    filter_era TEXT DEFAULT NULL,
+    filter_status TEXT DEFAULT NULL,
+    include_content BOOLEAN DEFAULT TRUE,
+    include_embedding BOOLEAN DEFAULT FALSE,
+    ef_search INT DEFAULT NULL,
+    ivf_probes INT DEFAULT NULL,
+    candidate_factor INT DEFAULT 4
+)
+RETURNS TABLE (
+    id UUID,
+    title TEXT,
+    artist TEXT,
+    era TEXT,
+    lyrics_khmer TEXT,
+    content_length INT,
+    embedding VECTOR(1536),
+    similarity FLOAT,
+    matched_chunk INT,
+    chunk_hits INT,
+    has_english BOOLEAN
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    PERFORM apply_vector_search_tuning(ef_search, ivf_probes);
+
+    -- Both candidate lists come straight off the HNSW indexes; filters
+    -- apply after aggregation, so candidate_factor leaves room for them
+    RETURN QUERY
+    WITH candidates AS (
+        (
+            SELECT c.lyrics_id, c.chunk_index AS chunk_no,
+                   1 - (c.embedding <=> query_embedding) AS score
+            FROM lyrics_chunks c
+            WHERE c.embedding IS NOT NULL
+            ORDER BY c.embedding <=> query_embedding
+            LIMIT match_count * candidate_factor
+        )
+        UNION ALL
+        (
+            SELECT s.id, NULL::INT,
+                   1 - (s.embedding <=> query_embedding)
+            FROM lyrics s
+            WHERE s.embedding IS NOT NULL
+            ORDER BY s.embedding <=> query_embedding
+            LIMIT match_count * candidate_factor
+        )
+    ),
+    best AS (
+        SELECT DISTINCT ON (k.lyrics_id)
+            k.lyrics_id,
+            k.chunk_no,
+            k.score,
+            (COUNT(k.chunk_no) OVER (PARTITION BY k.lyrics_id))::INT AS hits
+        FROM candidates k
+        WHERE k.score > match_threshold
+        ORDER BY k.lyrics_id, k.score DESC
+    )
+    SELECT
+        l.id,
+        l.title,
+        l.artist,
+        l.era,
+        CASE WHEN include_content THEN l.lyrics_khmer END,
+        COALESCE(char_length(l.lyrics_khmer), 0),
+        CASE WHEN include_embedding THEN l.embedding END,
+        b.score::FLOAT,
+        b.chunk_no,
+        b.hits,
+        l.lyrics_english IS NOT NULL AND l.lyrics_english <> ''
+    FROM best b
+    JOIN lyrics l ON l.id = b.lyrics_id
+    WHERE
+        (filter_artist IS NULL OR l.artist = filter_artist) AND
+        (filter_era IS NULL OR l.era = filter_era) AND
+        (filter_status IS NULL OR l.status::TEXT = filter_status)
+    ORDER BY b.score DESC
+    LIMIT match_count;
+END;
+$$;
+
+COMMENT ON FUNCTION hybrid_search_lyrics_lean IS 'Projected lyrics search: heavy columns only when requested';
+COMMENT ON FUNCTION lexical_search_lyrics_lean IS 'Full-text + trigram lyrics search with column projection';
+COMMENT ON FUNCTION hybrid_search_lyrics_chunked_lean IS 'Lyrics search over song and chunk embeddings, aggregated per song';
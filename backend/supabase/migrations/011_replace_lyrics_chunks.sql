@@ -0,0 +1,36 @@
+-- Migration: Replace a song's chunks in one transaction
+-- Status: Ready to execute (after 010_search_has_english.sql)
+--
+-- Re-ingesting a chunked song used to delete its lyrics_chunks rows and
+-- insert the new ones in two separate requests. A failed insert left a
+-- complete song without chunks, and a search running between the two
+-- requests saw none. replace_lyrics_chunks does both in the single
+-- transaction of one RPC call, so searches see either the old chunks or
+-- the new ones.
+
+CREATE OR REPLACE FUNCTION replace_lyrics_chunks(
+    lyrics_ids UUID[],
+    chunks JSONB
+)
+RETURNS INT
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    inserted INT;
+BEGIN
+    DELETE FROM lyrics_chunks WHERE lyrics_id = ANY(lyrics_ids);
+
+    INSERT INTO lyrics_chunks (lyrics_id, chunk_index, content, embedding)
+    SELECT c.lyrics_id, c.chunk_index, c.content, c.embedding::VECTOR(1536)
+    FROM jsonb_to_recordset(chunks) AS c(
+        lyrics_id UUID,
+        chunk_index INT,
+        content TEXT,
+        embedding TEXT
+    );
+    GET DIAGNOSTICS inserted = ROW_COUNT;
+    RETURN inserted;
+END;
+$$;
+
+COMMENT ON FUNCTION replace_lyrics_chunks IS 'Atomically replace the chunks of the given songs; returns rows inserted';
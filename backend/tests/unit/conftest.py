@@ -0,0 +1,21 @@
+"""Shared fixtures for unit tests."""
+
+import pytest
+
+
+class FakeClock:
+    """Monotonic clock that only moves when told to."""
+
+    def __init__(self, start: float = 1000.0):
+        self.now = start
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
@@ -0,0 +1,134 @@
+"""Tests for CircuitBreaker state transitions and CircuitBreaker.call."""
+
+import asyncio
+
+import pytest
+
+from backend.src.services.circuit_breaker import (
+    CircuitBreaker,
+    CircuitBreakerConfig,
+    CircuitOpenError,
+    CircuitState,
+)
+
+
+def make_breaker(clock, **overrides) -> CircuitBreaker:
+    config = CircuitBreakerConfig(
+        failure_rate_threshold=0.5,
+        minimum_calls=4,
+        window_seconds=30.0,
+        open_seconds=15.0,
+        half_open_max_calls=1,
+    )
+    for key, value in overrides.items():
+        setattr(config, key, value)
+    return CircuitBreaker("test", config, clock=clock)
+
+
+async def fail() -> None:
+    raise ConnectionError("boom")
+
+
+async def succeed() -> str:
+    return "ok"
+
+
+def run(breaker: CircuitBreaker, func):
+    return asyncio.run(breaker.call(func))
+
+
+def trip(breaker: CircuitBreaker, failures: int) -> None:
+    for _ in range(failures):
+        with pytest.raises(ConnectionError):
+            run(breaker, fail)
+
+
+def test_closed_open_half_open_closed(clock):
+    breaker = make_breaker(clock)
+    assert run(breaker, succeed) == "ok"
+    trip(breaker, 3)  # 3 of 4 failed
+    assert breaker.state is CircuitState.OPEN
+
+    with pytest.raises(CircuitOpenError) as excinfo:
+        run(breaker, succeed)
+    assert excinfo.value.retry_in == pytest.approx(15.0)
+
+    clock.advance(15.0)
+    assert breaker.state is CircuitState.HALF_OPEN
+    assert run(breaker, succeed) == "ok"
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.snapshot()["calls_in_window"] == 0
+
+
+def test_failed_trial_reopens(clock):
+    breaker = make_breaker(clock)
+    trip(breaker, 4)
+    clock.advance(15.0)
+    trip(breaker, 1)
+    assert breaker.state is CircuitState.OPEN
+    assert breaker.retry_in() == pytest.approx(15.0)
+
+
+def test_half_open_admits_limited_trials(clock):
+    breaker = make_breaker(clock, half_open_max_calls=2)
+    trip(breaker, 4)
+    clock.advance(15.0)
+    assert breaker.allow()
+    assert breaker.allow()
+    assert not breaker.allow()
+    assert breaker.snapshot()["rejected"] == 1
+
+
+def test_stays_closed_below_minimum_calls(clock):
+    breaker = make_breaker(clock)
+    trip(breaker, 3)
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_stays_closed_below_failure_rate(clock):
+    breaker = make_breaker(clock)
+    for _ in range(3):
+        run(breaker, succeed)
+    trip(breaker, 2)  # 2 of 5
+    assert breaker.state is CircuitState.CLOSED
+    trip(breaker, 1)  # 3 of 6
+    assert breaker.state is CircuitState.OPEN
+
+
+def test_old_outcomes_leave_the_window(clock):
+    breaker = make_breaker(clock)
+    trip(breaker, 3)
+    clock.advance(31.0)
+    trip(breaker, 1)  # The earlier failures no longer count
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.snapshot()["calls_in_window"] == 1
+
+
+def test_sync_functions_are_supported(clock):
+    breaker = make_breaker(clock)
+    assert asyncio.run(breaker.call(lambda x: x * 2, 21)) == 42
+
+
+def test_cancelled_trial_frees_its_slot(clock):
+    breaker = make_breaker(clock)
+    trip(breaker, 4)
+    clock.advance(15.0)
+
+    async def cancel_trial() -> None:
+        started = asyncio.Event()
+
+        async def hang() -> None:
+            started.set()
+            await asyncio.sleep(3600)
+
+        task = asyncio.create_task(breaker.call(hang))
+        await started.wait()
+        assert not breaker.allow()  # The trial holds the only slot
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_trial())
+    assert breaker.state is CircuitState.HALF_OPEN  # No outcome recorded
+    assert run(breaker, succeed) == "ok"
+    assert breaker.state is CircuitState.CLOSED
@@ -0,0 +1,61 @@
+"""Tests for ContextClient shutdown and timeouts, with a stub API."""
+
+import asyncio
+import sys
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import pytest
+
+from backend.src.api.context_client import ContextClient
+from backend.src.services.lci_client import LCIStatusProbe
+
+
+class StubAPI:
+    def __init__(self):
+        self.lci_probe = LCIStatusProbe(command=[sys.executable, "-c", "pass"])
+        self.closed = False
+        self.cancelled = asyncio.Event()
+
+    async def retrieve(self, request):
+        self.lci_probe.ensure_running()  # As a CODE-source retrieve does
+        if request == "slow":
+            try:
+                await asyncio.sleep(3600)
+            except asyncio.CancelledError:
+                self.cancelled.set()
+                raise
+        return request
+
+    async def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def client():
+    client = ContextClient(api_factory=StubAPI)
+    yield client
+    client.close()
+
+
+def test_close_stops_the_probe_and_the_loop(client):
+    assert client.retrieve("fast") == "fast"
+    task = client.api.lci_probe._task
+    assert task is not None and not task.done()
+
+    client.close()
+    assert client.api.closed
+    assert task.done()
+    assert client.api.lci_probe._task is None
+    assert client._loop.is_closed()
+
+
+def test_timed_out_call_is_cancelled_on_the_loop(client):
+    with pytest.raises(FutureTimeoutError):
+        client.retrieve("slow", timeout=0.05)
+    client._call(asyncio.wait_for(client.api.cancelled.wait(), 5.0))
+
+
+def test_closed_client_rejects_calls(client):
+    client.close()
+    with pytest.raises(RuntimeError):
+        client.retrieve("fast")
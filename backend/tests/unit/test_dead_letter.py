@@ -0,0 +1,199 @@
+"""Tests for dead-letter classification, backoff and the SQLite store."""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.src.services.dead_letter import (
+    DeadLetterStore,
+    IngestInputError,
+    RetryPolicy,
+    RetryScheduler,
+    classify_error,
+    retry_rows,
+)
+
+NOW = 1_700_000_000.0
+
+
+@pytest.fixture
+def policy():
+    return RetryPolicy(
+        base_seconds=30.0,
+        factor=2.0,
+        max_seconds=100.0,
+        max_attempts=3,
+        jitter=0.0,
+        lease_seconds=600.0,
+    )
+
+
+@pytest.fixture
+def store(tmp_path, policy):
+    store = DeadLetterStore(tmp_path / "dead_letters.sqlite", policy)
+    yield store
+    store.close()
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        IngestInputError("not UTF-8"),
+        FileNotFoundError("gone.txt"),
+        IsADirectoryError("dir"),
+        PermissionError("denied"),
+    ],
+)
+def test_input_errors_are_permanent(error):
+    assert classify_error(error) == (type(error).__name__, False)
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        ConnectionError("reset"),
+        TimeoutError("slow"),
+        ValueError("Expecting value: line 1 column 1"),  # Undecodable body
+        KeyError("embedding"),
+        TypeError("'NoneType' object is not subscriptable"),
+    ],
+)
+def test_provider_errors_are_transient(error):
+    assert classify_error(error) == (type(error).__name__, True)
+
+
+def test_error_strings_are_transient_write_failures():
+    assert classify_error("duplicate key value") == ("IngestionError", True)
+
+
+def test_delay_grows_exponentially_up_to_the_cap(policy):
+    assert [policy.delay(n) for n in range(1, 5)] == [30.0, 60.0, 100.0, 100.0]
+
+
+def test_delay_jitter_only_shortens():
+    policy = RetryPolicy(base_seconds=100.0, jitter=0.5)
+    assert policy.delay(1, rng=lambda: 0.0) == 100.0
+    assert policy.delay(1, rng=lambda: 1.0) == 50.0
+
+
+def test_transient_failure_is_scheduled_with_backoff(store):
+    first = store.add("a.txt", ConnectionError("reset"), now=NOW)
+    assert first.attempts == 1
+    assert first.transient
+    assert first.next_attempt_at == NOW + 30.0
+
+    letter = store.add("a.txt", ConnectionError("reset"), now=NOW + 30.0)
+    assert letter.attempts == 2
+    assert letter.next_attempt_at == NOW + 30.0 + 60.0
+    assert letter.first_failed_at == first.first_failed_at
+
+
+def test_permanent_error_is_parked(store):
+    letter = store.add("bad.txt", IngestInputError("not UTF-8"), now=NOW)
+    assert letter.next_attempt_at is None
+    assert not letter.transient
+    assert letter.error_class == "IngestInputError"
+    assert store.claim(10, now=NOW + 10_000) == []
+    assert store.stats()["parked"] == 1
+
+
+def test_item_out_of_attempts_is_parked(store):
+    for attempt in range(3):
+        letter = store.add("a.txt", ConnectionError("reset"), now=NOW + attempt)
+    assert letter.attempts == 3
+    assert letter.next_attempt_at is None
+    assert store.stats() == {
+        "scheduled": 0,
+        "parked": 1,
+        "by_error_class": {"ConnectionError": 1},
+    }
+
+
+def test_claim_returns_due_items_oldest_first(store):
+    store.add("late.txt", ConnectionError("reset"), now=NOW + 5)
+    store.add("early.txt", ConnectionError("reset"), now=NOW)
+    assert store.claim(10, now=NOW + 29) == []
+    claimed = store.claim(10, now=NOW + 40)
+    assert [letter.key for letter in claimed] == ["early.txt", "late.txt"]
+
+
+def test_claimed_items_are_leased_until_expiry(store):
+    store.add("a.txt", ConnectionError("reset"), now=NOW)
+    assert len(store.claim(10, now=NOW + 30)) == 1
+    assert store.claim(10, now=NOW + 31) == []  # Leased, not claimed twice
+    assert store.claim(10, now=NOW + 629) == []
+    # Never settled: the lease runs out and the item is due again
+    assert [letter.key for letter in store.claim(10, now=NOW + 630)] == ["a.txt"]
+
+
+def test_resolve_forgets_the_item(store):
+    store.add("a.txt", ConnectionError("reset"), now=NOW)
+    assert store.resolve("a.txt")
+    assert store.get("a.txt") is None
+    assert not store.resolve("a.txt")
+    assert store.next_due() is None
+
+
+def test_reset_makes_parked_items_due_with_fresh_attempts(store):
+    store.add("bad.txt", IngestInputError("not UTF-8"), now=NOW)
+    store.add("a.txt", ConnectionError("reset"), now=NOW)
+    assert store.reset(now=NOW + 1) == 1
+    letter = store.get("bad.txt")
+    assert letter.attempts == 0
+    assert letter.next_attempt_at == NOW + 1
+    assert store.get("a.txt").attempts == 1  # Scheduled items are untouched
+
+
+def test_reset_given_keys(store):
+    store.add("a.txt", ConnectionError("reset"), now=NOW)
+    assert store.reset(["a.txt"], now=NOW) == 1
+    assert [letter.key for letter in store.claim(10, now=NOW)] == ["a.txt"]
+
+
+def test_row_payload_survives_later_attempts(store):
+    payload = {"title": "ស្រលាញ់", "artist": "A"}
+    store.add("cat.csv#3", "ingestion failed", payload, kind="row", now=NOW)
+    letter = store.add("cat.csv#3", "ingestion failed", kind="row", now=NOW + 30)
+    assert letter.payload == payload
+    assert letter.kind == "row"
+
+
+def test_retry_rows_resolves_successes_and_records_failures(store):
+    store.add("cat.csv#1", "failed", {"title": "one"}, kind="row", now=NOW)
+    store.add("cat.csv#2", "failed", {"title": "two"}, kind="row", now=NOW)
+
+    class FakeOpenRAG:
+        async def ingest_lyrics_many(self, lyrics):
+            return [
+                SimpleNamespace(status="success", error=None),
+                SimpleNamespace(status="failed", error="timeout"),
+            ]
+
+    letters = store.claim(10, now=NOW + 30)
+    assert asyncio.run(retry_rows(store, FakeOpenRAG(), letters)) == 1
+    assert store.get("cat.csv#1") is None
+    retried = store.get("cat.csv#2")
+    assert retried.attempts == 2
+    assert retried.error == "timeout"
+
+
+def test_scheduler_feeds_due_batches(store):
+    for i in range(5):
+        store.add(f"{i}.txt", ConnectionError("reset"), now=NOW)
+    fed = []
+
+    async def feed(letters):
+        fed.append([letter.key for letter in letters])
+        for letter in letters:
+            store.resolve(letter.key)
+
+    scheduler = RetryScheduler(store, feed, batch_size=2)
+    assert asyncio.run(scheduler.run_once(now=NOW + 30)) == 2
+    assert asyncio.run(scheduler.run_once(now=NOW + 30)) == 2
+    assert asyncio.run(scheduler.run_once(now=NOW + 30)) == 1
+    assert asyncio.run(scheduler.run_once(now=NOW + 30)) == 0
+    assert scheduler.retried == 5
+    assert sorted(key for batch in fed for key in batch) == [
+        f"{i}.txt" for i in range(5)
+    ]
@@ -0,0 +1,98 @@
+"""Clock-driven tests for the ingest daemon's DebouncedQueue."""
+
+import pytest
+
+from backend.src.services.ingest_daemon import DebouncedQueue
+
+
+@pytest.fixture
+def queue(clock):
+    return DebouncedQueue(quiet_seconds=1.0, max_wait_seconds=5.0, clock=clock)
+
+
+def grow(path, text: str = "x") -> None:
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(text)
+
+
+def test_path_is_released_after_the_quiet_window(queue, clock, tmp_path):
+    path = str(tmp_path / "Song_Artist.txt")
+    queue.add(path)
+    clock.advance(0.9)
+    assert queue.take(10) == []
+    clock.advance(0.1)
+    assert queue.take(10) == [path]
+    assert len(queue) == 0
+
+
+def test_new_event_restarts_the_quiet_window(queue, clock, tmp_path):
+    path = str(tmp_path / "Song_Artist.txt")
+    queue.add(path)
+    clock.advance(0.8)
+    queue.add(path)
+    clock.advance(0.8)
+    assert queue.take(10) == []
+    clock.advance(0.2)
+    assert queue.take(10) == [path]
+
+
+def test_take_returns_oldest_events_first_up_to_limit(queue, clock, tmp_path):
+    paths = [str(tmp_path / f"Song{i}_Artist.txt") for i in range(3)]
+    for path in paths:
+        queue.add(path)
+        clock.advance(0.1)
+    clock.advance(1.0)
+    assert queue.take(2) == paths[:2]
+    assert queue.take(2) == paths[2:]
+
+
+def test_growing_file_is_held_past_max_wait(queue, clock, tmp_path):
+    path = tmp_path / "Song_Artist.txt"
+    path.write_text("", encoding="utf-8")
+    # A copy that keeps writing: an event and more bytes every half second
+    for _ in range(20):
+        grow(path)
+        queue.add(str(path))
+        clock.advance(0.5)
+        assert queue.take(10) == []
+    assert len(queue) == 1
+
+
+def test_overdue_file_is_released_once_it_stops_changing(queue, clock, tmp_path):
+    path = tmp_path / "Song_Artist.txt"
+    path.write_text("", encoding="utf-8")
+    for _ in range(12):  # Past max_wait, still growing
+        grow(path)
+        queue.add(str(path))
+        clock.advance(0.5)
+        assert queue.take(10) == []
+
+    # Events keep arriving (e.g. metadata-only), but size and mtime settle
+    queue.add(str(path))
+    clock.advance(0.5)
+    assert queue.take(10) == []  # Stable for 0.5 s of the 1 s needed
+    queue.add(str(path))
+    clock.advance(0.5)
+    assert queue.take(10) == [str(path)]
+    assert len(queue) == 0
+
+
+def test_overdue_path_that_disappeared_is_released(queue, clock, tmp_path):
+    path = str(tmp_path / "gone.txt")
+    for _ in range(11):
+        queue.add(path)
+        clock.advance(0.5)
+    assert queue.take(10) == [path]
+
+
+def test_requeued_path_starts_a_new_max_wait(queue, clock, tmp_path):
+    path = tmp_path / "Song_Artist.txt"
+    path.write_text("v1", encoding="utf-8")
+    queue.add(str(path))
+    clock.advance(1.0)
+    assert queue.take(10) == [str(path)]
+
+    clock.advance(60.0)
+    queue.add(str(path))
+    clock.advance(0.5)
+    assert queue.take(10) == []  # Not overdue: its wait began with this event
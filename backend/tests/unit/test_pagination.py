@@ -0,0 +1,127 @@
+"""Tests for keyset pagination cursors and the candidate cache."""
+
+import pytest
+
+from backend.src.services.pagination import (
+    CandidateCache,
+    Cursor,
+    CursorError,
+    paginate,
+)
+
+FINGERPRINT = "fp-query-a"
+
+
+def ranked(items):
+    """Order (score, id) pairs the way search results are: -score, id."""
+    return sorted(items, key=lambda item: (-item[0], item[1]))
+
+
+def key(item):
+    return item
+
+
+def all_pages(items, page_size):
+    pages, token = [], None
+    while True:
+        after = Cursor.decode(token, FINGERPRINT) if token else None
+        page, token = paginate(items, key, page_size, after, FINGERPRINT)
+        pages.append(page)
+        if token is None:
+            return pages
+
+
+def test_ties_on_score_are_broken_by_id():
+    items = ranked([(0.9, "c"), (0.5, "b"), (0.9, "a"), (0.5, "d"), (0.9, "b")])
+    pages = all_pages(items, 2)
+    assert pages == [
+        [(0.9, "a"), (0.9, "b")],
+        [(0.9, "c"), (0.5, "b")],
+        [(0.5, "d")],
+    ]
+
+
+def test_pages_cover_every_item_once():
+    items = ranked([(round(i % 4 * 0.1, 1), f"id{i:02d}") for i in range(23)])
+    pages = all_pages(items, 5)
+    assert [item for page in pages for item in page] == items
+
+
+def test_last_page_has_no_next_cursor():
+    items = ranked([(0.9, "a"), (0.8, "b"), (0.7, "c"), (0.6, "d")])
+    page, token = paginate(items, key, 2, None, FINGERPRINT)
+    assert token is not None
+    page, token = paginate(
+        items, key, 2, Cursor.decode(token, FINGERPRINT), FINGERPRINT
+    )
+    assert page == [(0.7, "c"), (0.6, "d")]
+    assert token is None
+
+
+def test_single_page_and_empty_results_have_no_next_cursor():
+    assert paginate([(0.9, "a")], key, 10, None, FINGERPRINT) == ([(0.9, "a")], None)
+    assert paginate([], key, 10, None, FINGERPRINT) == ([], None)
+
+
+def test_cursor_round_trip():
+    cursor = Cursor(FINGERPRINT, 0.8125, "song-1")
+    assert Cursor.decode(cursor.encode(), FINGERPRINT) == cursor
+
+
+def test_cursor_from_another_query_is_rejected():
+    token = Cursor("fp-query-b", 0.5, "x").encode()
+    with pytest.raises(CursorError, match="different query"):
+        Cursor.decode(token, FINGERPRINT)
+
+
+@pytest.mark.parametrize("token", ["", "not a cursor!", "bm90IGpzb24", "WzFd"])
+def test_garbage_cursor_is_rejected(token):
+    with pytest.raises(CursorError):
+        Cursor.decode(token, FINGERPRINT)
+
+
+def test_cache_entries_expire_after_ttl(clock):
+    cache = CandidateCache(ttl_seconds=10.0, clock=clock)
+    cache.put("k", [1, 2, 3])
+    clock.advance(10.0)
+    assert cache.get("k") == [1, 2, 3]
+    clock.advance(0.1)
+    assert cache.get("k") is None
+    assert len(cache) == 0
+
+
+def test_cache_evicts_least_recently_used_to_stay_under_max_bytes(clock):
+    cache = CandidateCache(clock=clock, max_bytes=100, sizeof=len)
+    cache.put("a", "x" * 40)
+    cache.put("b", "x" * 40)
+    assert cache.get("a") is not None  # "b" is now least recently used
+    cache.put("c", "x" * 40)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.size_bytes == 80
+
+
+def test_cache_skips_values_larger_than_max_bytes(clock):
+    cache = CandidateCache(clock=clock, max_bytes=100, sizeof=len)
+    cache.put("a", "x" * 40)
+    cache.put("huge", "x" * 101)
+    assert cache.get("huge") is None
+    assert cache.get("a") is not None
+    assert cache.size_bytes == 40
+
+
+def test_cache_replacing_a_key_updates_its_size(clock):
+    cache = CandidateCache(clock=clock, max_bytes=100, sizeof=len)
+    cache.put("a", "x" * 40)
+    cache.put("a", "x" * 10)
+    assert cache.size_bytes == 10
+    assert len(cache) == 1
+
+
+def test_cache_max_entries(clock):
+    cache = CandidateCache(clock=clock, max_entries=2)
+    for name in "abc":
+        cache.put(name, [name])
+    assert cache.get("a") is None
+    assert len(cache) == 2
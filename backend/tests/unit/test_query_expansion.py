@@ -0,0 +1,41 @@
+"""Tests for QueryExpander matching and expansion."""
+
+import pytest
+
+from backend.src.services.query_expansion import Concept, QueryExpander
+
+
+@pytest.fixture
+def expander():
+    return QueryExpander(
+        [
+            Concept(
+                "longing",
+                ("missing", "love"),
+                (("miss", 0.9), ("heart", 0.8), ("ស្នេហា", 0.7), ("romance", 0.5)),
+            ),
+            Concept("sad", ("tears",), (("sorrow", 0.6),)),
+        ]
+    )
+
+
+def test_expansions_are_ordered_by_weight(expander):
+    assert expander.expand("love") == ("love", "miss", "heart", "ស្នេហា", "romance")
+    assert expander.expand("love", max_terms=2) == ("love", "miss", "heart")
+
+
+def test_expansion_inside_a_longer_query_word_is_kept(expander):
+    # "miss" is part of "missing", not a word of the query
+    assert "miss" in expander.expand("missing my love")
+    assert "heart" in expander.expand("love heartbeat")
+
+
+def test_expansion_already_in_the_query_is_skipped(expander):
+    assert "miss" not in expander.expand("love, miss you")
+    assert "heart" not in expander.expand("Love with all my HEART")
+    assert "ស្នេហា" not in expander.expand("love ស្នេហា")
+
+
+def test_triggers_must_be_whole_words(expander):
+    assert expander.expand("gloves") == ("gloves",)
+    assert expander.matches("tears of love") == ["longing", "sad"]
@@ -0,0 +1,80 @@
+"""Tests for OpenRAGService.search_page over a stubbed ranking."""
+
+import asyncio
+
+import pytest
+
+from backend.src.services.openrag_service import OpenRAGConfig, OpenRAGService
+from backend.src.services.pagination import CandidateCache, CursorError
+
+
+def row(item_id: str, score: float) -> dict:
+    return {
+        "id": item_id,
+        "title": item_id,
+        "lyrics_khmer": "lyrics",
+        "similarity": score,
+        "rank_score": score,
+        "source": "lyrics",
+    }
+
+
+@pytest.fixture
+def service(clock):
+    service = OpenRAGService(OpenRAGConfig(page_cache_ttl=60.0))
+    service.page_cache = CandidateCache(60.0, clock=clock)
+    service.rows = [row(f"id{i:02d}", 1.0 - i // 3 * 0.1) for i in range(10)]
+    service.searches = 0
+
+    async def ranked_rows(*args, **kwargs):
+        service.searches += 1
+        return list(service.rows)
+
+    service._ranked_rows = ranked_rows
+    return service
+
+
+def fetch_all(service, page_size=4):
+    ids, cursor = [], None
+    while True:
+        page = asyncio.run(
+            service.search_page("song", page_size=page_size, cursor=cursor)
+        )
+        ids.extend(result.id for result in page.results)
+        cursor = page.next_cursor
+        if cursor is None:
+            return ids
+
+
+def test_pages_come_from_one_search(service):
+    assert fetch_all(service) == [r["id"] for r in service.rows]
+    assert service.searches == 1
+
+
+def test_expired_candidates_are_searched_again_from_the_cursor(service, clock):
+    first = asyncio.run(service.search_page("song", page_size=4))
+    clock.advance(61.0)
+    second = asyncio.run(
+        service.search_page("song", page_size=4, cursor=first.next_cursor)
+    )
+    assert service.searches == 2
+    assert [r.id for r in second.results] == ["id04", "id05", "id06", "id07"]
+
+
+def test_degraded_ranking_is_not_cached(service):
+    async def failing_rows(*args, **kwargs):
+        service.searches += 1
+        service.search_errors += 1
+        return []
+
+    service._ranked_rows = failing_rows
+    asyncio.run(service.search_page("song"))
+    asyncio.run(service.search_page("song"))
+    assert service.searches == 2
+    assert len(service.page_cache) == 0
+
+
+def test_cursor_from_another_query_is_rejected(service):
+    page = asyncio.run(service.search_page("song", page_size=4))
+    with pytest.raises(CursorError):
+        asyncio.run(service.search_page("other", cursor=page.next_cursor))
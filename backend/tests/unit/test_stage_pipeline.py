@@ -0,0 +1,136 @@
+"""Tests for the bounded multi-stage Pipeline."""
+
+import asyncio
+
+import pytest
+
+from backend.src.services.stage_pipeline import Pipeline, Stage
+
+
+def run(pipeline: Pipeline, source, **kwargs):
+    return asyncio.run(pipeline.run(source, **kwargs))
+
+
+def stage(name, handler, **kwargs) -> Stage:
+    return Stage(name, handler, max_wait_seconds=0.001, **kwargs)
+
+
+async def passthrough(batch):
+    await asyncio.sleep(0)
+    return batch
+
+
+def test_every_item_reaches_the_end_through_concurrent_stages():
+    async def double(batch):
+        await asyncio.sleep(0.001)
+        return [item * 2 for item in batch]
+
+    async def fan_out(batch):
+        return [x for item in batch for x in (item, item + 1)]
+
+    pipeline = Pipeline(
+        [
+            stage("parse", passthrough, concurrency=3, queue_size=2),
+            stage("embed", double, concurrency=2, batch_size=4, queue_size=3),
+            stage("write", fan_out, concurrency=3, batch_size=2, queue_size=2),
+        ]
+    )
+    outputs = run(pipeline, range(100))
+
+    assert sorted(outputs) == sorted(x for i in range(100) for x in (2 * i, 2 * i + 1))
+    metrics = pipeline.snapshot()
+    assert [metrics[name]["items_in"] for name in ("parse", "embed", "write")] == [
+        100,
+        100,
+        100,
+    ]
+    assert metrics["write"]["items_out"] == 200
+    assert metrics["parse"]["batches"] == 100  # batch_size 1
+    assert 25 <= metrics["embed"]["batches"] <= 100
+    assert all(m["errors"] == 0 for m in metrics.values())
+
+
+def test_end_of_stream_reaches_every_worker_of_every_stage():
+    # More workers than items: each idle worker must still see the end
+    pipeline = Pipeline(
+        [
+            stage("a", passthrough, concurrency=4, queue_size=1),
+            stage("b", passthrough, concurrency=5, batch_size=3, queue_size=1),
+        ]
+    )
+    assert sorted(run(pipeline, range(2))) == [0, 1]
+    assert run(Pipeline([stage("a", passthrough, concurrency=3)]), []) == []
+
+
+def test_full_queues_hold_back_the_source():
+    fed = 0
+    written = 0
+    lead = []
+
+    def source():
+        nonlocal fed
+        for item in range(60):
+            fed += 1
+            yield item
+
+    async def slow_write(batch):
+        nonlocal written
+        lead.append(fed - written)
+        await asyncio.sleep(0.002)
+        written += len(batch)
+        return batch
+
+    stages = [
+        stage("parse", passthrough, concurrency=2, queue_size=2),
+        stage("write", slow_write, concurrency=2, batch_size=2, queue_size=2),
+    ]
+    pipeline = Pipeline(stages)
+    assert sorted(run(pipeline, source())) == list(range(60))
+
+    # Queued items, items held by workers, and the one the feeder is putting
+    held = sum(s.queue_size + s.concurrency * s.batch_size for s in stages)
+    assert max(lead) <= held + 1
+    metrics = pipeline.snapshot()
+    assert metrics["parse"]["queue_depth_max"] <= 2
+    assert metrics["write"]["queue_depth_max"] <= 2
+
+
+def test_failing_batch_is_dropped_and_counted():
+    async def write(batch):
+        if 13 in batch:
+            raise RuntimeError("bad row")
+        return batch
+
+    pipeline = Pipeline(
+        [
+            stage("parse", passthrough, concurrency=2, queue_size=2),
+            stage("write", write, concurrency=2, batch_size=1, queue_size=2),
+        ]
+    )
+    assert sorted(run(pipeline, range(20))) == [i for i in range(20) if i != 13]
+    metrics = pipeline.snapshot()["write"]
+    assert metrics["errors"] == 1
+    assert metrics["items_in"] == 20
+    assert metrics["items_out"] == 19
+    assert metrics["batches"] == 20
+
+
+def test_handler_may_filter_items():
+    async def evens(batch):
+        return [item for item in batch if item % 2 == 0]
+
+    pipeline = Pipeline(
+        [
+            stage("filter", evens, concurrency=2, batch_size=3),
+            stage("write", passthrough, concurrency=2),
+        ]
+    )
+    assert sorted(run(pipeline, range(10))) == [0, 2, 4, 6, 8]
+    metrics = pipeline.snapshot()
+    assert metrics["filter"]["items_out"] == 5
+    assert metrics["write"]["items_in"] == 5
+
+
+def test_pipeline_needs_a_stage():
+    with pytest.raises(ValueError):
+        Pipeline([])
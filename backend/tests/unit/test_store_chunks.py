@@ -0,0 +1,73 @@
+"""Tests for OpenRAGService._store_chunks against a stub Supabase client."""
+
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+from backend.src.services.openrag_service import (
+    IngestionResult,
+    LyricsEmbedding,
+    OpenRAGConfig,
+    OpenRAGService,
+)
+
+
+class StubClient:
+    def __init__(self, error=None):
+        self.calls = []
+        self.error = error
+
+    def rpc(self, function, params):
+        self.calls.append((function, params))
+        return SimpleNamespace(execute=self.execute)
+
+    def execute(self):
+        if self.error:
+            raise self.error
+        return SimpleNamespace(data=1)
+
+    def table(self, name):
+        raise AssertionError(f"chunks must not be written table by table ({name})")
+
+
+def service_with(client) -> OpenRAGService:
+    service = OpenRAGService(OpenRAGConfig(lyrics_chunking=True))
+    service._client = client
+    service._connected = True
+    return service
+
+
+def result(lyrics_id: str, status: str = "success") -> IngestionResult:
+    return IngestionResult(lyrics_id, status, True, datetime.now())
+
+
+SONG = LyricsEmbedding(
+    [0.5, 0.5], [("verse one", [1.0, 0.0]), ("verse two", [0.0, 1.0])]
+)
+
+
+def test_chunks_are_replaced_in_one_rpc():
+    client = StubClient()
+    service = service_with(client)
+    results = [result("a"), result("b", status="failed"), result("a")]
+    stored = asyncio.run(service._store_chunks(results, [SONG, SONG, SONG]))
+
+    assert stored == results
+    assert len(client.calls) == 1
+    function, params = client.calls[0]
+    assert function == "replace_lyrics_chunks"
+    assert params["lyrics_ids"] == ["a"]
+    assert [(c["lyrics_id"], c["chunk_index"]) for c in params["chunks"]] == [
+        ("a", 0),
+        ("a", 1),
+    ]
+
+
+def test_failed_replace_fails_only_the_written_songs():
+    service = service_with(StubClient(error=RuntimeError("timeout")))
+    results = [result("a"), result("b", status="failed")]
+    stored = asyncio.run(service._store_chunks(results, [SONG, SONG]))
+
+    assert stored[0].status == "failed"
+    assert "Chunk write failed" in stored[0].error
+    assert stored[1] is results[1]
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""Fill lyrics.lyrics_khmer_segmented for rows ingested before migration 006.
+
+Postgres has no Khmer word breaker, so the segmented copy of the lyrics
+that feeds the full-text index is written by the application on ingest.
+Rows that existed before migration 006 have it NULL and are invisible to
+the Khmer term branch of lexical search until this script (or a
+re-ingest) fills it in. Safe to re-run: only NULL rows are touched.
+
+Requires: supabase (SUPABASE_URL / SUPABASE_SERVICE_KEY)
+
+Usage:
+  python scripts/backfill_segmented_lyrics.py --dry-run
+  python scripts/backfill_segmented_lyrics.py --page-size 500
+
+Exit codes:
+  0: done
+  1: failure (e.g. Supabase not configured)
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.src.services.openrag_service import OpenRAGService  # noqa: E402
+from backend.src.utils.khmer import segment_for_index  # noqa: E402
+
+
+def backfill(client, page_size: int, dry_run: bool) -> int:
+    """Segment every row missing lyrics_khmer_segmented; returns the count."""
+    updated = 0
+    last_id = None
+    while True:
+        query = (
+            client.table("lyrics")
+            .select("id, lyrics_khmer")
+            .is_("lyrics_khmer_segmented", "null")
+            .not_.is_("lyrics_khmer", "null")
+            .order("id")
+            .limit(page_size)
+        )
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        rows = query.execute().data
+        if not rows:
+            return updated
+        for row in rows:
+            if not dry_run:
+                client.table("lyrics").update(
+                    {"lyrics_khmer_segmented": segment_for_index(row["lyrics_khmer"])}
+                ).eq("id", row["id"]).execute()
+            updated += 1
+        last_id = rows[-1]["id"]
+        print(
+            f"[backfill-segmented] {updated} rows {'found' if dry_run else 'updated'}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=500)
+    parser.add_argument(
+        "--dry-run", action="store_true", help="Count rows without writing"
+    )
+    args = parser.parse_args(argv)
+
+    service = OpenRAGService()
+    if not service.connect():
+        print("[backfill-segmented] Supabase is not configured", file=sys.stderr)
+        return 1
+    total = backfill(service.client, args.page_size, args.dry_run)
+    print(f"[backfill-segmented] done: {total} rows")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
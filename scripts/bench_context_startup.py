@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Cold-start benchmark for the Unified Context API.
+
+Measures how long it takes to import the context module, construct
+UnifiedContextAPI and build the FastAPI app. Construction used to run
+`npx lci status` synchronously (up to 5 s); it should now be near zero.
+
+Usage:
+  python scripts/bench_context_startup.py
+  python scripts/bench_context_startup.py --repeat 20
+
+Exit codes:
+  0: success
+  1: failure
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+def _timed(label: str, fn, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    print(
+        f"[bench-startup] {label:<24} "
+        f"median {statistics.median(samples):8.2f} ms   "
+        f"max {max(samples):8.2f} ms   (n={repeat})"
+    )
+    return samples
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        from backend.src.api.context import UnifiedContextAPI, create_context_api
+    except ImportError as e:
+        print(f"[bench-startup] FAILED: cannot import context API: {e}")
+        return 1
+    print(
+        f"[bench-startup] {'import':<24} "
+        f"{(time.perf_counter() - start) * 1000:8.2f} ms"
+    )
+
+    _timed("UnifiedContextAPI()", UnifiedContextAPI, args.repeat)
+    _timed("create_context_api()", create_context_api, args.repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
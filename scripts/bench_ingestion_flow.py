@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""Benchmark the ingestion flow: sequential, per-file concurrent, pipelined.
+
+Writes a fixture directory of lyrics files (a few duplicates included),
+then runs ``ingestion_pipeline`` per file with ``max_in_flight=1`` (one
+file at a time), per file with the given stage limits, and through the
+pipelined stages with batched embeddings/upserts, and reports files/s
+for each (plus per-stage metrics for the pipelined run). Every run gets
+its own copy of the fixtures (and its own manifest) so neither Prefect's
+parse cache nor the ingest manifest can favour a later run. A final run
+repeats the pipelined one over the unchanged files, which the manifest
+should skip.
+
+By default the flow talks to the configured Supabase and embedding
+provider. ``--simulate-ms`` replaces those calls with fixed blocking
+sleeps, run in worker threads as the real (sync) Supabase and OpenAI
+clients are, to measure scheduling overlap without any backend.
+
+Requires: prefect
+
+Usage:
+  python scripts/bench_ingestion_flow.py --simulate-ms 40
+  python scripts/bench_ingestion_flow.py --files 1000 --embed 8 --ingest 8
+
+Exit codes:
+  0: success
+  1: failure
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import random
+import shutil
+import sys
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.src.services.resources import worker_resources  # noqa: E402
+
+FLOW_PATH = (
+    Path(__file__).resolve().parents[1]
+    / "30-Implementation"
+    / "prefect"
+    / "flows"
+    / "ingestion_pipeline.py"
+)
+SYLLABLES = ["ស្នេហា", "ផ្ទះ", "ទន្លេ", "ព្រះចន្ទ", "ចម្រៀង", "សប្បាយ", "កំសត់"]
+
+
+def write_fixtures(root: Path, files: int, seed: int) -> None:
+    rng = random.Random(seed)
+    (root / "copies").mkdir(parents=True)
+    for i in range(files):
+        name = f"Song{i:05d}_Artist{i % 37}.txt"
+        body = "\n".join(
+            " ".join(rng.choice(SYLLABLES) for _ in range(8)) for _ in range(12)
+        )
+        # Every 50th file is a second copy of a song, to exercise dedup
+        folder = root / "copies" if i % 50 == 49 else root
+        if folder is not root:
+            name = f"Song{i - 1:05d}_Artist{(i - 1) % 37}.txt"
+            body = (root / name).read_text(encoding="utf-8")
+        (folder / name).write_text(body, encoding="utf-8")
+
+
+def simulate_backend(delay: float) -> None:
+    """Swap OpenRAGService I/O for blocking sleeps of ``delay`` seconds."""
+    from backend.src.services import openrag_service
+    from backend.src.services.openrag_service import IngestionResult, OpenRAGService
+
+    async def request() -> None:
+        # A blocking client call, off the loop like OpenRAGService._execute
+        await asyncio.to_thread(time.sleep, delay)
+
+    def connect(self) -> bool:
+        return True
+
+    async def generate_embedding(self, text: str) -> list:
+        await request()
+        return [0.0] * self.config.embedding_dimensions
+
+    async def generate_embeddings(self, texts):
+        await request()  # One provider request per batch
+        return [[0.0] * self.config.embedding_dimensions for _ in texts]
+
+    async def ingest_lyrics_many(
+        self, lyrics, embeddings=None, batch_size=None, status="complete"
+    ):
+        await request()  # One multi-row upsert
+        return [
+            IngestionResult(
+                id=str(uuid.uuid4()),
+                status="success",
+                embedding_generated=True,
+                stored_at=openrag_service.datetime.now(),
+            )
+            for _ in lyrics
+        ]
+
+    async def upsert_lyrics(self, lyrics_data, embedding=None, status="complete"):
+        await request()
+        return IngestionResult(
+            id=str(uuid.uuid4()),
+            status="success",
+            embedding_generated=True,
+            stored_at=openrag_service.datetime.now(),
+        )
+
+    async def replace_lyrics(self, lyrics_id, lyrics_data, embedding=None, status=""):
+        result = await upsert_lyrics(self, lyrics_data, embedding)
+        result.id = lyrics_id
+        return result
+
+    async def complete_lyrics(self, lyrics_id, embedding=None, vocabulary=None):
+        await request()
+        return True
+
+    OpenRAGService.connect = connect
+    OpenRAGService.replace_lyrics = replace_lyrics
+    OpenRAGService.generate_embedding = generate_embedding
+    OpenRAGService.generate_embeddings = generate_embeddings
+    OpenRAGService.ingest_lyrics_many = ingest_lyrics_many
+    OpenRAGService.upsert_lyrics = upsert_lyrics
+    OpenRAGService.complete_lyrics = complete_lyrics
+
+
+def load_flow():
+    spec = importlib.util.spec_from_file_location("ingestion_pipeline", FLOW_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ingestion_pipeline
+
+
+def run(flow, source: Path, target: Path, label: str, **limits) -> float:
+    if not target.exists():
+        shutil.copytree(source, target)
+    manifest = target.parent / f"{target.name}.manifest.sqlite"
+    dead_letters = target.parent / f"{target.name}.dead_letters.sqlite"
+    start = time.perf_counter()
+    result = asyncio.run(
+        flow(
+            str(target),
+            manifest_path=str(manifest),
+            dead_letter_path=str(dead_letters),
+            **limits,
+        )
+    )
+    elapsed = time.perf_counter() - start
+    summary = result["summary"]
+    print(
+        f"[bench-ingest] {label:<11} {summary['total'] / elapsed:8.1f} files/s "
+        f"({elapsed:7.2f} s; ok {summary['successful']}, "
+        f"failed {summary['failed']}, duplicates {summary['duplicates']}, "
+        f"unchanged {summary['unchanged']})"
+    )
+    for stage, metrics in result.get("stages", {}).items():
+        print(
+            f"[bench-ingest] {'':<11} {stage:<5} {metrics['throughput']:8.1f} "
+            f"items/s, {metrics['batches']} batches, queue depth max "
+            f"{metrics['queue_depth_max']} mean {metrics['queue_depth_mean']}"
+        )
+    stats = worker_resources.stats()
+    print(
+        f"[bench-ingest] {'':<11} services created {stats['created']}, "
+        f"reused {stats['reused']} (cumulative)"
+    )
+    return elapsed
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=1000)
+    parser.add_argument("--in-flight", type=int, default=16)
+    parser.add_argument("--parse", type=int, default=8)
+    parser.add_argument("--embed", type=int, default=4)
+    parser.add_argument("--ingest", type=int, default=4)
+    parser.add_argument("--embed-batch", type=int, default=32)
+    parser.add_argument("--write-batch", type=int, default=100)
+    parser.add_argument(
+        "--simulate-ms",
+        type=float,
+        help="Sleep this long per backend call instead of calling Supabase",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    try:
+        flow = load_flow()
+    except ImportError as e:
+        print(f"[bench-ingest] FAILED: {e} (pip install prefect)")
+        return 1
+    if args.simulate_ms is not None:
+        simulate_backend(args.simulate_ms / 1000)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        fixtures = workdir / "fixtures"
+        write_fixtures(fixtures, args.files, args.seed)
+        print(f"[bench-ingest] {args.files} fixture files in {fixtures}")
+
+        limits = dict(
+            max_in_flight=args.in_flight,
+            parse_concurrency=args.parse,
+            embed_concurrency=args.embed,
+            ingest_concurrency=args.ingest,
+        )
+        sequential = run(
+            flow,
+            fixtures,
+            workdir / "sequential",
+            "sequential",
+            max_in_flight=1,
+            pipelined=False,
+        )
+        concurrent = run(
+            flow,
+            fixtures,
+            workdir / "concurrent",
+            "concurrent",
+            pipelined=False,
+            **limits,
+        )
+        pipelined = run(
+            flow,
+            fixtures,
+            workdir / "pipelined",
+            "pipelined",
+            embed_batch_size=args.embed_batch,
+            write_batch_size=args.write_batch,
+            **limits,
+        )
+        run(flow, fixtures, workdir / "pipelined", "rerun", **limits)
+    print(
+        f"[bench-ingest] speedup concurrent {sequential / concurrent:.1f}x, "
+        f"pipelined {sequential / pipelined:.1f}x"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""Throughput benchmark for Khmer normalization and segmentation.
+
+Builds a synthetic lyric corpus from the segmentation dictionary (words
+joined without spaces, phrases separated by spaces/ZWSP, some marks
+typed out of order, choruses repeated) and reports MB/s of UTF-8 input
+for normalize, content_hash and segment, with the segmentation memo
+both cold and warm.
+
+Usage:
+  python scripts/bench_khmer_text.py
+  python scripts/bench_khmer_text.py --mb 8 --songs 400
+
+Exit codes:
+  0: success
+  1: failure
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.src.utils import khmer  # noqa: E402
+
+
+def synthetic_songs(total_bytes: int, songs: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    khmer.load_dictionary()
+    words = sorted(khmer._words()[0])
+    per_song = max(1, total_bytes // songs)
+
+    def phrase() -> str:
+        text = "".join(rng.choice(words) for _ in range(rng.randint(2, 6)))
+        # Occasionally type a vowel before the subscript it follows
+        return text.replace("្រា", "ា្រ", 1)
+
+    out = []
+    for _ in range(songs):
+        chorus = [phrase() for _ in range(4)]
+        lines: list[str] = []
+        while sum(len(line.encode("utf-8")) for line in lines) < per_song:
+            verse = [phrase() for _ in range(4)]
+            for part in (verse, chorus):
+                lines.append("".join(p + rng.choice([" ", khmer.ZWSP]) for p in part))
+        out.append("\n".join(lines))
+    return out
+
+
+def _rate(label: str, fn, docs: list[str], size_mb: float) -> None:
+    start = time.perf_counter()
+    for doc in docs:
+        fn(doc)
+    elapsed = time.perf_counter() - start
+    print(
+        f"[bench-khmer] {label:<22} {size_mb / elapsed:8.2f} MB/s "
+        f"({elapsed * 1000:8.1f} ms)"
+    )
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=float, default=2.0)
+    parser.add_argument("--songs", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    try:
+        docs = synthetic_songs(int(args.mb * 1_000_000), args.songs, args.seed)
+    except OSError as e:
+        print(f"[bench-khmer] FAILED: cannot load dictionary: {e}")
+        return 1
+    size_mb = sum(len(d.encode("utf-8")) for d in docs) / 1_000_000
+    print(f"[bench-khmer] corpus {len(docs)} songs, {size_mb:.2f} MB")
+
+    _rate("normalize", khmer.normalize, docs, size_mb)
+    _rate("content_hash", khmer.content_hash, docs, size_mb)
+    khmer._segment_run.cache_clear()
+    _rate("segment (cold memo)", khmer.segment, docs, size_mb)
+    _rate("segment (warm memo)", khmer.segment, docs, size_mb)
+    _rate("segment_for_index", khmer.segment_for_index, docs, size_mb)
+    info = khmer._segment_run.cache_info()
+    print(f"[bench-khmer] memo hits {info.hits}, misses {info.misses}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Exact-match benchmark: vector vs lexical vs fused lyrics search.
+
+Samples titles from the lyrics table and searches for each one verbatim
+in every SearchMode, reporting hit@1 (the title comes back first),
+p50/p95 latency and how many embeddings each mode generated. Lexical
+mode should need zero embeddings and win on both latency and hit@1.
+
+Requires SUPABASE_URL / SUPABASE_SERVICE_ROLE_KEY (and an embedding
+provider for the vector and hybrid modes) with migration 006 applied.
+
+Usage:
+  python scripts/bench_lexical_search.py
+  python scripts/bench_lexical_search.py --samples 200 --modes lexical hybrid
+
+Exit codes:
+  0: success
+  1: failure
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+async def _bench_mode(service, mode, titles: list[str]) -> dict:
+    embeddings = 0
+    generate = service.generate_embedding
+
+    async def counting_generate(text: str):
+        nonlocal embeddings
+        embeddings += 1
+        return await generate(text)
+
+    service.generate_embedding = counting_generate
+    latencies, hits = [], 0
+    try:
+        for title in titles:
+            start = time.perf_counter()
+            results = await service.hybrid_search(
+                title, include_sessions=False, expand=False, mode=mode
+            )
+            latencies.append((time.perf_counter() - start) * 1000)
+            hits += bool(results) and results[0].title == title
+    finally:
+        service.generate_embedding = generate
+
+    latencies.sort()
+    return {
+        "mode": mode.value,
+        "hit_at_1": hits / len(titles),
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": latencies[int(0.95 * (len(latencies) - 1))],
+        "embeddings": embeddings,
+    }
+
+
+async def _run(args) -> int:
+    from backend.src.services.openrag_service import OpenRAGService, SearchMode
+
+    service = OpenRAGService()
+    if not service.connect():
+        print("[bench-lexical] FAILED: cannot connect to Supabase")
+        return 1
+
+    rows = (
+        service.client.table("lyrics")
+        .select("title")
+        .not_.is_("embedding", "null")
+        .limit(args.samples)
+        .execute()
+        .data
+    )
+    titles = [r["title"] for r in rows if r.get("title")]
+    if not titles:
+        print("[bench-lexical] FAILED: no titled lyrics to sample")
+        return 1
+    print(f"[bench-lexical] {len(titles)} exact-title queries")
+
+    for name in args.modes:
+        report = await _bench_mode(service, SearchMode(name), titles)
+        print(
+            f"[bench-lexical] {report['mode']:<8} "
+            f"hit@1 {report['hit_at_1']:6.3f}   "
+            f"p50 {report['p50_ms']:8.2f} ms   p95 {report['p95_ms']:8.2f} ms   "
+            f"embeddings {report['embeddings']}"
+        )
+    return 0
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--samples", type=int, default=50)
+    parser.add_argument(
+        "--modes",
+        nargs="+",
+        choices=("vector", "lexical", "hybrid"),
+        default=["vector", "lexical", "hybrid"],
+    )
+    args = parser.parse_args(argv)
+    try:
+        return asyncio.run(_run(args))
+    except ImportError as e:
+        print(f"[bench-lexical] FAILED: cannot import OpenRAG service: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))
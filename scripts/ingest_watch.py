@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Watch a lyrics folder and ingest new or changed files as they land.
+
+Runs ``IngestDaemon`` until interrupted: one catch-up scan at startup
+(unchanged files are skipped via the ingest manifest), then file system
+events debounced into bulk batches. Queue depth and counters are
+written to ``--status-file`` after every batch. Failed files and rows
+go to the dead-letter store and are retried with backoff while the
+daemon runs (the ``retry_failed_ingestion`` flow reads the same store).
+
+Requires: supabase (and watchdog for event-driven watching; without it
+the folder is polled every ``--poll`` seconds)
+
+Usage:
+  python scripts/ingest_watch.py
+  python scripts/ingest_watch.py --root assets/raw_lyrics --debounce 2 --max-batch 500
+
+Exit codes:
+  0: stopped cleanly
+  1: failure (e.g. Supabase not configured)
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import signal
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.src.services.dead_letter import (  # noqa: E402
+    DEFAULT_DEAD_LETTER_PATH,
+    DeadLetterStore,
+)
+from backend.src.services.ingest_daemon import IngestDaemon  # noqa: E402
+from backend.src.services.ingest_manifest import (  # noqa: E402
+    DEFAULT_MANIFEST_PATH,
+    IngestManifest,
+)
+from backend.src.services.resources import flow_resources  # noqa: E402
+
+
+async def run(args: argparse.Namespace) -> int:
+    manifest = IngestManifest(args.manifest)
+    dead_letters = DeadLetterStore(args.dead_letters)
+    try:
+        async with flow_resources() as resources:
+            try:
+                openrag = resources.openrag()
+            except RuntimeError as e:
+                print(f"[ingest-watch] {e}", file=sys.stderr)
+                return 1
+            daemon = IngestDaemon(
+                args.root,
+                openrag,
+                manifest,
+                quiet_seconds=args.debounce,
+                max_wait_seconds=args.max_wait,
+                max_batch=args.max_batch,
+                poll_seconds=args.poll,
+                status_path=args.status_file,
+                dead_letters=dead_letters,
+            )
+            loop = asyncio.get_running_loop()
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                try:
+                    loop.add_signal_handler(sig, daemon.stop)
+                except NotImplementedError:  # Windows
+                    pass
+            print(f"[ingest-watch] watching {args.root} (Ctrl+C to stop)")
+            await daemon.run()
+            counters = daemon.status()["counters"]
+            print(
+                f"[ingest-watch] stopped: {counters['batches']} batches, "
+                f"{counters['ingested']} ingested, {counters['failed']} failed"
+            )
+    finally:
+        manifest.close()
+        dead_letters.close()
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", type=Path, default=Path("assets/raw_lyrics"))
+    parser.add_argument("--manifest", type=Path, default=DEFAULT_MANIFEST_PATH)
+    parser.add_argument("--dead-letters", type=Path, default=DEFAULT_DEAD_LETTER_PATH)
+    parser.add_argument(
+        "--status-file", type=Path, default=Path(".cache/ingest_watch.json")
+    )
+    parser.add_argument(
+        "--debounce", type=float, default=1.0, help="quiet seconds per file"
+    )
+    parser.add_argument(
+        "--max-wait", type=float, default=5.0, help="flush a burst after this long"
+    )
+    parser.add_argument("--max-batch", type=int, default=200)
+    parser.add_argument(
+        "--poll", type=float, default=2.0, help="poll interval without watchdog"
+    )
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""Mine query-expansion co-occurrence statistics from a lyrics corpus.
+
+For every expansion trigger (English, romanized or Khmer) found in a
+document, counts the documents in which each other term appears
+alongside it, plus each term's corpus-wide document frequency. The
+query expansion engine turns these counts into weights (how much more
+likely a term is next to the trigger than anywhere) when it is loaded
+with the stats file
+(OpenRAGConfig.expansion_stats_path or QUERY_EXPANSION_STATS), and
+OpenRAGService.reload_expansions() picks up a fresh file without a
+restart.
+
+Inputs are lyrics .txt files (as consumed by the ingestion flow),
+directories of them, or .jsonl exports with title / lyrics_* fields.
+
+Usage:
+  python scripts/mine_query_cooccurrence.py lyrics/ --output .cache/expansion_stats.json
+  python scripts/mine_query_cooccurrence.py export.jsonl --min-count 5 --top 20
+
+Exit codes:
+  0: success
+  1: failure
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from backend.src.services.query_expansion import load_expander  # noqa: E402
+from backend.src.utils.khmer import is_khmer, segment_for_index  # noqa: E402
+
+TEXT_FIELDS = ("title", "lyrics_khmer", "lyrics_romanized", "lyrics_english")
+MIN_LATIN_TERM = 3
+
+
+def iter_documents(paths: list[Path]) -> Iterator[str]:
+    for path in paths:
+        if path.is_dir():
+            yield from iter_documents(sorted(p for p in path.rglob("*") if p.is_file()))
+        elif path.suffix == ".jsonl":
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        row = json.loads(line)
+                        yield " ".join(str(row.get(k) or "") for k in TEXT_FIELDS)
+        elif path.suffix in (".txt", ".md"):
+            yield path.read_text(encoding="utf-8", errors="replace")
+
+
+def terms(text: str) -> set[str]:
+    """Index-style terms of a document (casefolded, deduplicated)."""
+    out = set()
+    for token in segment_for_index(text.casefold()).split():
+        token = token.strip("\"'()[]-_")
+        if not token or token.isdigit():
+            continue
+        if not is_khmer(token[0]) and len(token) < MIN_LATIN_TERM:
+            continue
+        out.add(token)
+    return out
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("inputs", nargs="+", type=Path)
+    parser.add_argument(
+        "--output", type=Path, default=Path(".cache/expansion_stats.json")
+    )
+    parser.add_argument("--data", help="Expansion data file (defaults to bundled)")
+    parser.add_argument("--min-count", type=int, default=3)
+    parser.add_argument("--top", type=int, default=25, help="Terms kept per trigger")
+    args = parser.parse_args(argv)
+
+    expander = load_expander(args.data)
+    document_frequency: Counter = Counter()
+    trigger_counts: Counter = Counter()
+    cooccurrence: dict[str, Counter] = defaultdict(Counter)
+    documents = 0
+    start = time.perf_counter()
+
+    try:
+        for text in iter_documents(args.inputs):
+            documents += 1
+            doc_terms = terms(text)
+            document_frequency.update(doc_terms)
+            found = expander.matched_triggers(text)
+            for trigger in found:
+                trigger_counts[trigger] += 1
+                cooccurrence[trigger].update(doc_terms - {trigger})
+    except (OSError, ValueError) as e:
+        print(f"[mine-expansions] FAILED: {e}")
+        return 1
+
+    kept = {
+        trigger: {
+            term: count
+            for term, count in sorted(counts.items(), key=lambda tc: (-tc[1], tc[0]))[
+                : args.top
+            ]
+            if count >= args.min_count
+        }
+        for trigger, counts in sorted(cooccurrence.items())
+    }
+    stats = {
+        "version": 1,
+        "data_fingerprint": expander.fingerprint,
+        "documents": documents,
+        "trigger_counts": dict(sorted(trigger_counts.items())),
+        "cooccurrence": kept,
+        # Corpus-wide document frequency of every kept term, so the engine
+        # can discount terms that co-occur with everything
+        "document_frequency": {
+            term: document_frequency[term]
+            for term in sorted({t for counts in kept.values() for t in counts})
+        },
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(
+        json.dumps(stats, ensure_ascii=False, indent=2), encoding="utf-8"
+    )
+    print(
+        f"[mine-expansions] {documents} documents, {len(trigger_counts)} triggers "
+        f"seen in {time.perf_counter() - start:.2f} s -> {args.output}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv[1:]))